@@ -0,0 +1,86 @@
+"""Compare decoding and object construction throughput of large component and notification payloads.
+
+Run with `python benchmarks/bench_decoding.py`. Reports objects per second for
+
+- build:    datamodels from already decoded payloads (the `_from_dict` constructors)
+- json:     `json.loads` + datamodels (the path without msgspec)
+- loads:    `froeling.decoding.loads` + datamodels (what `Session` uses, msgspec if installed)
+"""
+
+import json
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from froeling import decoding
+from froeling.datamodels import NotificationDetails, NotificationOverview, Parameter
+
+RESPONSES = Path(__file__).parent.parent / 'tests' / 'responses'
+REPEAT = 20
+
+
+def component_payload(count: int) -> bytes:
+    """Build a component response with `count` state parameters."""
+    component = json.loads((RESPONSES / 'component.json').read_text(encoding='utf-8'))
+    template = component['stateView'][0]
+    component['stateView'] = [dict(template, id=f'3_{i}', name=f'param{i}', value=str(i)) for i in range(count)]
+    return json.dumps(component).encode()
+
+
+def notification_payload(count: int) -> bytes:
+    """Build a notification list response with `count` notifications."""
+    template = json.loads((RESPONSES / 'notification_list.json').read_text(encoding='utf-8'))[0]
+    return json.dumps([dict(template, id=i) for i in range(count)]).encode()
+
+
+def details_payload(count: int) -> bytes:
+    """Build `count` notification detail responses as one JSON list."""
+    template = json.loads((RESPONSES / 'notification.json').read_text(encoding='utf-8'))
+    return json.dumps([dict(template, id=i) for i in range(count)]).encode()
+
+
+def bench(name: str, func: Callable[[Any], Any], data: Any, objects: int) -> None:
+    """Print objects per second of calling `func` with `data`."""
+    func(data)  # warm up
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        func(data)
+    elapsed = time.perf_counter() - start
+    print(f'  {name:<8} {objects * REPEAT / elapsed:>14,.0f} objects/s')
+
+
+def compare(title: str, payload: bytes, build: Callable[[Any], Any], objects: int) -> None:
+    """Benchmark building the datamodels of `payload` alone and together with each decoder."""
+    print(f'{title} ({len(payload):,} bytes)')
+    bench('build', build, decoding.loads(payload), objects)
+    bench('json', lambda data: build(json.loads(data)), payload, objects)
+    bench('loads', lambda data: build(decoding.loads(data)), payload, objects)
+
+
+def main() -> None:
+    """Run all benchmarks."""
+    count = 10_000
+    print(f'msgspec installed: {decoding.HAS_MSGSPEC}')
+    compare(
+        f'Component with {count:,} parameters',
+        component_payload(count),
+        lambda data: Parameter._from_list(data['stateView'], None, 12345),  # type: ignore[arg-type]
+        count,
+    )
+    compare(
+        f'Notification list with {count:,} notifications',
+        notification_payload(count),
+        lambda data: [NotificationOverview(n, None) for n in data],  # type: ignore[arg-type]
+        count,
+    )
+    compare(
+        f'{count:,} notification details',
+        details_payload(count),
+        lambda data: [NotificationDetails._from_dict(n) for n in data],
+        count,
+    )
+
+
+if __name__ == '__main__':
+    main()
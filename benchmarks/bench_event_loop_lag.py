@@ -0,0 +1,100 @@
+"""Measure event loop lag while a synthetic fleet is polled, with and without offloading.
+
+Run with `python benchmarks/bench_event_loop_lag.py`. A local server answers
+component requests with large payloads while a probe coroutine measures how late
+the event loop wakes it up. Reports the lag percentiles and the poll duration
+without offloading, with a thread pool and with a process pool.
+"""
+
+import asyncio
+import json
+import statistics
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from aiohttp import web
+
+from froeling import Froeling
+from froeling.session import OffloadConfig
+
+RESPONSES = Path(__file__).parent.parent / 'tests' / 'responses'
+TOKEN = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+COMPONENTS = 64
+PARAMETERS = 5_000
+PROBE_INTERVAL = 0.001
+
+
+def component_payload(count: int) -> bytes:
+    """Build a component response with `count` state parameters."""
+    component = json.loads((RESPONSES / 'component.json').read_text(encoding='utf-8'))
+    template = component['stateView'][0]
+    component['stateView'] = [dict(template, id=f'3_{i}', name=f'param{i}', value=str(i)) for i in range(count)]
+    return json.dumps(component).encode()
+
+
+async def serve(payload: bytes) -> web.AppRunner:
+    """Serve `payload` for every component on 127.0.0.1:8765."""
+
+    async def component(_: web.Request) -> web.Response:
+        return web.Response(body=payload, content_type='application/json')
+
+    app = web.Application()
+    app.router.add_get('/fcs/v1.0/resources/user/{user}/facility/{facility}/component/{component}', component)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', 8765).start()
+    return runner
+
+
+async def probe(lags: list[float], stop: asyncio.Event) -> None:
+    """Record how much later than requested the loop resumes a sleeping coroutine."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - start - PROBE_INTERVAL)
+
+
+async def poll_fleet(offload: OffloadConfig | None) -> tuple[list[float], float]:
+    """Update all components concurrently and return the lags and the duration."""
+    lags: list[float] = []
+    stop = asyncio.Event()
+    async with Froeling(token=TOKEN, base_url='http://127.0.0.1:8765', offload=offload) as api:
+        components = [api.get_component(1, f'1_{i}') for i in range(COMPONENTS)]
+        probe_task = asyncio.create_task(probe(lags, stop))
+        start = time.perf_counter()
+        await asyncio.gather(*(c.update() for c in components))
+        duration = time.perf_counter() - start
+        stop.set()
+        await probe_task
+    return lags, duration
+
+
+def report(name: str, lags: list[float], duration: float) -> None:
+    """Print lag percentiles in milliseconds."""
+    ms = sorted(lag * 1000 for lag in lags)
+    p50 = statistics.median(ms)
+    p99 = ms[int(len(ms) * 0.99)]
+    print(f'  {name:<10} lag p50 {p50:7.2f} ms  p99 {p99:7.2f} ms  max {ms[-1]:7.2f} ms  poll {duration:6.2f} s')
+
+
+async def main() -> None:
+    """Run all benchmarks."""
+    payload = component_payload(PARAMETERS)
+    runner = await serve(payload)
+    print(f'{COMPONENTS} components with {PARAMETERS:,} parameters ({len(payload):,} bytes each)')
+    try:
+        executors: list[tuple[str, Executor]] = [
+            ('threads', ThreadPoolExecutor(4)),
+            ('processes', ProcessPoolExecutor(4)),
+        ]
+        report('on loop', *await poll_fleet(None))
+        for name, executor in executors:
+            with executor:
+                report(name, *await poll_fleet(OffloadConfig(min_bytes=64 * 1024, min_items=500, executor=executor)))
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
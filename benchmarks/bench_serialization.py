@@ -0,0 +1,74 @@
+"""Compare encode and decode throughput of datamodel serialization formats.
+
+Run with `python benchmarks/bench_serialization.py`. Reports parameters per second
+and the encoded size of a component for
+
+- pickle:   `pickle` (goes through `to_dict`/`from_dict`, without the session)
+- json:     `froeling.serialization` with fmt='json'
+- msgpack:  `froeling.serialization` with fmt='msgpack' (needs msgspec)
+"""
+
+import json
+import pickle
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from froeling import decoding, serialization
+from froeling.datamodels import Component, Parameter
+
+RESPONSES = Path(__file__).parent.parent / 'tests' / 'responses'
+REPEAT = 20
+
+
+def component(count: int) -> Component:
+    """Build a detached component with `count` parameters."""
+    data = json.loads((RESPONSES / 'component.json').read_text(encoding='utf-8'))
+    template = data['stateView'][0]
+    parameters = [dict(template, id=f'3_{i}', name=f'param{i}', value=str(i)) for i in range(count)]
+    comp = Component.from_dict({'facility_id': 12345, 'component_id': '1_100'})
+    comp.parameters = Parameter._from_list(parameters, None, 12345)  # type: ignore[arg-type]
+    return comp
+
+
+def bench(name: str, dumps: Callable[[Any], bytes], loads: Callable[[bytes], Any], obj: Any, objects: int) -> None:
+    """Print objects per second of encoding and decoding `obj`."""
+    data = dumps(obj)
+    loads(data)  # warm up
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        dumps(obj)
+    encode = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        loads(data)
+    decode = time.perf_counter() - start
+    print(
+        f'  {name:<8} {len(data):>12,} bytes  '
+        f'encode {objects * REPEAT / encode:>12,.0f}/s  decode {objects * REPEAT / decode:>12,.0f}/s'
+    )
+
+
+def main() -> None:
+    """Run all benchmarks."""
+    count = 10_000
+    comp = component(count)
+
+    print(f'Component with {count:,} parameters')
+    bench('pickle', pickle.dumps, pickle.loads, comp, count)
+    for fmt in serialization.FORMATS:
+        if fmt == 'msgpack' and not decoding.HAS_MSGSPEC:
+            print('msgspec is not installed, skipping msgpack.')
+            continue
+        bench(
+            fmt,
+            lambda obj, fmt=fmt: serialization.dumps(obj, fmt=fmt),
+            lambda data, fmt=fmt: serialization.loads(data, fmt=fmt),
+            comp,
+            count,
+        )
+
+
+if __name__ == '__main__':
+    main()
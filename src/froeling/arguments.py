@@ -0,0 +1,34 @@
+"""Command line options shared by the command line tools."""
+
+import argparse
+import os
+from pathlib import Path
+
+from froeling.tokenstore import FileTokenStore
+
+DEFAULT_TOKEN_CACHE = Path(os.getenv('XDG_CACHE_HOME', Path.home() / '.cache')) / 'froeling' / 'token'
+
+
+def add_client_arguments(parser: argparse.ArgumentParser, *, token_cache: bool = True) -> None:
+    """Add the options for logging into the API and the language of its responses.
+
+    Args:
+    ----
+        parser (argparse.ArgumentParser): Parser to add `--username`, `--password`,
+            `--token` and `--language` to.
+        token_cache (bool): Also add `--token-cache` and `--no-token-cache`, see `token_store`.
+            Defaults to True.
+
+    """
+    parser.add_argument('--username', default=os.getenv('FROELING_USERNAME'), help='Or set FROELING_USERNAME.')
+    parser.add_argument('--password', default=os.getenv('FROELING_PASSWORD'), help='Or set FROELING_PASSWORD.')
+    parser.add_argument('--token', default=os.getenv('FROELING_TOKEN'), help='Or set FROELING_TOKEN.')
+    parser.add_argument('--language', default='en', help='Language of API responses (default: %(default)s).')
+    if token_cache:
+        parser.add_argument('--token-cache', default=DEFAULT_TOKEN_CACHE, help='Token file (default: %(default)s).')
+        parser.add_argument('--no-token-cache', action='store_true', help="Don't read or write the token file.")
+
+
+def token_store(args: argparse.Namespace) -> FileTokenStore | None:
+    """Get the token store selected by the options of `add_client_arguments`, None if disabled."""
+    return None if args.no_token_cache else FileTokenStore(args.token_cache)
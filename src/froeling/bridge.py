@@ -0,0 +1,407 @@
+"""Bridge facilities into MQTT, e.g. for Home Assistant.
+
+The bridge polls all components of the account with an `AdaptivePoller` and
+publishes every changed parameter value as a retained message to
+
+    <prefix>/<facility_id>/<component_id>/<parameter_id>/state
+
+Writes are accepted on the matching `.../set` topics and passed to
+`Parameter.set_value`. Messages are published in batches, and unchanged values
+are not published again. With Home Assistant discovery enabled, every parameter
+is announced once as a sensor (or a number, if it is editable).
+
+    python -m froeling.bridge --mqtt-host localhost
+
+Requires the `bridge` extra (aiomqtt) to talk to a broker. `MemoryTransport`
+stands in for a broker in tests.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import re
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import dataclass
+from typing import Any, cast
+
+from froeling.arguments import add_client_arguments, token_store
+from froeling.client import Froeling
+from froeling.datamodels import Component, Parameter
+from froeling.events import Event, EventType, Policy
+from froeling.polling import AdaptivePoller
+
+try:
+    import aiomqtt
+except ImportError:  # pragma: no cover - depends on the environment
+    aiomqtt = None  # type: ignore[assignment]
+
+
+@dataclass(frozen=True)
+class Message:
+    """An MQTT message.
+
+    Attributes:
+        topic (str): Topic of the message.
+        payload (str): Payload, decoded as UTF-8.
+        retain (bool): Whether the broker keeps it for new subscribers. Defaults to False.
+
+    """
+
+    topic: str
+    payload: str
+    retain: bool = False
+
+
+class Transport(ABC):
+    """Connection to an MQTT broker used by the `Bridge`."""
+
+    @abstractmethod
+    async def publish(self, messages: Sequence[Message]) -> None:
+        """Publish a batch of messages."""
+
+    @abstractmethod
+    async def subscribe(self, topic: str) -> None:
+        """Subscribe to a topic filter, whose messages `commands` yields."""
+
+    @abstractmethod
+    def commands(self) -> AsyncIterator[Message]:
+        """Yield messages of the subscribed topics."""
+
+
+def topic_matches(topic_filter: str, topic: str) -> bool:
+    """Whether `topic` matches an MQTT topic filter with `+` and `#` wildcards."""
+    filter_levels = topic_filter.split('/')
+    levels = topic.split('/')
+    for i, level in enumerate(filter_levels):
+        if level == '#':
+            return True
+        if i >= len(levels) or level not in ('+', levels[i]):
+            return False
+    return len(levels) == len(filter_levels)
+
+
+class MemoryTransport(Transport):
+    """Broker stand-in that keeps published messages in memory.
+
+    Attributes:
+        published (list[Message]): All published messages, in order.
+        batches (list[int]): Size of every published batch.
+        retained (dict[str, str]): Latest payload of each retained topic.
+
+    """
+
+    def __init__(self) -> None:
+        """Initialize a MemoryTransport without messages."""
+        self.published: list[Message] = []
+        self.batches: list[int] = []
+        self.retained: dict[str, str] = {}
+        self.subscriptions: list[str] = []
+        self._incoming: asyncio.Queue[Message] = asyncio.Queue()
+
+    async def publish(self, messages: Sequence[Message]) -> None:
+        """Record a batch of messages."""
+        self.batches.append(len(messages))
+        self.published += messages
+        for message in messages:
+            if message.retain:
+                self.retained[message.topic] = message.payload
+
+    async def subscribe(self, topic: str) -> None:
+        """Record a subscription."""
+        self.subscriptions.append(topic)
+
+    def send(self, topic: str, payload: str) -> None:
+        """Simulate a client publishing to `topic`. Delivered if the bridge subscribed to it."""
+        if any(topic_matches(f, topic) for f in self.subscriptions):
+            self._incoming.put_nowait(Message(topic, payload))
+
+    async def commands(self) -> AsyncIterator[Message]:
+        """Yield messages passed to `send`."""
+        while True:
+            yield await self._incoming.get()
+
+
+class MqttTransport(Transport):
+    """Transport over a connected `aiomqtt.Client`."""
+
+    def __init__(self, client: 'aiomqtt.Client', qos: int = 0) -> None:
+        """Initialize an MqttTransport.
+
+        Args:
+        ----
+            client (aiomqtt.Client): Connected client.
+            qos (int): Quality of service of publishes and subscriptions. Defaults to 0.
+
+        """
+        self.client = client
+        self.qos = qos
+
+    async def publish(self, messages: Sequence[Message]) -> None:
+        """Publish a batch of messages concurrently."""
+        await asyncio.gather(
+            *(self.client.publish(m.topic, m.payload, qos=self.qos, retain=m.retain) for m in messages)
+        )
+
+    async def subscribe(self, topic: str) -> None:
+        """Subscribe to a topic filter."""
+        await self.client.subscribe(topic, qos=self.qos)
+
+    async def commands(self) -> AsyncIterator[Message]:
+        """Yield messages of the subscribed topics."""
+        async for message in self.client.messages:
+            payload: Any = message.payload
+            if isinstance(payload, bytes | bytearray):
+                payload = payload.decode()
+            yield Message(message.topic.value, '' if payload is None else str(payload), message.retain)
+
+
+class Bridge:
+    """Publishes changed parameters of all components to MQTT and applies writes from command topics."""
+
+    def __init__(
+        self,
+        api: Froeling,
+        transport: Transport,
+        *,
+        prefix: str = 'froeling',
+        discovery_prefix: str | None = 'homeassistant',
+        poller: AdaptivePoller | None = None,
+        batch_size: int = 500,
+        batch_delay: float = 0.05,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        """Initialize a Bridge.
+
+        Args:
+        ----
+            api (Froeling): Client of the bridged account.
+            transport (Transport): Connection to the broker.
+            prefix (str): First level of all topics. Defaults to 'froeling'.
+            discovery_prefix (str | None): Home Assistant discovery prefix. Defaults to
+                'homeassistant', None to disable discovery.
+            poller (AdaptivePoller | None): Poller to add the components to.
+                Defaults to None (a new one with default intervals).
+            batch_size (int): Most changes published in one batch. Defaults to 500.
+            batch_delay (float): Seconds to wait for more changes after the first one
+                of a batch. Defaults to 0.05.
+            logger (logging.Logger | None): Logger for failed commands. Defaults to None.
+
+        """
+        self.api = api
+        self.transport = transport
+        self.prefix = prefix.rstrip('/')
+        self.discovery_prefix = discovery_prefix
+        self._logger = logger or logging.getLogger(__name__)
+        self.poller = poller or AdaptivePoller(logger=self._logger)
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.components: dict[tuple[int, str], Component] = {}
+        self._announced: set[tuple[int, str, str]] = set()
+        self._command = re.compile(rf'^{re.escape(self.prefix)}/(\d+)/([^/]+)/([^/]+)/set$')
+        # Only the latest value of a parameter matters, so a slow broker coalesces changes.
+        self.subscriber = api.events.subscribe({EventType.PARAMETER_CHANGED}, maxsize=100_000, policy=Policy.COALESCE)
+
+    @property
+    def status_topic(self) -> str:
+        """Topic with the retained availability of the bridge, 'online' or 'offline'."""
+        return f'{self.prefix}/status'
+
+    def state_topic(self, facility_id: int, component_id: str, parameter_id: str) -> str:
+        """Topic with the retained value of a parameter."""
+        return f'{self.prefix}/{facility_id}/{component_id}/{parameter_id}/state'
+
+    async def setup(self) -> None:
+        """Find the components to poll, subscribe to the command topics and announce the bridge."""
+        for facility in await self.api.get_facilities():
+            for component in await facility.get_components():
+                if component is not None:
+                    self.components[facility.facility_id, component.component_id] = component
+                    self.poller.add(component, facility)
+        await self.transport.subscribe(f'{self.prefix}/+/+/+/set')
+        await self.transport.publish([Message(self.status_topic, 'online', retain=True)])
+
+    async def run(self) -> None:
+        """Set up, then poll, publish and handle commands until cancelled."""
+        await self.setup()
+        tasks = [
+            asyncio.create_task(self.poller.run()),
+            asyncio.create_task(self._publish_loop()),
+            asyncio.create_task(self._command_loop()),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            with contextlib.suppress(Exception):
+                await self.transport.publish([Message(self.status_topic, 'offline', retain=True)])
+
+    async def publish_pending(self) -> int:
+        """Wait for changes and publish up to `batch_size` of them in one batch.
+
+        Returns
+        -------
+            int: Number of changes published.
+
+        """
+        events = [await self.subscriber.get()]
+        if self.batch_delay:
+            await asyncio.sleep(self.batch_delay)  # Let the rest of the polling round arrive.
+        while len(events) < self.batch_size and len(self.subscriber):
+            events.append(await self.subscriber.get())
+        await self.transport.publish([m for event in events for m in self.messages(event)])
+        return len(events)
+
+    async def _publish_loop(self) -> None:
+        while True:
+            await self.publish_pending()
+
+    def messages(self, event: Event) -> list[Message]:
+        """Messages publishing a `PARAMETER_CHANGED` event, with discovery when first seen."""
+        parameter: Parameter = event.data
+        component_id = cast('str', event.component_id)
+        topic = self.state_topic(parameter.facility_id, component_id, parameter.id)
+        messages = [Message(topic, '' if event.value is None else str(event.value), retain=True)]
+        key = (parameter.facility_id, component_id, parameter.id)
+        if self.discovery_prefix is not None and key not in self._announced:
+            self._announced.add(key)
+            messages.insert(0, self._discovery(parameter, component_id, topic))
+        return messages
+
+    def _discovery(self, parameter: Parameter, component_id: str, state_topic: str) -> Message:
+        unique_id = f'froeling_{parameter.facility_id}_{component_id}_{parameter.id}'
+        config: dict[str, Any] = {
+            'name': parameter.display_name or parameter.name or parameter.id,
+            'unique_id': unique_id,
+            'state_topic': state_topic,
+            'availability_topic': self.status_topic,
+            'device': {'identifiers': [f'froeling_{parameter.facility_id}'], 'manufacturer': 'Fröling'},
+        }
+        if parameter.unit:
+            config['unit_of_measurement'] = parameter.unit
+        platform = 'sensor'
+        bounds = _float(parameter.min_val), _float(parameter.max_val)
+        if parameter.editable and None not in bounds:
+            platform = 'number'
+            config['min'], config['max'] = bounds
+            config['command_topic'] = state_topic.removesuffix('/state') + '/set'
+        return Message(f'{self.discovery_prefix}/{platform}/{unique_id}/config', json.dumps(config), retain=True)
+
+    async def _command_loop(self) -> None:
+        # Every command runs in its own task, so a slow write doesn't hold back the others.
+        tasks: set[asyncio.Task[None]] = set()
+        try:
+            async for message in self.transport.commands():
+                task = asyncio.create_task(self.handle_command(message))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def handle_command(self, message: Message) -> None:
+        """Write the payload of a `.../set` message to its parameter and publish the result.
+
+        Commands for parameters that aren't editable, and values outside the
+        parameter's `min_val`/`max_val`, are logged and ignored. Failures are
+        logged too, so one bad command doesn't stop the bridge.
+        Writes go through `api.writes`, so commands arriving in quick succession
+        (e.g. from a slider) are coalesced and only the last value is sent.
+        """
+        match = self._command.match(message.topic)
+        if not match:
+            return
+        facility_id, component_id, parameter_id = int(match[1]), match[2], match[3]
+        component = self.components.get((facility_id, component_id))
+        parameter = component.parameters.get(parameter_id) if component else None
+        if component is None or parameter is None:
+            self._logger.warning('Ignoring command for unknown parameter: %s', message.topic)
+            return
+        if not parameter.editable:
+            self._logger.warning('Ignoring command for read-only parameter: %s', message.topic)
+            return
+        value = _float(message.payload)
+        low, high = _float(parameter.min_val), _float(parameter.max_val)
+        if (low is not None or high is not None) and (
+            value is None or (low is not None and value < low) or (high is not None and value > high)
+        ):
+            self._logger.warning(
+                'Ignoring %r for %s, not between %s and %s.',
+                message.payload,
+                message.topic,
+                parameter.min_val,
+                parameter.max_val,
+            )
+            return
+        try:
+            result = await self.api.writes.set_value(parameter, message.payload)
+            if result.value == message.payload:  # Superseded commands leave the update to the last one.
+                await component.update(self.poller.fields)  # Publishes the new value.
+        except Exception:
+            self._logger.exception('Setting %s to %r failed.', message.topic, message.payload)
+
+
+def _float(value: str | None) -> float | None:
+    try:
+        return float(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return None
+
+
+async def _run(args: argparse.Namespace) -> None:
+    will = aiomqtt.Will(f'{args.prefix}/status', 'offline', retain=True)
+    async with (
+        Froeling(
+            args.username,
+            args.password,
+            args.token,
+            auto_reauth=bool(args.username and args.password),
+            language=args.language,
+            token_store=token_store(args),
+        ) as api,
+        aiomqtt.Client(
+            args.mqtt_host,
+            args.mqtt_port,
+            username=args.mqtt_username,
+            password=args.mqtt_password,
+            will=will,
+        ) as client,
+    ):
+        poller = AdaptivePoller(min_interval=args.min_interval, max_interval=args.max_interval)
+        discovery = None if args.no_discovery else args.discovery_prefix
+        bridge = Bridge(api, MqttTransport(client), prefix=args.prefix, discovery_prefix=discovery, poller=poller)
+        await bridge.run()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the bridge from the command line."""
+    parser = argparse.ArgumentParser(prog='python -m froeling.bridge', description=__doc__.splitlines()[0])
+    add_client_arguments(parser)
+    parser.add_argument('--mqtt-host', default='localhost', help='Broker host (default: %(default)s).')
+    parser.add_argument('--mqtt-port', type=int, default=1883, help='Broker port (default: %(default)s).')
+    parser.add_argument('--mqtt-username', default=os.getenv('MQTT_USERNAME'), help='Or set MQTT_USERNAME.')
+    parser.add_argument('--mqtt-password', default=os.getenv('MQTT_PASSWORD'), help='Or set MQTT_PASSWORD.')
+    parser.add_argument('--prefix', default='froeling', help='Topic prefix (default: %(default)s).')
+    parser.add_argument(
+        '--discovery-prefix', default='homeassistant', help='Home Assistant discovery prefix (default: %(default)s).'
+    )
+    parser.add_argument('--no-discovery', action='store_true', help="Don't announce Home Assistant entities.")
+    parser.add_argument('--min-interval', type=float, default=30.0, help='Seconds (default: %(default)s).')
+    parser.add_argument('--max-interval', type=float, default=900.0, help='Seconds (default: %(default)s).')
+    args = parser.parse_args(argv)
+    if aiomqtt is None:
+        parser.error('Install the bridge extra: pip install froeling-connect[bridge]')
+
+    logging.basicConfig(level=logging.INFO)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_run(args))
+
+
+if __name__ == '__main__':
+    main()
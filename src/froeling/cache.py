@@ -0,0 +1,228 @@
+"""Small async-aware caches."""
+
+import asyncio
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, Generic, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+def approximate_size(obj: Any) -> int:
+    """Estimate the memory used by decoded JSON (dicts, lists and scalars) in bytes."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(approximate_size(k) + approximate_size(v) for k, v in obj.items())
+    elif isinstance(obj, list | tuple):
+        size += sum(approximate_size(v) for v in obj)
+    return size
+
+
+class _CoalescingCache(ABC, Generic[K, V]):
+    """Base class of caches that coalesce concurrent fetches of the same key."""
+
+    def __init__(self) -> None:
+        self._inflight: dict[K, asyncio.Future[V]] = {}
+
+    @abstractmethod
+    def get(self, key: K) -> V | None:
+        """Return the cached value of `key`, or None."""
+
+    @abstractmethod
+    def set(self, key: K, value: V) -> None:
+        """Store `value` for `key`."""
+
+    async def get_or_fetch(self, key: K, fetch: Callable[[], Awaitable[V]]) -> V:
+        """Return the cached value for `key`, calling `fetch` at most once on a miss.
+
+        Exceptions raised by `fetch` are passed to every waiting caller and nothing is cached.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fetch())
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._fetched(key, f))
+        # Shield, so one cancelled caller does not cancel the fetch for everyone else.
+        return await asyncio.shield(future)
+
+    def _fetched(self, key: K, future: 'asyncio.Future[V]') -> None:
+        failed = future.cancelled() or future.exception() is not None
+        if self._inflight.get(key) is not future:
+            return  # Invalidated while fetching, the result may already be outdated.
+        del self._inflight[key]
+        if not failed:
+            self.set(key, future.result())
+
+
+class TTLCache(_CoalescingCache[K, V]):
+    """Cache values for a fixed time and coalesce concurrent fetches of the same key.
+
+    While a key is being fetched, further callers asking for it wait for the
+    running fetch instead of starting their own.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        *,
+        max_items: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize a TTLCache.
+
+        Args:
+        ----
+            ttl (float): Seconds a fetched value stays fresh.
+            max_items (int | None): Most values kept. When full, expired values are dropped
+                first, then the oldest ones. Defaults to None (no limit).
+            clock (Callable[[], float]): Monotonic time source. Defaults to `time.monotonic`.
+
+        """
+        super().__init__()
+        self.ttl = ttl
+        self.max_items = max_items
+        self._clock = clock
+        self._values: dict[K, tuple[float, V]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of stored (possibly expired) values."""
+        return len(self._values)
+
+    def get(self, key: K) -> V | None:
+        """Return a fresh cached value or None."""
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires <= self._clock():
+            del self._values[key]
+            return None
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        """Store a value, making room if the cache is full."""
+        # Re-insert, so the values stay ordered by expiry and the first one is the oldest.
+        self._values.pop(key, None)
+        self._values[key] = (self._clock() + self.ttl, value)
+        if self.max_items is not None and len(self._values) > self.max_items:
+            self.sweep()
+            while len(self._values) > self.max_items:
+                del self._values[next(iter(self._values))]
+
+    def sweep(self) -> None:
+        """Drop all expired values."""
+        now = self._clock()
+        while self._values:
+            key, (expires, _) = next(iter(self._values.items()))
+            if expires > now:
+                return
+            del self._values[key]
+
+    def invalidate(self, predicate: Callable[[K], bool] | None = None) -> None:
+        """Drop all values, or only those whose key matches `predicate`.
+
+        Fetches already running for matching keys still complete, but their results are not stored.
+        """
+        if predicate is None:
+            self._values.clear()
+            self._inflight.clear()
+            return
+        for key in [k for k in self._values if predicate(k)]:
+            del self._values[key]
+        for key in [k for k in self._inflight if predicate(k)]:
+            del self._inflight[key]
+
+
+class LRUCache(_CoalescingCache[K, V]):
+    """Keep the most recently used values, bounded by count and approximate size.
+
+    Meant for values that don't change once fetched. Like `TTLCache`, concurrent
+    fetches of the same key are coalesced.
+    """
+
+    def __init__(
+        self,
+        max_items: int = 256,
+        max_bytes: int | None = 4 * 1024 * 1024,
+        *,
+        size: Callable[[V], int] = approximate_size,
+    ) -> None:
+        """Initialize an LRUCache.
+
+        Args:
+        ----
+            max_items (int): Most values kept. Defaults to 256.
+            max_bytes (int | None): Most bytes kept, as estimated by `size`. Values larger
+                than this are not stored at all. Defaults to 4 MiB, None for no limit.
+            size (Callable[[V], int]): Estimates the size of a value in bytes.
+                Defaults to `approximate_size`.
+
+        """
+        super().__init__()
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._size = size
+        self._values: OrderedDict[K, tuple[int, V]] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """Return the number of stored values."""
+        return len(self._values)
+
+    def __contains__(self, key: object) -> bool:
+        """Whether a value is stored for `key`, without marking it as used."""
+        return key in self._values
+
+    def get(self, key: K) -> V | None:
+        """Return the cached value and mark it as most recently used, or None."""
+        entry = self._values.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._values.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: K, value: V) -> None:
+        """Store a value, evicting the least recently used ones beyond the limits."""
+        self._remove(key)
+        size = self._size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self._values[key] = (size, value)
+        self.bytes += size
+        while len(self._values) > self.max_items or (self.max_bytes is not None and self.bytes > self.max_bytes):
+            _, (evicted, _) = self._values.popitem(last=False)
+            self.bytes -= evicted
+
+    def pop(self, key: K) -> V | None:
+        """Remove and return the value of `key`, or None.
+
+        A fetch of `key` already running still completes, but its result is not stored
+        and later calls of `get_or_fetch` start a new one.
+        """
+        self._inflight.pop(key, None)
+        return self._remove(key)
+
+    def _remove(self, key: K) -> V | None:
+        entry = self._values.pop(key, None)
+        if entry is None:
+            return None
+        self.bytes -= entry[0]
+        return entry[1]
+
+    def clear(self) -> None:
+        """Drop all values. Fetches already running still complete, but their results are not stored."""
+        self._values.clear()
+        self._inflight.clear()
+        self.bytes = 0
@@ -0,0 +1,158 @@
+"""Circuit breakers that let requests to a degraded API fail fast."""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import Enum
+from http import HTTPStatus
+
+from aiohttp import ClientError
+
+from froeling.exceptions import CircuitOpenError, NetworkError
+
+
+class CircuitState(Enum):
+    """State of a circuit breaker."""
+
+    CLOSED = 'CLOSED'
+    """Requests pass, outcomes are recorded."""
+    OPEN = 'OPEN'
+    """Requests fail immediately with `CircuitOpenError`."""
+    HALF_OPEN = 'HALF_OPEN'
+    """A limited number of probe requests pass to test whether the API recovered."""
+
+
+@dataclass(frozen=True)
+class CircuitBreakerConfig:
+    """Settings for the circuit breakers of a `Session`.
+
+    Attributes:
+        failure_rate (float): Share of failed requests (0-1) within `window` that opens the circuit.
+        min_requests (int): Requests needed within `window` before the failure rate is evaluated.
+        window (float): Seconds of request history taken into account.
+        reset_timeout (float): Seconds the circuit stays open before probing.
+        half_open_requests (int): Probe requests allowed at the same time while half-open.
+        slow_request (float | None): Successful requests taking longer than this many seconds
+            count as failures. None disables this.
+
+    """
+
+    failure_rate: float = 0.5
+    min_requests: int = 10
+    window: float = 60.0
+    reset_timeout: float = 30.0
+    half_open_requests: int = 1
+    slow_request: float | None = None
+
+
+def is_failure(e: BaseException) -> bool:
+    """Whether an exception indicates a degraded upstream, rather than a bad request."""
+    if isinstance(e, NetworkError):
+        return e.status >= HTTPStatus.INTERNAL_SERVER_ERROR or e.status == HTTPStatus.TOO_MANY_REQUESTS
+    return isinstance(e, ClientError | asyncio.TimeoutError)
+
+
+class CircuitBreaker:
+    """Circuit breaker for a single route."""
+
+    def __init__(
+        self,
+        route: str,
+        config: CircuitBreakerConfig | None = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize a CircuitBreaker.
+
+        Args:
+        ----
+            route (str): Name of the route (endpoint template) this breaker guards.
+            config (CircuitBreakerConfig | None): Thresholds. Defaults to `CircuitBreakerConfig()`.
+            clock (Callable[[], float]): Monotonic time source. Defaults to `time.monotonic`.
+
+        """
+        self.route = route
+        self.config = config or CircuitBreakerConfig()
+        self._clock = clock
+        self._outcomes: deque[tuple[float, bool]] = deque()  # (time, failed)
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state. An open circuit becomes half-open once `reset_timeout` passed."""
+        if self._state is CircuitState.OPEN and self._clock() - self._opened_at >= self.config.reset_timeout:
+            self._state = CircuitState.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    @property
+    def failure_rate(self) -> float:
+        """Share of failed requests within the window."""
+        self._prune()
+        if not self._outcomes:
+            return 0.0
+        return sum(failed for _, failed in self._outcomes) / len(self._outcomes)
+
+    def _prune(self) -> None:
+        limit = self._clock() - self.config.window
+        while self._outcomes and self._outcomes[0][0] < limit:
+            self._outcomes.popleft()
+
+    def _open(self) -> None:
+        self._state = CircuitState.OPEN
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+
+    def _acquire(self) -> None:
+        state = self.state
+        if state is CircuitState.OPEN or (
+            state is CircuitState.HALF_OPEN and self._probes >= self.config.half_open_requests
+        ):
+            retry_after = max(0.0, self._opened_at + self.config.reset_timeout - self._clock())
+            raise CircuitOpenError(self.route, retry_after)
+        if state is CircuitState.HALF_OPEN:
+            self._probes += 1
+
+    def _release(self, *, failed: bool | None, probe: bool) -> None:
+        if probe:
+            self._probes -= 1
+            if failed is True:
+                self._open()
+            elif failed is False:
+                self._state = CircuitState.CLOSED
+            return
+        if failed is None or self._state is not CircuitState.CLOSED:
+            return
+
+        self._outcomes.append((self._clock(), failed))
+        self._prune()
+        if len(self._outcomes) >= self.config.min_requests and self.failure_rate >= self.config.failure_rate:
+            self._open()
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Wrap a request: fail fast if the circuit is open and record the outcome.
+
+        Raises
+        ------
+            CircuitOpenError: The circuit is open, or all half-open probes are taken.
+
+        """
+        self._acquire()
+        probe = self._state is CircuitState.HALF_OPEN
+        started = self._clock()
+        try:
+            yield
+        except Exception as e:
+            self._release(failed=is_failure(e), probe=probe)
+            raise
+        except BaseException:  # Cancelled, the outcome is unknown.
+            self._release(failed=None, probe=probe)
+            raise
+        slow = self.config.slow_request is not None and self._clock() - started > self.config.slow_request
+        self._release(failed=slow, probe=probe)
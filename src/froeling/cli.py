@@ -0,0 +1,188 @@
+"""Command line interface to inspect facilities and export snapshots.
+
+Credentials are read from the options or the FROELING_USERNAME, FROELING_PASSWORD
+and FROELING_TOKEN environment variables. The token is cached between runs, so
+repeated invocations don't log in again.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import sys
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import Any
+
+from froeling import exceptions
+from froeling.arguments import add_client_arguments, token_store
+from froeling.client import Froeling
+from froeling.datamodels import Facility, Parameter
+from froeling.export import COLUMNS, FORMATS, export_snapshot, iter_snapshot
+
+
+def _print_table(rows: Sequence[dict[str, Any]], columns: Sequence[str]) -> None:
+    cells = [[('' if row.get(c) is None else str(row[c])) for c in columns] for row in rows]
+    widths = [max([len(c), *(len(line[i]) for line in cells)]) for i, c in enumerate(columns)]
+    print('  '.join(c.ljust(w) for c, w in zip(columns, widths, strict=True)).rstrip())
+    for line in cells:
+        print('  '.join(cell.ljust(w) for cell, w in zip(line, widths, strict=True)).rstrip())
+
+
+def _output(rows: Sequence[dict[str, Any]], columns: Sequence[str], *, as_json: bool) -> None:
+    if as_json:
+        print(json.dumps([{c: row.get(c) for c in columns} for row in rows], default=str, ensure_ascii=False, indent=2))
+    else:
+        _print_table(rows, columns)
+
+
+def _client(args: argparse.Namespace) -> Froeling:
+    has_credentials = bool(args.username and args.password)
+    store = token_store(args)
+    for token in dict.fromkeys((args.token, None)):
+        try:
+            return Froeling(
+                args.username,
+                args.password,
+                token,
+                auto_reauth=has_credentials,
+                language=args.language,
+                token_store=store,
+            )
+        except ValueError:  # The token is malformed, or there is nothing to authenticate with.
+            continue
+    msg = 'Set --username and --password (or FROELING_USERNAME and FROELING_PASSWORD), or --token.'
+    raise SystemExit(msg)
+
+
+async def _facilities(api: Froeling, args: argparse.Namespace) -> None:
+    rows = [
+        {**vars(f), 'city': f.address and f.address.city, 'country': f.address and f.address.country}
+        for f in await api.get_facilities()
+    ]
+    columns = ('facility_id', 'name', 'status', 'facility_generation', 'city', 'country', 'operation_hours')
+    _output(rows, columns, as_json=args.json)
+
+
+async def _components(api: Froeling, args: argparse.Namespace) -> None:
+    facility = await api.get_facility(args.facility)
+    components = [c for c in await facility.get_components() if c is not None]
+    rows = [vars(c) for c in components]
+    _output(rows, ('component_id', 'display_name', 'display_category', 'type', 'sub_type'), as_json=args.json)
+
+
+async def _selected_facilities(api: Froeling, facility_ids: Iterable[int] | None) -> list[Facility]:
+    if facility_ids:
+        return [await api.get_facility(facility_id) for facility_id in facility_ids]
+    return await api.get_facilities()
+
+
+async def _parameters(api: Froeling, args: argparse.Namespace) -> None:
+    facilities = await _selected_facilities(api, args.facility)
+    rows: list[dict[str, Any]] = []
+    snapshot = iter_snapshot(facilities, concurrency=args.concurrency, fields=args.fields, component_ids=args.component)
+    async for component_rows in snapshot:
+        rows.extend(component_rows)
+    rows.sort(key=lambda r: (r['facility_id'], r['component_id'], r['parameter_id']))
+    columns = COLUMNS if args.json else ('facility_id', 'component_id', 'parameter_id', 'display_name', 'value', 'unit')
+    _output(rows, columns, as_json=args.json)
+
+
+async def _watch(api: Froeling, args: argparse.Namespace) -> None:
+    subscription = await api.subscribe(args.facility, args.parameters)
+    if subscription.missing:
+        print(f'Not found: {", ".join(sorted(subscription.missing))}', file=sys.stderr)
+    previous: dict[str, Any] = {}
+
+    def show(parameters: dict[str, Parameter]) -> None:
+        now = datetime.datetime.now().astimezone().isoformat(timespec='seconds')
+        for parameter_id, parameter in sorted(parameters.items()):
+            if previous.get(parameter_id) != parameter.value:
+                previous[parameter_id] = parameter.value
+                print(f'{now}  {parameter_id:<12} {parameter.display_name}: {parameter.display_value}', flush=True)
+
+    await subscription.run(args.interval, show)
+
+
+async def _export(api: Froeling, args: argparse.Namespace) -> None:
+    result = await export_snapshot(
+        api,
+        args.path,
+        fmt=args.format,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        fields=args.fields,
+    )
+    print(f'Wrote {result.rows} rows of {result.components} components to {args.path}.', file=sys.stderr)
+    if result.errors:
+        print(f'{result.errors} components or facilities failed, see the log.', file=sys.stderr)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='froeling', description=__doc__.splitlines()[0])
+    add_client_arguments(parser)
+    parser.add_argument('-v', '--verbose', action='count', default=0, help='Log more (-vv for debug output).')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    facilities = commands.add_parser('facilities', help='List facilities.')
+    facilities.add_argument('--json', action='store_true', help='Print JSON instead of a table.')
+    facilities.set_defaults(func=_facilities)
+
+    components = commands.add_parser('components', help='List the components of a facility.')
+    components.add_argument('facility', type=int, help='Facility id.')
+    components.add_argument('--json', action='store_true', help='Print JSON instead of a table.')
+    components.set_defaults(func=_components)
+
+    parameters = commands.add_parser('parameters', help='Dump parameters, fetching components concurrently.')
+    parameters.add_argument('--facility', type=int, action='append', help='Only this facility (repeatable).')
+    parameters.add_argument('--component', action='append', help='Only this component id (repeatable).')
+    parameters.add_argument('--fields', nargs='+', help='Views or parameter ids to include.')
+    parameters.add_argument('--concurrency', type=int, default=8, help='Parallel requests (default: %(default)s).')
+    parameters.add_argument('--json', action='store_true', help='Print JSON instead of a table.')
+    parameters.set_defaults(func=_parameters)
+
+    watch = commands.add_parser('watch', help='Print parameters whenever they change.')
+    watch.add_argument('facility', type=int, help='Facility id.')
+    watch.add_argument('parameters', nargs='+', help='Parameter ids.')
+    watch.add_argument('--interval', type=float, default=30, help='Seconds between refreshes (default: %(default)s).')
+    watch.set_defaults(func=_watch)
+
+    export = commands.add_parser('export', help='Export a snapshot of all facilities to a file.')
+    export.add_argument('path', type=Path, help=f'Output file ({", ".join(FORMATS)}).')
+    export.add_argument('--format', choices=sorted(set(FORMATS.values())), help='Override the format.')
+    export.add_argument('--batch-size', type=int, default=10_000, help='Rows per write (default: %(default)s).')
+    export.add_argument('--concurrency', type=int, default=8, help='Parallel requests (default: %(default)s).')
+    export.add_argument('--fields', nargs='+', help='Views or parameter ids to include.')
+    export.set_defaults(func=_export)
+    return parser
+
+
+async def _run(args: argparse.Namespace) -> None:
+    async with _client(args) as api:
+        await args.func(api, args)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the command line interface."""
+    args = _parser().parse_args(argv)
+    logging.basicConfig(level=(logging.WARNING, logging.INFO, logging.DEBUG)[min(args.verbose, 2)])
+    try:
+        asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        return 130
+    except (
+        exceptions.AuthenticationError,
+        exceptions.CircuitOpenError,
+        exceptions.FacilityNotFoundError,
+        exceptions.NetworkError,
+        exceptions.ParsingError,
+        ValueError,
+    ) as e:
+        print(f'Error: {e}', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,15 +1,27 @@
 """Provides the main API Class."""
 
+import asyncio
+import contextlib
 import logging
-from collections.abc import Callable
+from collections.abc import AsyncGenerator, Callable, Collection, Iterable
 from types import TracebackType
 from typing import Any
 
 from aiohttp import ClientSession
 
 from froeling import datamodels, endpoints
+from froeling.cache import LRUCache
+from froeling.circuitbreaker import CircuitBreakerConfig
+from froeling.datamodels.notifications import get_details
+from froeling.events import EventBus, EventType
 from froeling.exceptions import FacilityNotFoundError
-from froeling.session import Session
+from froeling.pipeline import iter_components
+from froeling.profiling import profiled
+from froeling.session import OffloadConfig, Session
+from froeling.subscription import Subscription
+from froeling.supervisor import TaskSupervisor
+from froeling.tokenstore import TokenStore
+from froeling.writequeue import WriteQueue
 
 
 class Froeling:
@@ -19,7 +31,7 @@ class Froeling:
         """Create an API session."""
         try:
             if not self.session.token:
-                await self.login()
+                await self._authenticate()
         except Exception:
             await self.session.close()
             raise
@@ -32,7 +44,7 @@ class Froeling:
         exc_tb: TracebackType | None,
     ) -> bool | None:
         """End an API session."""
-        await self.session.close()
+        await self.close()
         return None
 
     def __init__(
@@ -46,6 +58,13 @@ class Froeling:
         language: str = 'en',
         logger: logging.Logger | None = None,
         clientsession: ClientSession | None = None,
+        base_url: str | None = None,
+        circuit_breaker: CircuitBreakerConfig | None = None,
+        offload: OffloadConfig | None = None,
+        token_store: TokenStore | None = None,
+        conditional_requests: bool = True,
+        notification_cache: LRUCache[int, Any] | None = None,
+        events: EventBus | None = None,
     ) -> None:
         """Initialize a Froeling API client instance.
 
@@ -65,11 +84,28 @@ class Froeling:
                 Defaults to None.
             clientsession (ClientSession | None): Optional aiohttp session to reuse
                 instead of creating a new one. Defaults to None.
+            base_url (str | None): Talk to this scheme and host instead of the official
+                API, e.g. a shared `froeling.proxy` instance. Defaults to None.
+            circuit_breaker (CircuitBreakerConfig | None): Fail fast with `CircuitOpenError`
+                while an endpoint keeps failing. Defaults to None (disabled).
+            offload (OffloadConfig | None): Decode large responses and build large
+                lists of datamodels off the event loop. Defaults to None (disabled).
+            token_store (TokenStore | None): Reuse the stored token instead of logging in
+                while it is valid, and store renewed tokens. Share one store between
+                clients (or a `FileTokenStore` between processes) to log in once. Defaults to None.
+            conditional_requests (bool): Send `If-None-Match`/`If-Modified-Since` for facilities,
+                components and notifications, and reuse the previous response when they didn't
+                change. Defaults to True.
+            notification_cache (LRUCache[int, Any] | None): Cache of notification details.
+                Defaults to None (up to 256 details and about 1 MiB).
+            events (EventBus | None): Event bus to publish updates to, e.g. one shared
+                by the clients of several accounts. Defaults to None (a new one).
 
         """
         # cached data (does not change often)
         self._userdata: datamodels.UserData | None = None
         self._facilities: dict[int, datamodels.Facility] = {}
+        self._notification_ids: set[int] = set()
 
         self.session = Session(
             username,
@@ -80,8 +116,17 @@ class Froeling:
             lang=language,
             logger=logger,
             clientsession=clientsession,
+            base_url=base_url,
+            circuit_breaker=circuit_breaker,
+            offload=offload,
+            token_store=token_store,
+            conditional_requests=conditional_requests,
+            notification_cache=notification_cache,
+            events=events,
         )
         self._logger = logger or logging.getLogger(__name__)
+        self.supervisor = TaskSupervisor(logger=self._logger)
+        self.writes = WriteQueue(logger=self._logger)
 
     async def login(self) -> datamodels.UserData:
         """Log in with the username and password."""
@@ -89,8 +134,16 @@ class Froeling:
         self._userdata = datamodels.UserData._from_dict(data)  # noqa: SLF001
         return self._userdata
 
+    async def _authenticate(self) -> None:
+        """Log in, unless another client sharing the token store already did."""
+        data = await self.session.renew_token()
+        if data is not None:
+            self._userdata = datamodels.UserData._from_dict(data)  # noqa: SLF001
+
     async def close(self) -> None:
-        """Close the session."""
+        """Stop background tasks, wait for pending writes and close the session."""
+        await self.supervisor.close()
+        await self.writes.close()
         await self.session.close()
 
     @property
@@ -98,6 +151,11 @@ class Froeling:
         """The user's id."""
         return self.session.user_id
 
+    @property
+    def events(self) -> EventBus:
+        """Bus the client publishes component, parameter, notification and token events to."""
+        return self.session.events
+
     @property
     def token(self) -> str | None:
         """The user's token."""
@@ -116,8 +174,11 @@ class Froeling:
 
     async def _get_facilities(self) -> list[datamodels.Facility]:
         """Fetch all facilities connected with the account and cache them."""
-        res = await self.session.request('get', endpoints.FACILITY.format(self.session.user_id))
-        return datamodels.Facility._from_list(res, self.session)  # noqa: SLF001
+        return await self.session.get_model(
+            endpoints.FACILITY.format(self.session.user_id),
+            datamodels.Facility._from_list,  # noqa: SLF001
+            self.session,
+        )
 
     async def get_facilities(self) -> list[datamodels.Facility]:
         """Get all cacilities connected with this account (cached)."""
@@ -135,6 +196,70 @@ class Froeling:
             raise FacilityNotFoundError(facility_id)
         return self._facilities[facility_id]
 
+    async def iter_components(
+        self,
+        facility_ids: Iterable[int] | None = None,
+        *,
+        concurrency: int = 8,
+        ordered: bool = False,
+        fields: Iterable[str] | None = None,
+        component_ids: Collection[str] | None = None,
+        on_error: Callable[[Exception], Any] | None = None,
+    ) -> AsyncGenerator[datamodels.Component, None]:
+        """Update the components of all facilities and yield each one as soon as it is updated.
+
+        At most `concurrency` components are being updated or waiting to be consumed,
+        so processing overlaps with fetching the next ones, and at most `concurrency`
+        requests (component lists and updates together) are in flight. Facilities and
+        components that fail are logged and skipped.
+
+        Args:
+        ----
+            facility_ids (Iterable[int] | None): Only update components of these facilities.
+                Defaults to None (all).
+            concurrency (int): Most components in flight or buffered, and most requests in flight.
+                Defaults to 8.
+            ordered (bool): Keep the order of facilities and components instead of yielding
+                components as soon as they are updated. Defaults to False.
+            fields (Iterable[str] | None): Projection passed to `Component.update`. Defaults to None.
+            component_ids (Collection[str] | None): Only update components with these ids.
+                Defaults to None (all).
+            on_error (Callable[[Exception], Any] | None): Called with the exception of every
+                skipped facility or component. Defaults to None.
+
+        """
+        if facility_ids is None:
+            facilities = await self.get_facilities()
+        else:
+            facilities = [await self.get_facility(i) for i in facility_ids]
+        components = iter_components(
+            facilities,
+            concurrency=concurrency,
+            ordered=ordered,
+            fields=fields,
+            component_ids=component_ids,
+            on_error=on_error,
+            logger=self._logger,
+        )
+        async with contextlib.aclosing(components):
+            async for component in components:
+                yield component
+
+    async def iter_parameters(
+        self,
+        facility_ids: Iterable[int] | None = None,
+        **options: Any,
+    ) -> AsyncGenerator[datamodels.Parameter, None]:
+        """Yield the parameters of every component as soon as the component is updated.
+
+        Takes the same arguments as `iter_components`.
+        """
+        components = self.iter_components(facility_ids, **options)
+        async with contextlib.aclosing(components):
+            async for component in components:
+                for parameter in component.parameters.values():
+                    yield parameter
+
     async def get_notification_count(self) -> int:
         """Fetch the unread notification count."""
         return (await self.session.request('get', endpoints.NOTIFICATION_COUNT.format(self.session.user_id)))[
@@ -142,18 +267,68 @@ class Froeling:
         ]
 
     async def get_notifications(self) -> list[datamodels.NotificationOverview]:
-        """Fetch an overview of all notifications."""
-        res = await self.session.request('get', endpoints.NOTIFICATION_LIST.format(self.session.user_id))
-        return [datamodels.NotificationOverview(n, self.session) for n in res]
+        """Fetch an overview of all notifications.
+
+        Publishes `NOTIFICATION_RECEIVED` for each notification this client hasn't seen before.
+        """
+        notifications = await self.session.get_model(
+            endpoints.NOTIFICATION_LIST.format(self.session.user_id), _notifications, self.session
+        )
+        for notification in notifications:
+            if notification.id is not None and notification.id not in self._notification_ids:
+                self._notification_ids.add(notification.id)
+                self.events.emit(
+                    EventType.NOTIFICATION_RECEIVED,
+                    facility_id=notification.facility_id,
+                    notification_id=notification.id,
+                    data=notification,
+                )
+        return notifications
 
-    async def get_notification(self, notification_id: int) -> datamodels.NotificationDetails:
-        """Fetch all details for a specific notification."""
-        res = await self.session.request('get', endpoints.NOTIFICATION.format(self.session.user_id, notification_id))
-        return datamodels.NotificationDetails._from_dict(res)  # noqa: SLF001
+    async def get_notification(self, notification_id: int, *, refresh: bool = False) -> datamodels.NotificationDetails:
+        """Get all details for a specific notification (cached, unless `refresh` is set)."""
+        return await get_details(self.session, notification_id, refresh=refresh)
+
+    async def get_notification_details(
+        self,
+        notifications: Iterable[datamodels.NotificationOverview],
+        *,
+        concurrency: int = 4,
+    ) -> list[datamodels.NotificationDetails]:
+        """Get the details of many notifications, fetching at most `concurrency` at a time.
+
+        Cached details are not fetched again. Sets `details` of every notification.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def info(notification: datamodels.NotificationOverview) -> datamodels.NotificationDetails:
+            async with semaphore:
+                return await notification.info()
+
+        return await asyncio.gather(*(info(n) for n in notifications))
+
+    async def subscribe(self, facility_id: int, parameter_ids: Iterable[str]) -> Subscription:
+        """Subscribe to parameters of a facility.
+
+        Finds the components providing the parameters and plans the minimal set of
+        requests. Call `Subscription.refresh` (or `run`) to fetch their values.
+        """
+        subscription = Subscription(await self.get_facility(facility_id), parameter_ids, logger=self._logger)
+        await subscription.discover()
+        return subscription
 
     def get_component(self, facility_id: int, component_id: str) -> datamodels.Component:
         """Get a specific component given it's facility_id and component_id.
 
         Call the update method for this component to populate it's attributes.
+        If the facility was already fetched, updates are added to its `parameter_index`.
         """
+        facility = self._facilities.get(facility_id)
+        if facility:
+            return facility.get_component(component_id)
         return datamodels.Component(facility_id, component_id, self.session)
+
+
+@profiled
+def _notifications(data: list[dict], session: Session) -> list[datamodels.NotificationOverview]:
+    return [datamodels.NotificationOverview(n, session) for n in data]
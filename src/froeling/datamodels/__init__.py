@@ -3,6 +3,9 @@
 from froeling.datamodels.component import Component, Parameter
 from froeling.datamodels.facility import Facility
 from froeling.datamodels.notifications import NotificationDetails, NotificationOverview
+from froeling.datamodels.parameter_index import ParameterIndex
+from froeling.datamodels.schedule import PhaseChange, WeeklySchedule
+from froeling.datamodels.snapshots import ComponentSnapshot, FacilitySnapshot, NotificationSnapshot, ParameterSnapshot
 from froeling.datamodels.userdata import Address, UserData
 
 __all__ = [
@@ -13,4 +16,11 @@ __all__ = [
     'Facility',
     'Component',
     'Parameter',
+    'ParameterIndex',
+    'WeeklySchedule',
+    'PhaseChange',
+    'FacilitySnapshot',
+    'ComponentSnapshot',
+    'ParameterSnapshot',
+    'NotificationSnapshot',
 ]
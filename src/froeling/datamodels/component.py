@@ -1,12 +1,18 @@
 """Represents Components and their Parameters."""
 
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from http import HTTPStatus
-from typing import Any
+from typing import Any, cast
 
 from froeling import endpoints
 from froeling.datamodels.generics import TimeWindowDay
+from froeling.datamodels.parameter_index import ParameterIndex
+from froeling.datamodels.schedule import WeeklySchedule
+from froeling.datamodels.snapshots import ComponentSnapshot, ParameterSnapshot
+from froeling.events import EventType
 from froeling.exceptions import NetworkError
+from froeling.profiling import profiled
 from froeling.session import Session
 
 
@@ -52,25 +58,40 @@ class Component:
 
     raw: dict
 
-    def __init__(self, facility_id: int, component_id: str, session: Session):
+    def __init__(
+        self,
+        facility_id: int,
+        component_id: str,
+        session: Session,
+        parameter_index: ParameterIndex | None = None,
+    ):
         """Initialize a Component with minimal identifying information."""
         self.facility_id = facility_id
         self.component_id = component_id
         self._session = session
+        self._parameter_index = parameter_index
 
         self.time_windows_view = None
         self.picture_url = None
         self.parameters = {}
         self.raw = {}
+        self._projection: tuple[frozenset[str], frozenset[str]] | None = None
 
     @classmethod
-    def _from_overview_data(cls, facility_id: int, session: Session, obj: dict) -> 'Component | None':
+    @profiled
+    def _from_overview_data(
+        cls,
+        facility_id: int,
+        session: Session,
+        obj: dict,
+        parameter_index: ParameterIndex | None = None,
+    ) -> 'Component | None':
         """Create a new component and populate it with overview data."""
         component_id = obj.get('componentId')
         if not isinstance(component_id, str):
             return None
 
-        component = cls(facility_id, component_id, session)
+        component = cls(facility_id, component_id, session, parameter_index)
         component.display_name = obj.get('displayName')
         component.display_category = obj.get('displayCategory')
         component.standard_name = obj.get('standardName')
@@ -83,20 +104,131 @@ class Component:
         """Return a string representation of this component."""
         return f'Component([Facility {self.facility_id}] -> {self.component_id})'
 
-    async def update(self) -> dict[str, 'Parameter']:
-        """Update the Parameters of this component."""
+    def __reduce__(self) -> tuple:
+        """Pickle the data of this component, without its session."""
+        return (type(self).from_dict, (self.to_dict(),))
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize this component into JSON compatible builtins, see `from_dict`.
+
+        `raw` is left out, it repeats the parameters and time windows.
+        """
+        return {
+            'facility_id': self.facility_id,
+            'component_id': self.component_id,
+            'display_name': getattr(self, 'display_name', None),
+            'display_category': getattr(self, 'display_category', None),
+            'standard_name': getattr(self, 'standard_name', None),
+            'type': getattr(self, 'type', None),
+            'sub_type': getattr(self, 'sub_type', None),
+            'picture_url': self.picture_url,
+            'time_windows_view': None if self.time_windows_view is None else [d.raw for d in self.time_windows_view],
+            'parameters': [p.raw for p in self.parameters.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], session: Session | None = None) -> 'Component':
+        """Restore a component created by `to_dict`.
+
+        Without a session the component can only be read, pass one (or `attach` one
+        later) to update it.
+        """
+        session = cast('Session', session)
+        component = cls(data['facility_id'], data['component_id'], session)
+        component.display_name = data.get('display_name')
+        component.display_category = data.get('display_category')
+        component.standard_name = data.get('standard_name')
+        component.type = data.get('type')
+        component.sub_type = data.get('sub_type')
+        component.picture_url = data.get('picture_url')
+        time_windows = data.get('time_windows_view')
+        if time_windows is not None:
+            component.time_windows_view = TimeWindowDay._from_list(time_windows)  # noqa: SLF001
+        component.parameters = Parameter._from_list(data.get('parameters', []), session, component.facility_id)  # noqa: SLF001
+        return component
+
+    def snapshot(self) -> ComponentSnapshot:
+        """Get an immutable, session-free copy of the current values, see `froeling.datamodels.snapshots`."""
+        return ComponentSnapshot(
+            self.facility_id,
+            self.component_id,
+            getattr(self, 'display_name', None),
+            getattr(self, 'display_category', None),
+            getattr(self, 'standard_name', None),
+            getattr(self, 'type', None),
+            getattr(self, 'sub_type', None),
+            self.picture_url,
+            self.schedule,
+            tuple(p.snapshot() for p in self.parameters.values()),
+        )
+
+    def attach(self, session: Session) -> None:
+        """Use `session` for requests of this component and its parameters, e.g. after `from_dict`."""
+        self._session = session
+        for parameter in self.parameters.values():
+            parameter.session = session
+
+    async def update(self, fields: Iterable[str] | None = None) -> dict[str, 'Parameter']:
+        """Update the Parameters of this component.
+
+        If the server answers 304 Not Modified, the parameters parsed from the
+        previous response with the same `fields` are kept.
+        Publishes `PARAMETER_CHANGED` for new values, then `COMPONENT_UPDATED`
+        (or `ERROR`) to the session's event bus.
+
+        Args:
+        ----
+            fields (Iterable[str] | None): Only parse and store part of the component.
+                Items can be view names from `VIEWS` and parameter ids. Parameter ids
+                restrict the selected views (or all parameter views if none are selected)
+                to these parameters. Parameters outside the projection are not kept in
+                `parameters`. Defaults to None (everything).
+
+        """
+        events = self._session.events
+        ids = {'facility_id': self.facility_id, 'component_id': self.component_id}
+        previous = None
+        if events.wants(EventType.PARAMETER_CHANGED):
+            previous = {parameter_id: p.value for parameter_id, p in self.parameters.items()}
+        try:
+            parameters = await self._update(fields)
+        except Exception as e:
+            events.emit(EventType.ERROR, **ids, data=self, error=e)
+            raise
+
+        if previous is not None:
+            for parameter_id, parameter in parameters.items():
+                if parameter_id not in previous or previous[parameter_id] != parameter.value:
+                    events.emit(
+                        EventType.PARAMETER_CHANGED,
+                        **ids,
+                        parameter_id=parameter_id,
+                        value=parameter.value,
+                        previous=previous.get(parameter_id),
+                        data=parameter,
+                    )
+        events.emit(EventType.COMPONENT_UPDATED, **ids, data=self)
+        return parameters
+
+    async def _update(self, fields: Iterable[str] | None) -> dict[str, 'Parameter']:
         res = await self._session.request(
             'get',
             endpoints.COMPONENT.format(self._session.user_id, self.facility_id, self.component_id),
         )
+        projection = _split_fields(fields)
+        if res is self.raw and projection == self._projection:
+            return self.parameters
         self.raw = res
+        self._projection = projection
         self.component_id = res.get('componentId')  # This should not be able to change.
         self.display_name = res.get('displayName')
         self.display_category = res.get('displayCategory')
         self.standard_name = res.get('standardName')
         self.type = res.get('type')
         self.sub_type = res.get('subType')
-        if res.get('timeWindowsView'):
+
+        views, parameter_ids = projection
+        if 'timeWindowsView' in views and res.get('timeWindowsView'):
             self.time_windows_view = TimeWindowDay._from_list(res['timeWindowsView'])  # noqa: SLF001
 
         #  TODO: Find endpoint that gives all parameters
@@ -105,20 +237,51 @@ class Component:
         parameters: dict[str, dict] = {}
         if topview:
             self.picture_url = topview.get('pictureUrl')
-            if 'pictureParams' in topview:
-                parameters |= topview.get('pictureParams')
-            if 'infoParams' in topview:
-                parameters |= topview.get('infoParams')
-            if 'configParams' in topview:
-                parameters |= topview.get('configParams')
-        if 'stateView' in res:
-            parameters |= {i['name']: i for i in res.get('stateView')}
-        if 'setupView' in res:
-            parameters |= {i['name']: i for i in res.get('setupView')}
-
-        self.parameters = Parameter._from_list(list(parameters.values()), self._session, self.facility_id)  # noqa: SLF001
+            for view in ('pictureParams', 'infoParams', 'configParams'):
+                if view in views and view in topview:
+                    parameters |= topview[view]
+        for view in ('stateView', 'setupView'):
+            if view in views and view in res:
+                parameters |= {i['name']: i for i in res[view]}
+
+        selected = list(parameters.values())
+        if parameter_ids:
+            selected = [p for p in selected if p.get('id') in parameter_ids]
+        self.parameters = await self._session.offload(
+            Parameter._from_list,  # noqa: SLF001
+            selected,
+            self._session,
+            self.facility_id,
+            items=len(selected),
+        )
+        if self._parameter_index is not None:
+            # Requested ids that are missing only went away if every view holding parameters was read.
+            requested = parameter_ids if views >= _PARAMETER_VIEWS else frozenset()
+            self._parameter_index.update(self, replace=fields is None, requested=requested)
         return self.parameters
 
+    @property
+    def schedule(self) -> WeeklySchedule | None:
+        """The time windows as a `WeeklySchedule`, or None if they weren't fetched."""
+        if self.time_windows_view is None:
+            return None
+        return WeeklySchedule.from_time_windows(self.time_windows_view)
+
+
+VIEWS = frozenset({'pictureParams', 'infoParams', 'configParams', 'stateView', 'setupView', 'timeWindowsView'})
+"""Parts of a component response that `Component.update` can be limited to."""
+
+_PARAMETER_VIEWS = VIEWS - {'timeWindowsView'}
+
+
+def _split_fields(fields: Iterable[str] | None) -> tuple[frozenset[str], frozenset[str]]:
+    """Split an update projection into view names and parameter ids."""
+    if fields is None:
+        return VIEWS, frozenset()
+    fields = frozenset(fields)
+    views = fields & VIEWS
+    return views or _PARAMETER_VIEWS, fields - VIEWS
+
 
 @dataclass
 class Parameter:
@@ -141,6 +304,7 @@ class Parameter:
     raw: dict = field(repr=False, default_factory=dict)
 
     @classmethod
+    @profiled
     def _from_dict(cls, obj: dict, session: Session, facility_id: int) -> 'Parameter':
         parameter_id = obj['id']
         display_name = obj.get('displayName')
@@ -170,10 +334,40 @@ class Parameter:
         )
 
     @classmethod
+    @profiled
     def _from_list(cls, obj: list[dict], session: Session, facility_id: int) -> dict[str, 'Parameter']:
         """Turn a list of api response dicts into a list of parameter object."""
         return {p.id: p for p in (cls._from_dict(i, session, facility_id) for i in obj)}
 
+    def __reduce__(self) -> tuple:
+        """Pickle the data of this parameter, without its session."""
+        return (type(self).from_dict, (self.to_dict(),))
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize this parameter into JSON compatible builtins, see `from_dict`."""
+        return {'facility_id': self.facility_id, 'raw': self.raw}
+
+    def snapshot(self) -> ParameterSnapshot:
+        """Get an immutable, session-free copy of the current values."""
+        return ParameterSnapshot(
+            self.facility_id,
+            self.id,
+            self.display_name,
+            self.name,
+            self.editable,
+            self.parameter_type,
+            self.unit,
+            self.value,
+            self.min_val,
+            self.max_val,
+            None if self.string_list_key_values is None else tuple(self.string_list_key_values.items()),
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], session: Session | None = None) -> 'Parameter':
+        """Restore a parameter created by `to_dict`, optionally attaching a session."""
+        return cls._from_dict(data['raw'], cast('Session', session), data['facility_id'])
+
     @property
     def display_value(self) -> str:
         """Combine the value with it's unit."""
@@ -183,6 +377,24 @@ class Parameter:
             return f'{self.value} {self.unit}'
         return str(self.value)
 
+    @property
+    def typed_value(self) -> int | float | str | None:
+        """The value converted to a number for numeric parameters.
+
+        Values of other parameter types, and numeric values that can't be parsed,
+        are returned unchanged.
+        """
+        if self.parameter_type != 'NumValueObject' or not isinstance(self.value, str):
+            return self.value
+        try:
+            return int(self.value)
+        except ValueError:
+            pass
+        try:
+            return float(self.value)
+        except ValueError:
+            return self.value
+
     async def set_value(self, value: Any) -> Any | None:
         """Set the value of this parameter.
 
@@ -191,12 +403,25 @@ class Parameter:
         Returns None if the value was already the same.
         """
         try:
-            return await self.session.request(
-                'put',
-                endpoints.SET_PARAMETER.format(self.session.user_id, self.facility_id, self.id),
-                json={'value': str(value)},
-            )
+            return await self.put_value(value)
         except NetworkError as e:
             if e.status == HTTPStatus.NOT_MODIFIED:
                 return None
             raise
+
+    async def put_value(self, value: Any) -> Any:
+        """Set the value of this parameter, like `set_value`, but without hiding 304 Not Modified.
+
+        Returns the response, None if it has no body.
+
+        Raises
+        ------
+            NetworkError: With status 304 if the parameter already had this value,
+                or any other status the server answered with.
+
+        """
+        return await self.session.request(
+            'put',
+            endpoints.SET_PARAMETER.format(self.session.user_id, self.facility_id, self.id),
+            json={'value': str(value)},
+        )
@@ -1,16 +1,24 @@
 """Dataclasses relating to Facilities."""
 
 from dataclasses import dataclass, field
+from typing import Any, cast
 
 from froeling import endpoints
 from froeling.datamodels.component import Component
 from froeling.datamodels.generics import Address
+from froeling.datamodels.parameter_index import ParameterIndex
+from froeling.datamodels.snapshots import FacilitySnapshot, freeze
+from froeling.profiling import profiled
 from froeling.session import Session
 
 
 @dataclass(frozen=True)
 class Facility:
-    """Represents data related to a facility."""
+    """Represents data related to a facility.
+
+    `parameter_index` collects the parameters of all components of this facility
+    that were updated after being obtained through `get_components` or `get_component`.
+    """
 
     session: Session
     facility_id: int
@@ -29,8 +37,10 @@ class Facility:
     operation_hours: int | None
     facility_generation: str | None
     raw: dict = field(repr=False, default_factory=dict)
+    parameter_index: ParameterIndex = field(init=False, repr=False, compare=False, default_factory=ParameterIndex)
 
     @staticmethod
+    @profiled
     def _from_dict(obj: dict, session: Session) -> 'Facility':
         facility_id = obj.get('facilityId')
         if not isinstance(facility_id, int):
@@ -89,20 +99,63 @@ class Facility:
         )
 
     @staticmethod
+    @profiled
     def _from_list(obj: list, session: Session) -> list['Facility']:
         return [Facility._from_dict(i, session) for i in obj]
 
+    def __reduce__(self) -> tuple:
+        """Pickle the data of this facility, without its session."""
+        return (Facility.from_dict, (self.to_dict(),))
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize this facility into JSON compatible builtins, see `from_dict`."""
+        return {'raw': self.raw}
+
+    def snapshot(self) -> FacilitySnapshot:
+        """Get an immutable, session-free copy of the current values."""
+        address = self.address
+        if address is not None:
+            address = Address(address.street, address.zip, address.city, address.country)
+        return FacilitySnapshot(
+            self.facility_id,
+            self.equipment_number,
+            self.status,
+            self.name,
+            address,
+            self.owner,
+            self.role,
+            self.favorite,
+            self.allow_messages,
+            self.subscribed_notifications,
+            self.picture_url,
+            freeze(self.protocol_3200_info),
+            self.hours_since_last_maintenance,
+            self.operation_hours,
+            self.facility_generation,
+        )
+
+    @staticmethod
+    def from_dict(data: dict[str, Any], session: Session | None = None) -> 'Facility':
+        """Restore a facility created by `to_dict`.
+
+        Without a session the facility can only be read. The parameter index starts empty.
+        """
+        return Facility._from_dict(data['raw'], cast('Session', session))
+
     async def get_components(self) -> list[Component | None]:
         """Fetch all components of this facility (not cached)."""
         res = await self.session.request(
             'get',
             endpoints.COMPONENT_LIST.format(self.session.user_id, self.facility_id),
         )
-        return [Component._from_overview_data(self.facility_id, self.session, i) for i in res]  # noqa: SLF001
+        return [
+            Component._from_overview_data(self.facility_id, self.session, i, self.parameter_index)  # noqa: SLF001
+            for i in res
+        ]
 
     def get_component(self, component_id: str) -> Component:
         """Get a component given it's id.
 
         Data will not be initialized, call the Component.update method to fetch them.
         """
-        return Component(self.facility_id, component_id, self.session)
+        return Component(self.facility_id, component_id, self.session, self.parameter_index)
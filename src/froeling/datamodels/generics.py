@@ -3,6 +3,8 @@
 from dataclasses import dataclass, field
 from enum import Enum
 
+from froeling.profiling import profiled
+
 
 @dataclass(frozen=True)
 class Address:
@@ -20,7 +22,7 @@ class Address:
     zip: int | None
     city: str | None
     country: str | None
-    raw: dict = field(repr=False, default_factory=dict)
+    raw: dict = field(repr=False, compare=False, default_factory=dict)
 
     @staticmethod
     def _from_dict(obj: dict) -> 'Address':
@@ -68,6 +70,7 @@ class TimeWindowDay:
         return cls(_id, weekday, phases, obj)
 
     @classmethod
+    @profiled
     def _from_list(cls, obj: list) -> list['TimeWindowDay']:
         return [cls._from_dict(i) for i in obj]
 
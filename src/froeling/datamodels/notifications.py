@@ -2,12 +2,14 @@
 
 import datetime
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, cast
 
 if TYPE_CHECKING:
     from froeling.session import Session
 
 from froeling import endpoints
+from froeling.datamodels.snapshots import NotificationSnapshot
+from froeling.profiling import profiled
 
 
 class NotificationOverview:
@@ -47,10 +49,48 @@ class NotificationOverview:
         self.facility_id = data.get('facilityId')
         self.facility_name = data.get('facilityName')
 
-    async def info(self) -> 'NotificationDetails':
-        """Get additional information about this notification."""
-        res = await self.session.request('get', endpoints.NOTIFICATION.format(self.session.user_id, self.id))
-        self.details = NotificationDetails._from_dict(res)  # noqa: SLF001
+    def __reduce__(self) -> tuple:
+        """Pickle the data of this notification, without its session."""
+        return (type(self).from_dict, (self.to_dict(),))
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize this notification into JSON compatible builtins, see `from_dict`."""
+        data: dict[str, Any] = {'raw': self.raw}
+        if hasattr(self, 'details'):
+            data['details'] = self.details.to_dict()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], session: 'Session | None' = None) -> 'NotificationOverview':
+        """Restore a notification created by `to_dict`, optionally attaching a session."""
+        notification = cls(data['raw'], cast('Session', session))
+        if 'details' in data:
+            notification.details = NotificationDetails.from_dict(data['details'])
+        return notification
+
+    def snapshot(self) -> NotificationSnapshot:
+        """Get an immutable, session-free copy of the current values, including details if fetched."""
+        details = self if isinstance(self, NotificationDetails) else getattr(self, 'details', None)
+        return NotificationSnapshot(
+            self.id,
+            self.subject,
+            self.unread,
+            self.date,
+            self.error_id,
+            self.type,
+            self.facility_id,
+            self.facility_name,
+            details.body if details else None,
+            tuple((s.error_reason, s.error_solution) for s in details.error_solutions or ()) if details else None,
+        )
+
+    async def info(self, *, refresh: bool = False) -> 'NotificationDetails':
+        """Get additional information about this notification.
+
+        Details don't change once issued, so they are cached in the session's
+        `notification_cache`. Pass `refresh=True` to fetch them again anyway.
+        """
+        self.details = await get_details(self.session, cast('int', self.id), refresh=refresh)
         return self.details
 
 
@@ -66,6 +106,7 @@ class NotificationDetails(NotificationOverview):
     error_solutions: list['NotificationErrorSolution'] | None
 
     @classmethod
+    @profiled
     def _from_dict(cls, obj: dict) -> 'NotificationDetails':
         body = obj.get('body')
         sms = obj.get('sms')
@@ -81,6 +122,15 @@ class NotificationDetails(NotificationOverview):
         notification_details_object._set_data(obj)  # noqa: SLF001
         return notification_details_object
 
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize these details into JSON compatible builtins, see `from_dict`."""
+        return {'raw': self.raw}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], session: 'Session | None' = None) -> 'NotificationDetails':  # noqa: ARG003
+        """Restore details created by `to_dict`. They don't need a session."""
+        return cls._from_dict(data['raw'])
+
 
 @dataclass
 class NotificationSubmissionState:
@@ -126,3 +176,15 @@ class NotificationErrorSolution:
     @classmethod
     def _from_list(cls, obj: list[dict]) -> list['NotificationErrorSolution']:
         return [cls(i['errorReason'], i['errorSolution']) for i in obj]
+
+
+async def get_details(session: 'Session', notification_id: int, *, refresh: bool = False) -> NotificationDetails:
+    """Get the details of a notification from the session's `notification_cache`, fetching them on a miss."""
+
+    async def fetch() -> NotificationDetails:
+        res = await session.request('get', endpoints.NOTIFICATION.format(session.user_id, notification_id))
+        return NotificationDetails._from_dict(res)  # noqa: SLF001
+
+    if refresh:
+        session.notification_cache.pop(notification_id)
+    return await session.notification_cache.get_or_fetch(notification_id, fetch)
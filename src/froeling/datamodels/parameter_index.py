@@ -0,0 +1,133 @@
+"""Facility-wide lookup of parameters across components."""
+
+import re
+from bisect import bisect_left
+from collections.abc import Iterable
+from itertools import islice
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from froeling.datamodels.component import Component, Parameter
+
+
+def _names(parameter: 'Parameter') -> set[str]:
+    return {name for name in (parameter.name, parameter.display_name) if name}
+
+
+class IndexEntry(NamedTuple):
+    """A parameter together with the component it was fetched from."""
+
+    component: 'Component'
+    parameter: 'Parameter'
+
+
+class ParameterIndex:
+    """Maps parameter ids, names and display names to parameters of a facility.
+
+    Every `Component` obtained through its `Facility` adds its parameters to the
+    facility's index when it is updated, so the index only knows parameters of
+    components that were updated at least once.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty index."""
+        self._by_id: dict[str, IndexEntry] = {}
+        self._by_name: dict[str, dict[str, IndexEntry]] = {}
+        self._by_component: dict[str, set[str]] = {}
+        self._sorted_keys: list[str] | None = None
+
+    def __len__(self) -> int:
+        """Return the number of indexed parameters."""
+        return len(self._by_id)
+
+    def __contains__(self, parameter_id: object) -> bool:
+        """Whether a parameter id is indexed."""
+        return parameter_id in self._by_id
+
+    def update(self, component: 'Component', *, replace: bool = True, requested: Iterable[str] = ()) -> None:
+        """Index the current parameters of a component.
+
+        Args:
+        ----
+            component (Component): The updated component.
+            replace (bool): Whether `component.parameters` is the complete set of the
+                component's parameters. Parameters the component no longer has are
+                then removed. Defaults to True.
+            requested (Iterable[str]): Parameter ids a partial update (`replace=False`)
+                asked for. The ones missing from `component.parameters` are removed.
+                Defaults to none.
+
+        """
+        new_ids = set(component.parameters)
+        old_ids = self._by_component.get(component.component_id, set())
+        removed = old_ids - new_ids if replace else old_ids & set(requested) - new_ids
+        for parameter_id in removed:
+            self._remove(component.component_id, parameter_id)
+        self._by_component[component.component_id] = new_ids if replace else (old_ids - removed) | new_ids
+
+        for parameter in component.parameters.values():
+            entry = IndexEntry(component, parameter)
+            previous = self._by_id.get(parameter.id)
+            if previous:
+                self._unname(previous)
+            self._by_id[parameter.id] = entry
+            for name in _names(parameter):
+                self._by_name.setdefault(name, {})[parameter.id] = entry
+        self._sorted_keys = None
+
+    def _remove(self, component_id: str, parameter_id: str) -> None:
+        entry = self._by_id.get(parameter_id)
+        if entry and entry.component.component_id == component_id:
+            del self._by_id[parameter_id]
+            self._unname(entry)
+
+    def _unname(self, entry: IndexEntry) -> None:
+        for name in _names(entry.parameter):
+            entries = self._by_name.get(name)
+            if entries is not None:
+                entries.pop(entry.parameter.id, None)
+                if not entries:
+                    del self._by_name[name]
+
+    def get(self, parameter_id: str) -> IndexEntry | None:
+        """Look up a parameter by its id."""
+        return self._by_id.get(parameter_id)
+
+    def find(self, name: str) -> list[IndexEntry]:
+        """Look up parameters by their `name` or `display_name`."""
+        return list(self._by_name.get(name, {}).values())
+
+    def search(self, prefix: str | None = None, pattern: str | re.Pattern[str] | None = None) -> list[IndexEntry]:
+        """Find parameters whose id, name or display name starts with `prefix` and/or matches `pattern`.
+
+        Args:
+        ----
+            prefix (str | None): Case-sensitive prefix. Defaults to None.
+            pattern (str | re.Pattern[str] | None): Regular expression, matched anywhere
+                using `re.search`. Defaults to None.
+
+        """
+        candidates = list(self._by_id.values()) if prefix is None else self._prefix_search(prefix)
+        if pattern is None:
+            return candidates
+
+        regex = re.compile(pattern)
+        return [
+            e
+            for e in candidates
+            if any(regex.search(key) for key in (e.parameter.id, e.parameter.name, e.parameter.display_name) if key)
+        ]
+
+    def _prefix_search(self, prefix: str) -> list[IndexEntry]:
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(self._by_id.keys() | self._by_name.keys())
+        found: dict[str, IndexEntry] = {}
+        for key in islice(self._sorted_keys, bisect_left(self._sorted_keys, prefix), None):
+            if not key.startswith(prefix):
+                break
+            if key in self._by_id:
+                entry = self._by_id[key]
+                found[entry.parameter.id] = entry
+            for entry in self._by_name.get(key, {}).values():
+                found[entry.parameter.id] = entry
+        return list(found.values())
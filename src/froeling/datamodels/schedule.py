@@ -0,0 +1,194 @@
+"""Weekly heating schedules built from and diffed against component time windows."""
+
+import datetime
+import re
+from bisect import bisect_right
+from collections.abc import Collection, Iterable, Mapping
+from dataclasses import dataclass
+
+from froeling.datamodels.generics import TimeWindowDay, TimeWindowPhase, Weekday
+
+MINUTES_PER_DAY = 24 * 60
+WEEKDAYS = tuple(Weekday)
+"""Weekdays in the order of `datetime.date.weekday()`."""
+
+_PHASE_PATTERN = re.compile(r'(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})')
+
+Phase = tuple[int, int]
+"""Start and end of a phase in minutes since midnight. An end of 1440 means 24:00."""
+
+
+def phase_of(phase: TimeWindowPhase) -> Phase:
+    """Convert an API time window phase into a `Phase`."""
+    return (phase.start_hour * 60 + phase.start_minute, phase.end_hour * 60 + phase.end_minute)
+
+
+def _phases(day: TimeWindowDay) -> list[Phase]:
+    # Unused phase slots are reported with the same start and end, e.g. 00:00-00:00.
+    return [phase for phase in map(phase_of, day.phases) if phase[0] < phase[1]]
+
+
+def _phase_dict(phase: Phase) -> dict:
+    start, end = phase
+    return {'startHour': start // 60, 'startMinute': start % 60, 'endHour': end // 60, 'endMinute': end % 60}
+
+
+@dataclass(frozen=True)
+class PhaseChange:
+    """A single phase that differs between the current and the desired schedule.
+
+    Attributes:
+        weekday (Weekday): Day of the phase.
+        index (int): Position of the phase within the day.
+        old (Phase | None): Current phase, None if the desired schedule adds it.
+        new (Phase | None): Desired phase, None if the desired schedule removes it.
+
+    """
+
+    weekday: Weekday
+    index: int
+    old: Phase | None
+    new: Phase | None
+
+
+class WeeklySchedule:
+    """An immutable weekly schedule of active phases.
+
+    The phases of the whole week are kept as sorted minute-of-week intervals,
+    so `is_active` is a single binary search. A schedule may cover only some
+    weekdays: the others have no phases, and `diff` leaves them as they are.
+    """
+
+    def __init__(self, days: Mapping[Weekday, Iterable[Phase]]) -> None:
+        """Initialize a WeeklySchedule.
+
+        Args:
+        ----
+            days (Mapping[Weekday, Iterable[Phase]]): Phases per weekday. Missing
+                days have no phases and are not part of `weekdays`. Phases of a day
+                must not overlap.
+
+        """
+        self.weekdays = frozenset(days)
+        """The weekdays the schedule covers."""
+        self.days: dict[Weekday, tuple[Phase, ...]] = {}
+        for weekday in WEEKDAYS:
+            phases = tuple(sorted(days.get(weekday, ())))
+            for i, (start, end) in enumerate(phases):
+                if not 0 <= start < end <= MINUTES_PER_DAY:
+                    msg = f'Invalid phase {_format(start, end)} on {weekday.value}.'
+                    raise ValueError(msg)
+                if i and start < phases[i - 1][1]:
+                    msg = f'Overlapping phases on {weekday.value}.'
+                    raise ValueError(msg)
+            self.days[weekday] = phases
+
+        self._starts: list[int] = []
+        self._ends: list[int] = []
+        for day_index, weekday in enumerate(WEEKDAYS):
+            offset = day_index * MINUTES_PER_DAY
+            for start, end in self.days[weekday]:
+                self._starts.append(offset + start)
+                self._ends.append(offset + end)
+
+    @classmethod
+    def from_time_windows(cls, days: Iterable[TimeWindowDay]) -> 'WeeklySchedule':
+        """Create a schedule from `Component.time_windows_view`."""
+        return cls({day.weekday: _phases(day) for day in days})
+
+    @classmethod
+    def parse(cls, days: Mapping[Weekday | str, Iterable[str]]) -> 'WeeklySchedule':
+        """Create a schedule from phases like '06:00-08:30', e.g. `{'MONDAY': ['06:00-08:30']}`."""
+        parsed: dict[Weekday, list[Phase]] = {}
+        for weekday, phases in days.items():
+            parsed[Weekday(weekday)] = []
+            for phase in phases:
+                match = _PHASE_PATTERN.fullmatch(phase.strip())
+                if match is None:
+                    msg = f'Invalid phase {phase!r}, expected HH:MM-HH:MM.'
+                    raise ValueError(msg)
+                sh, sm, eh, em = map(int, match.groups())
+                parsed[Weekday(weekday)].append((sh * 60 + sm, eh * 60 + em))
+        return cls(parsed)
+
+    def __eq__(self, other: object) -> bool:
+        """Return whether both schedules cover the same weekdays with the same phases."""
+        if not isinstance(other, WeeklySchedule):
+            return NotImplemented
+        return self.weekdays == other.weekdays and self.days == other.days
+
+    def __hash__(self) -> int:
+        """Hash the weekdays and phases of the schedule."""
+        return hash((self.weekdays, tuple(self.days.items())))
+
+    def __repr__(self) -> str:
+        """Return the phases of the covered weekdays in HH:MM-HH:MM notation."""
+        days = {w.value: [_format(*p) for p in phases] for w, phases in self.days.items() if w in self.weekdays}
+        return f'WeeklySchedule({days})'
+
+    def is_active(self, at: datetime.datetime | tuple[Weekday, int]) -> bool:
+        """Whether a phase is active at a time.
+
+        Args:
+        ----
+            at (datetime.datetime | tuple[Weekday, int]): Local time of the facility,
+                or a weekday and the minutes since midnight.
+
+        """
+        if isinstance(at, datetime.datetime):
+            minute = at.weekday() * MINUTES_PER_DAY + at.hour * 60 + at.minute
+        else:
+            minute = WEEKDAYS.index(at[0]) * MINUTES_PER_DAY + at[1]
+        i = bisect_right(self._starts, minute) - 1
+        return i >= 0 and minute < self._ends[i]
+
+    def diff(self, current: Iterable[TimeWindowDay]) -> list[PhaseChange]:
+        """Compare the phases of `current` with this schedule, position by position.
+
+        Only the weekdays of this schedule are compared, days missing from `current`
+        can't be written and are ignored. Unused phase slots (start equal to end)
+        are not compared.
+        """
+        changes = []
+        for day in current:
+            if day.weekday not in self.weekdays:
+                continue
+            old = _phases(day)
+            new = self.days[day.weekday]
+            for i in range(max(len(old), len(new))):
+                old_phase = old[i] if i < len(old) else None
+                new_phase = new[i] if i < len(new) else None
+                if old_phase != new_phase:
+                    changes.append(PhaseChange(day.weekday, i, old_phase, new_phase))
+        return changes
+
+    def time_windows(self, current: Iterable[TimeWindowDay], weekdays: Collection[Weekday]) -> list[dict]:
+        """Build the time window payload of `weekdays`, keeping the ids and phase slots of `current`.
+
+        Every day keeps as many phases as `current` reports, unused slots are filled
+        with 00:00-00:00.
+
+        Raises
+        ------
+            ValueError: A day has more phases than the device has slots for it.
+
+        """
+        days = {day.weekday: day for day in current}
+        payload = []
+        for weekday in WEEKDAYS:
+            if weekday not in weekdays or weekday not in days:
+                continue
+            day = days[weekday]
+            phases = self.days[weekday]
+            if len(phases) > len(day.phases):
+                msg = f'{weekday.value} has {len(phases)} phases, but only {len(day.phases)} slots.'
+                raise ValueError(msg)
+            unused = [_phase_dict((0, 0))] * (len(day.phases) - len(phases))
+            payload.append(
+                {**day.raw, 'id': day.id, 'weekDay': weekday.value, 'phases': [_phase_dict(p) for p in phases] + unused}
+            )
+        return payload
+
+
+def _format(start: int, end: int) -> str:
+    return f'{start // 60:02}:{start % 60:02}-{end // 60:02}:{end % 60:02}'
@@ -0,0 +1,129 @@
+"""Immutable, session-free snapshots of the datamodels.
+
+The datamodels are live handles: they hold the session and can update or change
+the data on the API. A snapshot is a frozen, hashable copy of their current values
+without a session. One snapshot can be shared between any number of threads or
+consumers without copying or locking, and it doesn't keep the client alive.
+
+    snapshot = component.snapshot()
+    snapshot['3_0'].value
+"""
+
+import datetime
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+from froeling.datamodels.generics import Address
+from froeling.datamodels.schedule import WeeklySchedule
+
+
+def freeze(value: Any) -> Any:
+    """Turn nested dicts and lists of API data into sorted tuples of items and tuples."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, list | tuple):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+@dataclass(frozen=True)
+class ParameterSnapshot:
+    """Values of a `Parameter` at the time of the snapshot."""
+
+    facility_id: int
+    id: str
+    display_name: str | None
+    name: str | None
+    editable: bool | None
+    parameter_type: str | None
+    unit: str | None
+    value: str | None
+    min_val: str | None
+    max_val: str | None
+    string_list_key_values: tuple[tuple[str, str], ...] | None
+
+    @property
+    def display_value(self) -> str:
+        """Combine the value with it's unit."""
+        if self.string_list_key_values:
+            return dict(self.string_list_key_values)[str(self.value)]
+        if self.unit:
+            return f'{self.value} {self.unit}'
+        return str(self.value)
+
+
+@dataclass(frozen=True)
+class ComponentSnapshot(Mapping[str, ParameterSnapshot]):
+    """Values of a `Component` and its parameters at the time of the snapshot.
+
+    Parameters can be looked up by id like in a read-only dict.
+    """
+
+    facility_id: int
+    component_id: str
+    display_name: str | None
+    display_category: str | None
+    standard_name: str | None
+    type: str | None
+    sub_type: str | None
+    picture_url: str | None
+    schedule: WeeklySchedule | None
+    parameters: tuple[ParameterSnapshot, ...]
+    _by_id: dict[str, ParameterSnapshot] = field(init=False, repr=False, compare=False, hash=False)
+
+    def __post_init__(self) -> None:
+        """Index the parameters by id."""
+        object.__setattr__(self, '_by_id', {p.id: p for p in self.parameters})
+
+    def __getitem__(self, parameter_id: str) -> ParameterSnapshot:
+        """Get a parameter by id."""
+        return self._by_id[parameter_id]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the parameter ids."""
+        return iter(self._by_id)
+
+    def __len__(self) -> int:
+        """Return the number of parameters."""
+        return len(self._by_id)
+
+
+@dataclass(frozen=True)
+class FacilitySnapshot:
+    """Values of a `Facility` at the time of the snapshot."""
+
+    facility_id: int
+    equipment_number: int | None
+    status: str | None
+    name: str | None
+    address: Address | None
+    owner: str | None
+    role: str | None
+    favorite: bool | None
+    allow_messages: bool | None
+    subscribed_notifications: bool | None
+    picture_url: str | None
+    protocol_3200_info: tuple[tuple[str, Any], ...] | None
+    hours_since_last_maintenance: int | None
+    operation_hours: int | None
+    facility_generation: str | None
+
+
+@dataclass(frozen=True)
+class NotificationSnapshot:
+    """Values of a `NotificationOverview` at the time of the snapshot.
+
+    `body` and `error_solutions` are only set if the details were fetched.
+    """
+
+    id: int | None
+    subject: str | None
+    unread: bool | None
+    date: datetime.date | None
+    error_id: int | None
+    type: str | None
+    facility_id: int | None
+    facility_name: str | None
+    body: str | None = None
+    error_solutions: tuple[tuple[str | None, str | None], ...] | None = None
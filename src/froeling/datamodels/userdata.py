@@ -3,6 +3,7 @@
 from dataclasses import dataclass, field
 
 from froeling.datamodels.generics import Address
+from froeling.profiling import profiled
 
 
 @dataclass(frozen=True)
@@ -23,6 +24,7 @@ class UserData:
     raw: dict = field(repr=False, default_factory=dict)
 
     @staticmethod
+    @profiled
     def _from_dict(obj: dict) -> 'UserData':
         user_data = obj['userData']
         email: str | None = user_data.get('email')
@@ -0,0 +1,49 @@
+"""Decode API responses, using msgspec when it is installed.
+
+`loads` is what `Session` uses for every response. With msgspec installed it
+decodes the raw bytes in C in one pass, otherwise it falls back to the standard
+library `json` module. Either way the result is made of plain dicts and lists,
+so the datamodels and their `raw` attribute stay the same.
+
+Responses are not decoded into typed structs: the datamodels keep their `raw`
+dicts for projections, 304 Not Modified detection and serialization, and
+rebuilding those dicts from structs costs more than the structs save.
+`benchmarks/bench_decoding.py` measures both parts, decoding and building the datamodels.
+"""
+
+import json
+import re
+from typing import Any
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depends on the environment
+    msgspec = None  # type: ignore[assignment]
+
+HAS_MSGSPEC = msgspec is not None
+"""Whether the fast decoding backend is available."""
+
+_BYTE_POSITION = re.compile(r'\(byte (\d+)\)')
+
+
+def _decode_error(e: Exception, data: bytes | str) -> json.JSONDecodeError:
+    """Turn a msgspec.DecodeError into the json error `Session` already handles."""
+    doc = data.decode(errors='replace') if isinstance(data, bytes) else data
+    position = _BYTE_POSITION.search(str(e))
+    return json.JSONDecodeError(str(e), doc, int(position[1]) if position else 0)
+
+
+def loads(data: bytes | str) -> Any:
+    """Decode a JSON document into builtin python objects.
+
+    Raises
+    ------
+        json.JSONDecodeError: The document is not valid JSON.
+
+    """
+    if msgspec is None:
+        return json.loads(data)
+    try:
+        return msgspec.json.decode(data)
+    except msgspec.DecodeError as e:
+        raise _decode_error(e, data) from e
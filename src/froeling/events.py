@@ -0,0 +1,234 @@
+"""Publish updates to any number of integrations without slowing down polling.
+
+Every `Session` has an `EventBus` (`Froeling.events`). Component updates,
+changed parameter values, new notifications, token renewals and failed updates
+are published to it. Each subscriber gets its own bounded queue; when a
+subscriber falls behind, its `policy` decides which events it loses, so a slow
+sink never blocks polling or the other subscribers.
+
+    subscriber = api.events.subscribe({EventType.PARAMETER_CHANGED}, policy=Policy.COALESCE)
+    api.supervisor.start('mqtt', lambda: subscriber.run(publish_to_mqtt))
+"""
+
+import asyncio
+import dataclasses
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Hashable, Iterable
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+
+from froeling import profiling
+
+
+class EventType(Enum):
+    """Kinds of events published by the library."""
+
+    COMPONENT_UPDATED = 'COMPONENT_UPDATED'
+    """A component was updated. `data` is the `Component`."""
+    PARAMETER_CHANGED = 'PARAMETER_CHANGED'
+    """An update returned a new value (or the first value) of a parameter. `data` is the `Parameter`."""
+    NOTIFICATION_RECEIVED = 'NOTIFICATION_RECEIVED'
+    """A notification was fetched for the first time. `data` is the `NotificationOverview`."""
+    TOKEN_RENEWED = 'TOKEN_RENEWED'  # noqa: S105
+    """The session got a new token, by logging in or from its token store."""
+    ERROR = 'ERROR'
+    """Updating a component or renewing the token failed. `error` is the exception."""
+
+
+class Policy(Enum):
+    """What a subscriber with a full queue does with new events."""
+
+    DROP_OLDEST = 'DROP_OLDEST'
+    """Discard the oldest queued event to make room."""
+    DROP_NEWEST = 'DROP_NEWEST'
+    """Discard the new event."""
+    COALESCE = 'COALESCE'
+    """Replace a queued event with the same `Event.key` (e.g. an older value of the
+    same parameter) in place; other events are handled like `DROP_OLDEST`."""
+
+
+@dataclass(frozen=True)
+class Event:
+    """Something that happened in the library.
+
+    Attributes:
+        type (EventType): What happened.
+        facility_id (int | None): Facility concerned, if any.
+        component_id (str | None): Component concerned, if any.
+        parameter_id (str | None): Parameter concerned, if any.
+        notification_id (int | None): Notification concerned, if any.
+        value (Any): New value of a changed parameter.
+        previous (Any): Value of the parameter before the update, None if unknown.
+        data (Any): The object the event is about, see `EventType`.
+        error (BaseException | None): The exception of an `ERROR` event.
+        timestamp (float): Unix time of the event.
+
+    """
+
+    type: EventType
+    facility_id: int | None = None
+    component_id: str | None = None
+    parameter_id: str | None = None
+    notification_id: int | None = None
+    value: Any = None
+    previous: Any = None
+    data: Any = dataclasses.field(default=None, repr=False, compare=False)
+    error: BaseException | None = None
+    timestamp: float = dataclasses.field(default_factory=time.time)
+
+    @property
+    def key(self) -> Hashable:
+        """Identifies what the event is about; newer events with the same key supersede older ones."""
+        return (self.type, self.facility_id, self.component_id, self.parameter_id, self.notification_id)
+
+
+class EventSubscriber:
+    """A subscriber's bounded queue of events, consumed with `get`, `async for` or `run`."""
+
+    def __init__(self, types: Iterable[EventType] | None, maxsize: int, policy: Policy) -> None:
+        """Initialize an EventSubscriber. Use `EventBus.subscribe` instead.
+
+        Args:
+        ----
+            types (Iterable[EventType] | None): Event types to receive, None for all.
+            maxsize (int): Most events queued.
+            policy (Policy): What happens to events while the queue is full.
+
+        """
+        if maxsize < 1:
+            msg = 'maxsize must be at least 1.'
+            raise ValueError(msg)
+        self.types = None if types is None else frozenset(types)
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+        self._events: OrderedDict[Hashable, Event] = OrderedDict()
+        self._counter = itertools.count()
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        """Return the number of queued events."""
+        return len(self._events)
+
+    def wants(self, event_type: EventType) -> bool:
+        """Whether the subscriber receives events of this type."""
+        return not self.closed and (self.types is None or event_type in self.types)
+
+    def put(self, event: Event) -> None:
+        """Queue an event without waiting, applying the policy if the queue is full."""
+        if self.policy is Policy.COALESCE:
+            key = event.key
+            if key in self._events:
+                self._events[key] = event
+                self.coalesced += 1
+                return
+        else:
+            key = next(self._counter)
+
+        if len(self._events) >= self.maxsize:
+            self.dropped += 1
+            if self.policy is Policy.DROP_NEWEST:
+                return
+            self._events.popitem(last=False)
+        self._events[key] = event
+        self._ready.set()
+
+    async def get(self) -> Event:
+        """Wait for the next event.
+
+        Raises
+        ------
+            StopAsyncIteration: If the subscriber was closed and no events are left.
+
+        """
+        while not self._events:
+            if self.closed:
+                raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+        return self._events.popitem(last=False)[1]
+
+    def __aiter__(self) -> AsyncIterator[Event]:
+        """Iterate over events until the subscriber is closed."""
+        return self
+
+    async def __anext__(self) -> Event:
+        """Wait for the next event."""
+        return await self.get()
+
+    async def run(self, handler: Callable[[Event], Any], *, logger: logging.Logger | None = None) -> None:
+        """Call `handler` (sync or async) with each event until closed or cancelled.
+
+        Exceptions raised by the handler are logged and don't stop the subscriber.
+        Suitable as a task of `Froeling.supervisor`.
+        """
+        logger = logger or logging.getLogger(__name__)
+        async for event in self:
+            try:
+                with profiling.measure('callback', 'EventSubscriber.run'):
+                    result = handler(event)
+                    if asyncio.iscoroutine(result):
+                        await result
+            except Exception:
+                logger.exception('Handling %s failed.', event)
+
+    def close(self) -> None:
+        """Stop receiving events. Queued events can still be consumed."""
+        self.closed = True
+        self._ready.set()
+
+
+class EventBus:
+    """Distributes events to subscribers. Publishing never waits for them."""
+
+    def __init__(self) -> None:
+        """Initialize an EventBus without subscribers."""
+        self.subscribers: list[EventSubscriber] = []
+
+    def subscribe(
+        self,
+        types: Iterable[EventType] | None = None,
+        *,
+        maxsize: int = 1000,
+        policy: Policy = Policy.DROP_OLDEST,
+    ) -> EventSubscriber:
+        """Add a subscriber.
+
+        Args:
+        ----
+            types (Iterable[EventType] | None): Event types to receive. Defaults to None (all).
+            maxsize (int): Most events queued for the subscriber. Defaults to 1000.
+            policy (Policy): What happens to events while its queue is full.
+                Defaults to `Policy.DROP_OLDEST`.
+
+        """
+        subscriber = EventSubscriber(types, maxsize, policy)
+        self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: EventSubscriber) -> None:
+        """Remove and close a subscriber."""
+        subscriber.close()
+        if subscriber in self.subscribers:
+            self.subscribers.remove(subscriber)
+
+    def wants(self, event_type: EventType) -> bool:
+        """Whether any subscriber receives events of this type, to skip building unwanted events."""
+        return any(s.wants(event_type) for s in self.subscribers)
+
+    def publish(self, event: Event) -> None:
+        """Queue an event for every subscriber of its type."""
+        for subscriber in self.subscribers:
+            if subscriber.wants(event.type):
+                subscriber.put(event)
+
+    def emit(self, event_type: EventType, **fields: Any) -> None:
+        """Publish an event of `event_type`, if anyone subscribed to it."""
+        if self.wants(event_type):
+            self.publish(Event(event_type, **fields))
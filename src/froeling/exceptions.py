@@ -73,3 +73,13 @@ class FacilityNotFoundError(Exception):
         super().__init__(f'Could not find facility with id {facility_id}.')
 
         self.facility_id = facility_id
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit breaker of its route is open."""
+
+    def __init__(self, route: str, retry_after: float):
+        super().__init__(f'Circuit for {route} is open, retry in {retry_after:.1f}s.')
+
+        self.route = route
+        self.retry_after = retry_after
@@ -0,0 +1,61 @@
+"""Features that depend on API behaviour which hasn't been verified yet.
+
+Nothing here is part of the default API. The requests are modelled on what the
+API returns, but the endpoints haven't been confirmed to accept them, so check
+the result in the Fröling app before relying on them.
+"""
+
+from http import HTTPStatus
+
+from froeling import endpoints
+from froeling.datamodels import Component, PhaseChange, WeeklySchedule
+from froeling.datamodels.generics import TimeWindowDay
+from froeling.exceptions import NetworkError
+
+_TIME_WINDOWS = endpoints.BASE_URL + '/fcs/v1.0/resources/user/{}/facility/{}/component/{}/timeWindows'
+"""1: user_id  2: facility_id  3: component_id
+put data: list of timeWindowsView days. Not verified against the API yet, so it
+is not part of `froeling.endpoints`, the routes or the proxy."""
+
+
+async def apply_schedule(component: Component, schedule: WeeklySchedule) -> list[PhaseChange]:
+    """Change the time windows of a component to `schedule`.
+
+    The schedule is diffed against the current time windows (fetched first if
+    needed) and only days with changed phases are sent, in a single request to
+    the unverified time windows endpoint. Weekdays the schedule doesn't cover
+    are left unchanged. Each day keeps the number of phase
+    slots the device reported. Returns the changed phases, an empty list if
+    nothing had to be written.
+
+    Raises
+    ------
+        ValueError: The component has no time windows, or a day of `schedule`
+            has more phases than the device has slots for.
+
+    """
+    if component.time_windows_view is None:
+        await component.update()
+    if not component.time_windows_view:
+        msg = f'{component} has no time windows.'
+        raise ValueError(msg)
+
+    changes = schedule.diff(component.time_windows_view)
+    if not changes:
+        return []
+    days = schedule.time_windows(component.time_windows_view, {c.weekday for c in changes})
+    session = component._session  # noqa: SLF001
+    try:
+        await session.request(
+            'put',
+            _TIME_WINDOWS.format(session.user_id, component.facility_id, component.component_id),
+            json=days,
+        )
+    except NetworkError as e:
+        if e.status == HTTPStatus.NOT_MODIFIED:
+            return []
+        raise
+
+    written = {day.weekday: day for day in TimeWindowDay._from_list(days)}  # noqa: SLF001
+    component.time_windows_view = [written.get(day.weekday, day) for day in component.time_windows_view]
+    return changes
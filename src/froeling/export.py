@@ -0,0 +1,246 @@
+"""Export parameter snapshots of all facilities to columnar and line-based formats.
+
+Supported formats are Parquet and Arrow IPC (both require the optional `pyarrow`
+dependency, `pip install froeling-connect[export]`), CSV and NDJSON. Components
+are fetched concurrently and rows are written in batches, so memory use is bounded
+by `batch_size` and `concurrency` rather than the size of the fleet.
+"""
+
+import asyncio
+import contextlib
+import csv
+import datetime
+import json
+import logging
+from collections.abc import AsyncIterator, Collection, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Protocol
+
+from froeling.datamodels import Component, Facility
+from froeling.pipeline import iter_components
+
+if TYPE_CHECKING:
+    from froeling.client import Froeling
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = None
+
+COLUMNS = (
+    'timestamp',
+    'facility_id',
+    'facility_name',
+    'component_id',
+    'component_name',
+    'parameter_id',
+    'name',
+    'display_name',
+    'value',
+    'numeric_value',
+    'unit',
+)
+"""Columns of every export, in order."""
+
+FORMATS = {'.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow', '.csv': 'csv', '.ndjson': 'ndjson'}
+"""File suffixes and the format they select."""
+
+
+@dataclass
+class ExportResult:
+    """Summary of an export.
+
+    Attributes:
+        rows (int): Parameter rows written.
+        components (int): Components exported.
+        errors (int): Components that could not be fetched and were skipped.
+
+    """
+
+    rows: int = 0
+    components: int = 0
+    errors: int = 0
+
+
+def component_rows(facility: Facility, component: Component, timestamp: datetime.datetime) -> list[dict[str, Any]]:
+    """Turn the parameters of an updated component into export rows."""
+    rows = []
+    for parameter in component.parameters.values():
+        typed_value = parameter.typed_value
+        rows.append(
+            {
+                'timestamp': timestamp,
+                'facility_id': facility.facility_id,
+                'facility_name': facility.name,
+                'component_id': component.component_id,
+                'component_name': component.display_name,
+                'parameter_id': parameter.id,
+                'name': parameter.name,
+                'display_name': parameter.display_name,
+                'value': None if parameter.value is None else str(parameter.value),
+                'numeric_value': float(typed_value) if isinstance(typed_value, int | float) else None,
+                'unit': parameter.unit,
+            }
+        )
+    return rows
+
+
+class _Writer(Protocol):
+    def write(self, rows: list[dict[str, Any]]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class _ArrowWriter:
+    def __init__(self, path: Path, fmt: str) -> None:
+        if pa is None:
+            msg = f'Writing {fmt} files requires pyarrow, install froeling-connect[export].'
+            raise ImportError(msg)
+        self.schema = pa.schema(
+            [
+                ('timestamp', pa.timestamp('ms', tz='UTC')),
+                ('facility_id', pa.int64()),
+                ('facility_name', pa.string()),
+                ('component_id', pa.string()),
+                ('component_name', pa.string()),
+                ('parameter_id', pa.string()),
+                ('name', pa.string()),
+                ('display_name', pa.string()),
+                ('value', pa.string()),
+                ('numeric_value', pa.float64()),
+                ('unit', pa.string()),
+            ]
+        )
+        if fmt == 'parquet':
+            self._writer = pq.ParquetWriter(path, self.schema)
+        else:
+            self._writer = pa.ipc.new_file(path, self.schema)
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        self._writer.write_table(pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+class _CsvWriter:
+    def __init__(self, path: Path) -> None:
+        self._file: IO[str] = path.open('w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, COLUMNS)
+        self._writer.writeheader()
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        self._writer.writerows({**row, 'timestamp': row['timestamp'].isoformat()} for row in rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _NdjsonWriter:
+    def __init__(self, path: Path) -> None:
+        self._file: IO[str] = path.open('w', encoding='utf-8')
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        self._file.writelines(
+            json.dumps({**row, 'timestamp': row['timestamp'].isoformat()}, ensure_ascii=False) + '\n' for row in rows
+        )
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _open_writer(path: Path, fmt: str) -> _Writer:
+    if fmt in ('parquet', 'arrow'):
+        return _ArrowWriter(path, fmt)
+    if fmt == 'csv':
+        return _CsvWriter(path)
+    if fmt == 'ndjson':
+        return _NdjsonWriter(path)
+    msg = f'Unknown export format {fmt!r}, use one of {sorted(set(FORMATS.values()))}.'
+    raise ValueError(msg)
+
+
+async def iter_snapshot(
+    facilities: Iterable[Facility],
+    *,
+    concurrency: int = 8,
+    fields: Iterable[str] | None = None,
+    component_ids: Collection[str] | None = None,
+    result: ExportResult | None = None,
+    logger: logging.Logger | None = None,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Update all components of the facilities and yield their rows as they arrive.
+
+    At most `concurrency` components are fetched or wait to be consumed at once,
+    so slow consumers hold back fetching.
+    Components that fail to update are logged, counted in `result` and skipped.
+    With `component_ids`, only components with these ids are updated.
+    """
+    result = result if result is not None else ExportResult()
+    by_id = {f.facility_id: f for f in facilities}
+
+    def count_error(_: Exception) -> None:
+        result.errors += 1
+
+    components = iter_components(
+        by_id.values(),
+        concurrency=concurrency,
+        fields=fields,
+        component_ids=component_ids,
+        on_error=count_error,
+        logger=logger or logging.getLogger(__name__),
+    )
+    async with contextlib.aclosing(components):
+        async for component in components:
+            result.components += 1
+            timestamp = datetime.datetime.now(datetime.timezone.utc)
+            yield component_rows(by_id[component.facility_id], component, timestamp)
+
+
+async def export_snapshot(
+    client: 'Froeling',
+    path: str | Path,
+    *,
+    fmt: str | None = None,
+    batch_size: int = 10_000,
+    concurrency: int = 8,
+    fields: Iterable[str] | None = None,
+) -> ExportResult:
+    """Write a snapshot of every parameter of every facility of the account to a file.
+
+    Args:
+    ----
+        client (Froeling): A logged in client.
+        path (str | Path): Output file.
+        fmt (str | None): 'parquet', 'arrow', 'csv' or 'ndjson'. Defaults to None,
+            choosing the format from the file suffix.
+        batch_size (int): Rows written at once. Defaults to 10000.
+        concurrency (int): Components fetched at the same time. Defaults to 8.
+        fields (Iterable[str] | None): Projection passed to `Component.update`. Defaults to None.
+
+    """
+    path = Path(path)
+    fmt = fmt or FORMATS.get(path.suffix.lower())
+    if fmt is None:
+        msg = f'Can not tell the format from {path.name!r}, pass fmt.'
+        raise ValueError(msg)
+
+    result = ExportResult()
+    writer = _open_writer(path, fmt)
+    try:
+        batch: list[dict[str, Any]] = []
+        facilities = await client.get_facilities()
+        async for rows in iter_snapshot(facilities, concurrency=concurrency, fields=fields, result=result):
+            batch.extend(rows)
+            if len(batch) >= batch_size:
+                await asyncio.to_thread(writer.write, batch)
+                result.rows += len(batch)
+                batch = []
+        if batch:
+            await asyncio.to_thread(writer.write, batch)
+            result.rows += len(batch)
+    finally:
+        writer.close()
+    return result
@@ -0,0 +1,157 @@
+"""Stream updated components of many facilities with bounded concurrency.
+
+Components are yielded as soon as their update finishes while the next ones are
+still being fetched, so processing overlaps with network I/O instead of waiting
+for the whole fleet. At most `concurrency` updates are running or finished but
+not consumed yet: a slow consumer holds back fetching instead of buffering
+every facility in memory. Listing and updating components share the bound, so
+at most `concurrency` requests are in flight.
+
+    async for component in api.iter_components(concurrency=16):
+        process(component)
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections import deque
+from collections.abc import AsyncGenerator, AsyncIterable, AsyncIterator, Awaitable, Callable, Collection, Iterable
+from typing import Any, TypeVar
+
+from froeling.datamodels import Component, Facility
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+async def _iterate(items: Iterable[T]) -> AsyncIterator[T]:
+    for item in items:
+        yield item
+
+
+async def bounded_map(
+    items: Iterable[T] | AsyncIterable[T],
+    func: Callable[[T], Awaitable[R]],
+    *,
+    concurrency: int = 8,
+    ordered: bool = False,
+) -> AsyncGenerator[R, None]:
+    """Yield `await func(item)` for every item, running at most `concurrency` calls at once.
+
+    Items are only taken from `items` while there is room, and results that weren't
+    consumed yet count against `concurrency`. An exception raised by `func` is raised
+    to the consumer and cancels the remaining calls, as does closing the iterator.
+
+    Args:
+    ----
+        items (Iterable[T] | AsyncIterable[T]): Arguments of `func`.
+        func (Callable[[T], Awaitable[R]]): Coroutine function called with each item.
+        concurrency (int): Most calls running or waiting to be consumed. Defaults to 8.
+        ordered (bool): Yield results in the order of `items` instead of as soon as
+            they are done. A slow call then holds back the results after it. Defaults to False.
+
+    """
+    if concurrency < 1:
+        msg = 'concurrency must be at least 1.'
+        raise ValueError(msg)
+    iterator = aiter(items) if isinstance(items, AsyncIterable) else _iterate(items)
+    tasks: deque[asyncio.Future[R]] = deque()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(tasks) < concurrency:
+                try:
+                    item = await anext(iterator)
+                except StopAsyncIteration:
+                    exhausted = True
+                else:
+                    tasks.append(asyncio.ensure_future(func(item)))
+            if not tasks:
+                return
+
+            if ordered:
+                yield await tasks[0]
+                tasks.popleft()
+                continue
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                tasks.remove(task)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        aclose = getattr(iterator, 'aclose', None)
+        if aclose is not None:
+            await aclose()
+
+
+async def iter_components(
+    facilities: Iterable[Facility],
+    *,
+    concurrency: int = 8,
+    ordered: bool = False,
+    fields: Iterable[str] | None = None,
+    component_ids: Collection[str] | None = None,
+    on_error: Callable[[Exception], Any] | None = None,
+    logger: logging.Logger | None = None,
+) -> AsyncGenerator[Component, None]:
+    """Update all components of the facilities and yield each one once it is updated.
+
+    Facilities whose component list can't be fetched, and components that fail to
+    update, are logged and skipped.
+
+    Args:
+    ----
+        facilities (Iterable[Facility]): Facilities whose components are updated.
+        concurrency (int): Most components being updated or waiting to be consumed,
+            see `bounded_map`, and most requests (component lists and updates together)
+            in flight. Defaults to 8.
+        ordered (bool): Yield the components in the order of the facilities and their
+            component lists, instead of as soon as they are updated. Defaults to False.
+        fields (Iterable[str] | None): Projection passed to `Component.update`. Defaults to None.
+        component_ids (Collection[str] | None): Only update components with these ids.
+            Defaults to None (all).
+        on_error (Callable[[Exception], Any] | None): Called with the exception of every
+            skipped facility or component, e.g. to count them. Defaults to None.
+        logger (logging.Logger | None): Logger for skipped facilities and components. Defaults to None.
+
+    """
+    logger = logger or logging.getLogger(__name__)
+    requests = asyncio.Semaphore(concurrency)
+
+    async def list_components(facility: Facility) -> list[Component]:
+        try:
+            async with requests:
+                components = await facility.get_components()
+        except Exception as e:
+            logger.exception('Skipping facility %s, fetching components failed.', facility.facility_id)
+            if on_error is not None:
+                on_error(e)
+            return []
+        return [c for c in components if c is not None and (component_ids is None or c.component_id in component_ids)]
+
+    async def listed() -> AsyncGenerator[Component, None]:
+        lists = bounded_map(facilities, list_components, concurrency=concurrency, ordered=True)
+        async with contextlib.aclosing(lists):
+            async for components in lists:
+                for component in components:
+                    yield component
+
+    async def update(component: Component) -> Component | None:
+        try:
+            async with requests:
+                await component.update(fields)
+        except Exception as e:
+            logger.exception('Skipping %s, update failed.', component)
+            if on_error is not None:
+                on_error(e)
+            return None
+        return component
+
+    updated = bounded_map(listed(), update, concurrency=concurrency, ordered=ordered)
+    async with contextlib.aclosing(updated):
+        async for component in updated:
+            if component is not None:
+                yield component
@@ -0,0 +1,246 @@
+"""Poll components with intervals that adapt to how often their values change."""
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from froeling import endpoints, profiling
+from froeling.datamodels import Component, Facility
+
+
+def facility_active(facility: Facility | None) -> bool:
+    """Whether a facility reports active operation (e.g. the boiler is firing)."""
+    if facility is None or not isinstance(facility.protocol_3200_info, dict):
+        return False
+    return facility.protocol_3200_info.get('active') is True
+
+
+@dataclass
+class PolledComponent:
+    """Polling state of a single component.
+
+    Attributes:
+        component (Component): The polled component.
+        facility (Facility | None): Its facility, used to detect active operation.
+        interval (float): Current polling interval in seconds.
+        next_poll (float): Clock time of the next update.
+        polls (int): Number of updates.
+        changes (int): Number of updates that changed at least one value.
+        errors (int): Number of failed updates.
+        last_update (float | None): Clock time of the last successful update.
+
+    """
+
+    component: Component
+    facility: Facility | None
+    interval: float
+    next_poll: float
+    added: float
+    polls: int = 0
+    changes: int = 0
+    errors: int = 0
+    last_update: float | None = None
+    values: dict[str, Any] = field(default_factory=dict, repr=False)
+
+
+@dataclass
+class PollStats:
+    """Request statistics of an `AdaptivePoller`.
+
+    Attributes:
+        requests (int): Updates sent.
+        changes (int): Updates that changed at least one value.
+        errors (int): Updates that failed.
+        fixed_requests (int): Updates polling every component at the minimum interval
+            would have sent in the same time.
+
+    """
+
+    requests: int = 0
+    changes: int = 0
+    errors: int = 0
+    fixed_requests: int = 0
+
+    @property
+    def saved(self) -> int:
+        """Requests saved compared to polling at the minimum interval."""
+        return max(0, self.fixed_requests - self.requests)
+
+
+class AdaptivePoller:
+    """Updates components, polling changing ones often and stable ones rarely.
+
+    After an update that changed a value, or while the component's facility is in
+    active operation, the component is polled again after `min_interval`. Every
+    update without changes multiplies its interval by `backoff`, up to `max_interval`.
+    The facilities are fetched again every `facility_interval` seconds, so components
+    of a facility that became active are polled right away.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_interval: float = 30.0,
+        max_interval: float = 900.0,
+        backoff: float = 2.0,
+        fields: Iterable[str] | None = None,
+        on_update: Callable[[Component, bool], Any] | None = None,
+        is_active: Callable[[Facility | None], bool] = facility_active,
+        facility_interval: float | None = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        """Initialize an AdaptivePoller.
+
+        Args:
+        ----
+            min_interval (float): Shortest polling interval in seconds. Defaults to 30.
+            max_interval (float): Longest polling interval in seconds. Defaults to 900.
+            backoff (float): Factor the interval grows by after an unchanged update. Defaults to 2.
+            fields (Iterable[str] | None): Projection passed to `Component.update`. Defaults to None.
+            on_update (Callable[[Component, bool], Any] | None): Called (or awaited) after
+                every update with the component and whether a value changed. Defaults to None.
+            is_active (Callable[[Facility | None], bool]): Decides whether a facility is
+                in active operation. Defaults to `facility_active`.
+            facility_interval (float | None): Seconds between fetches of the facilities'
+                status. Defaults to 300, None to keep the facilities passed to `add`.
+            clock (Callable[[], float]): Monotonic time source. Defaults to `time.monotonic`.
+            logger (logging.Logger | None): Logger for failed updates. Defaults to None.
+
+        """
+        if not 0 < min_interval <= max_interval:
+            msg = 'Intervals must satisfy 0 < min_interval <= max_interval.'
+            raise ValueError(msg)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.fields = None if fields is None else frozenset(fields)
+        self.on_update = on_update
+        self.is_active = is_active
+        self.facility_interval = facility_interval
+        self.components: dict[tuple[int, str], PolledComponent] = {}
+        self._stats = PollStats()
+        self._clock = clock
+        self._logger = logger or logging.getLogger(__name__)
+        self._facilities_due = clock() + (facility_interval or 0.0)
+
+    def add(self, component: Component, facility: Facility | None = None) -> None:
+        """Start polling a component. It is updated on the next `poll` call."""
+        now = self._clock()
+        key = (component.facility_id, component.component_id)
+        self.components[key] = PolledComponent(component, facility, self.min_interval, now, now)
+
+    def remove(self, component: Component) -> None:
+        """Stop polling a component."""
+        self.components.pop((component.facility_id, component.component_id), None)
+
+    @property
+    def stats(self) -> PollStats:
+        """Request statistics, including the requests saved so far."""
+        now = self._clock()
+        self._stats.fixed_requests = sum(
+            1 + int((now - polled.added) // self.min_interval) for polled in self.components.values()
+        )
+        return self._stats
+
+    def age(self, component: Component) -> float | None:
+        """Seconds since the last successful update of a polled component, None before the first."""
+        polled = self.components.get((component.facility_id, component.component_id))
+        if polled is None or polled.last_update is None:
+            return None
+        return self._clock() - polled.last_update
+
+    def next_poll(self) -> float | None:
+        """Clock time the next component is due, or None when nothing is polled."""
+        return min((polled.next_poll for polled in self.components.values()), default=None)
+
+    async def refresh_facilities(self) -> None:
+        """Fetch the current status of the polled facilities.
+
+        Components of a facility that became active are due immediately.
+        """
+        now = self._clock()
+        sessions = {}
+        for polled in self.components.values():
+            session = getattr(polled.facility, 'session', None)
+            if session is not None:
+                sessions[id(session)] = session
+        for session in sessions.values():
+            try:
+                facilities = await session.get_model(
+                    endpoints.FACILITY.format(session.user_id),
+                    Facility._from_list,  # noqa: SLF001
+                    session,
+                )
+            except Exception:
+                self._logger.exception('Refreshing the facilities failed.')
+                continue
+            current = {facility.facility_id: facility for facility in facilities}
+            for polled in self.components.values():
+                if polled.facility is None or getattr(polled.facility, 'session', None) is not session:
+                    continue
+                facility = current.get(polled.facility.facility_id)
+                if facility is None:
+                    continue
+                became_active = not self.is_active(polled.facility) and self.is_active(facility)
+                polled.facility = facility
+                if became_active:
+                    polled.interval = self.min_interval
+                    polled.next_poll = min(polled.next_poll, now)
+
+    async def poll(self) -> list[Component]:
+        """Update all components that are due and return them."""
+        now = self._clock()
+        if self.facility_interval is not None and now >= self._facilities_due:
+            self._facilities_due = now + self.facility_interval
+            await self.refresh_facilities()
+            now = self._clock()
+        due = [polled for polled in self.components.values() if polled.next_poll <= now]
+        await asyncio.gather(*(self._update(polled) for polled in due))
+        return [polled.component for polled in due]
+
+    async def _update(self, polled: PolledComponent) -> None:
+        self._stats.requests += 1
+        try:
+            parameters = await polled.component.update(self.fields)
+        except Exception:
+            self._stats.errors += 1
+            polled.errors += 1
+            self._logger.exception('Updating %s failed.', polled.component)
+            polled.next_poll = self._clock() + polled.interval
+            return
+
+        values = {parameter_id: parameter.value for parameter_id, parameter in parameters.items()}
+        first = polled.polls == 0
+        changed = not first and values != polled.values
+        polled.values = values
+        polled.polls += 1
+        polled.last_update = self._clock()
+        if changed:
+            polled.changes += 1
+            self._stats.changes += 1
+
+        if first or changed or self.is_active(polled.facility):
+            polled.interval = self.min_interval
+        else:
+            polled.interval = min(self.max_interval, polled.interval * self.backoff)
+        polled.next_poll = self._clock() + polled.interval
+
+        if self.on_update:
+            with profiling.measure('callback', 'AdaptivePoller.on_update'):
+                result = self.on_update(polled.component, changed)
+                if asyncio.iscoroutine(result):
+                    await result
+
+    async def run(self) -> None:
+        """Poll until cancelled, e.g. as a task of `Froeling.supervisor`."""
+        while True:
+            await self.poll()
+            next_poll = self.next_poll()
+            if next_poll is not None and self.facility_interval is not None:
+                next_poll = min(next_poll, self._facilities_due)
+            delay = self.min_interval if next_poll is None else next_poll - self._clock()
+            await asyncio.sleep(max(0.0, delay))
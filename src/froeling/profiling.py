@@ -0,0 +1,250 @@
+"""Opt-in profiling of requests, model construction, callbacks and event loop lag.
+
+While a `Profiler` is enabled, `Session.request` records the time spent waiting
+for the response (`network`), reading the body (`read`) and decoding it
+(`decode`) per route, the datamodel constructors record `model` time, and the
+callbacks of pollers and subscriptions record `callback` time. `LoopLagMonitor`
+adds how late the event loop resumes coroutines (`loop_lag`).
+
+    profiler = profiling.enable()
+    monitor = asyncio.create_task(profiling.LoopLagMonitor(profiler).run())
+    ...
+    print(profiler.format_report())
+
+Disabled (the default), the hooks cost a single global lookup.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import functools
+import statistics
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from typing import Any, ParamSpec, TypeVar
+
+P = ParamSpec('P')
+R = TypeVar('R')
+
+PHASES = ('network', 'read', 'decode', 'model', 'callback', 'loop_lag')
+"""Phases recorded by the built-in hooks."""
+
+
+@dataclass(frozen=True)
+class Sample:
+    """A single measurement.
+
+    Attributes:
+        phase (str): What was measured, e.g. 'network' or 'model'.
+        key (str): Where, e.g. the route name or the constructor.
+        seconds (float): Duration.
+
+    """
+
+    phase: str
+    key: str
+    seconds: float
+
+
+@dataclass
+class PhaseStats:
+    """Aggregated measurements of a phase and key.
+
+    Percentiles are computed over the most recent samples only.
+    """
+
+    phase: str
+    key: str
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    recent: deque[float] = field(default_factory=lambda: deque(maxlen=1000), repr=False)
+
+    @property
+    def mean(self) -> float:
+        """Average duration in seconds."""
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Duration below which `q` percent of the recent samples fall."""
+        if not self.recent:
+            return 0.0
+        if len(self.recent) == 1:
+            return self.recent[0]
+        return statistics.quantiles(self.recent, n=100, method='inclusive')[min(98, max(0, round(q) - 1))]
+
+
+class Profiler:
+    """Collects samples of the profiling hooks. Safe to use from multiple threads."""
+
+    def __init__(self, callback: Callable[[Sample], Any] | None = None) -> None:
+        """Initialize a Profiler.
+
+        Args:
+        ----
+            callback (Callable[[Sample], Any] | None): Called with every sample, e.g. to
+                export it to a metrics system. Defaults to None.
+
+        """
+        self.callback = callback
+        self.stats: dict[tuple[str, str], PhaseStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, phase: str, key: str, seconds: float) -> None:
+        """Add a sample."""
+        with self._lock:
+            stats = self.stats.get((phase, key))
+            if stats is None:
+                stats = self.stats[phase, key] = PhaseStats(phase, key)
+            stats.count += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            stats.recent.append(seconds)
+        if self.callback:
+            self.callback(Sample(phase, key, seconds))
+
+    @contextlib.contextmanager
+    def measure(self, phase: str, key: str) -> Iterator[None]:
+        """Record the duration of the block, also if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, key, time.perf_counter() - start)
+
+    def reset(self) -> None:
+        """Drop all samples."""
+        with self._lock:
+            self.stats.clear()
+
+    def report(self) -> list[dict[str, Any]]:
+        """Statistics per phase and key, with the most total time first. Durations are in seconds."""
+        with self._lock:
+            stats = sorted(self.stats.values(), key=lambda s: s.total, reverse=True)
+            return [
+                {
+                    'phase': s.phase,
+                    'key': s.key,
+                    'count': s.count,
+                    'total': s.total,
+                    'mean': s.mean,
+                    'p50': s.percentile(50),
+                    'p99': s.percentile(99),
+                    'max': s.max,
+                }
+                for s in stats
+            ]
+
+    def format_report(self) -> str:
+        """Format `report` as a table with durations in milliseconds."""
+        lines = [f'{"phase":<9} {"key":<32} {"count":>7} {"total":>10} {"mean":>8} {"p50":>8} {"p99":>8} {"max":>8}']
+        for row in self.report():
+            ms = {k: row[k] * 1000 for k in ('total', 'mean', 'p50', 'p99', 'max')}
+            lines.append(
+                f'{row["phase"]:<9} {row["key"]:<32} {row["count"]:>7} {ms["total"]:>10.1f} '
+                f'{ms["mean"]:>8.2f} {ms["p50"]:>8.2f} {ms["p99"]:>8.2f} {ms["max"]:>8.2f}'
+            )
+        return '\n'.join(lines)
+
+
+active: Profiler | None = None
+"""The enabled profiler the hooks record to, None while profiling is disabled."""
+
+_in_model: contextvars.ContextVar[bool] = contextvars.ContextVar('froeling_in_model', default=False)
+
+
+def enable(profiler: Profiler | None = None) -> Profiler:
+    """Start recording into `profiler` (or a new one) and return it."""
+    global active  # noqa: PLW0603
+    active = profiler or Profiler()
+    return active
+
+
+def disable() -> None:
+    """Stop recording."""
+    global active  # noqa: PLW0603
+    active = None
+
+
+@contextlib.contextmanager
+def measure(phase: str, key: str) -> Iterator[None]:
+    """Record the duration of the block if profiling is enabled."""
+    profiler = active
+    if profiler is None:
+        yield
+        return
+    with profiler.measure(phase, key):
+        yield
+
+
+def profiled(func: Callable[P, R]) -> Callable[P, R]:
+    """Record calls of a datamodel constructor as `model` time.
+
+    Nested constructors (e.g. `_from_dict` called by `_from_list`) are included
+    in the time of the outermost one.
+    """
+    key = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        profiler = active
+        if profiler is None or _in_model.get():
+            return func(*args, **kwargs)
+        token = _in_model.set(True)
+        try:
+            with profiler.measure('model', key):
+                return func(*args, **kwargs)
+        finally:
+            _in_model.reset(token)
+
+    return wrapper
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop resumes a coroutine sleeping for `interval`.
+
+    Lag shows that something blocks the loop, e.g. decoding large responses.
+    """
+
+    def __init__(
+        self,
+        profiler: Profiler | None = None,
+        *,
+        interval: float = 0.1,
+        threshold: float | None = None,
+        on_lag: Callable[[float], Any] | None = None,
+    ) -> None:
+        """Initialize a LoopLagMonitor.
+
+        Args:
+        ----
+            profiler (Profiler | None): Profiler to record `loop_lag` samples in.
+                Defaults to None (the enabled one, if any).
+            interval (float): Seconds between measurements. Defaults to 0.1.
+            threshold (float | None): Call `on_lag` only for lags of at least this
+                many seconds. Defaults to None (every measurement).
+            on_lag (Callable[[float], Any] | None): Called with each lag in seconds. Defaults to None.
+
+        """
+        self.profiler = profiler
+        self.interval = interval
+        self.threshold = threshold
+        self.on_lag = on_lag
+        self.max_lag = 0.0
+
+    async def run(self) -> None:
+        """Measure until cancelled, e.g. as a task of `Froeling.supervisor`."""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            self.max_lag = max(self.max_lag, lag)
+            profiler = self.profiler or active
+            if profiler is not None:
+                profiler.record('loop_lag', 'event loop', lag)
+            if self.on_lag and (self.threshold is None or lag >= self.threshold):
+                self.on_lag(lag)
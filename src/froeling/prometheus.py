@@ -0,0 +1,195 @@
+"""Prometheus exporter for the parameters of all components.
+
+A background `AdaptivePoller` keeps the components up to date; scrapes of
+`/metrics` only read the cached values, so any number of Prometheus servers can
+scrape at any rate without adding upstream requests. Every numeric parameter is
+exported with its unit as a label, together with the age of its value, so
+stale series are visible instead of silently repeating old values.
+
+    python -m froeling.prometheus --port 9100
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import web
+
+from froeling.arguments import add_client_arguments, token_store
+from froeling.client import Froeling
+from froeling.polling import AdaptivePoller
+
+if TYPE_CHECKING:
+    from froeling.datamodels import Component
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_FAMILIES = {
+    'froeling_parameter_value': ('gauge', 'Latest value of a numeric parameter.'),
+    'froeling_parameter_age_seconds': ('gauge', 'Seconds since the value of the parameter was refreshed.'),
+    'froeling_component_stale': ('gauge', '1 if the component was not refreshed within the staleness limit.'),
+    'froeling_component_update_errors_total': ('counter', 'Failed updates of the component.'),
+    'froeling_component_poll_interval_seconds': ('gauge', 'Current polling interval of the component.'),
+    'froeling_requests_total': ('counter', 'Component updates sent upstream.'),
+    'froeling_requests_saved': ('gauge', 'Updates saved compared to polling at the minimum interval.'),
+}
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(labels: dict[str, Any]) -> str:
+    return ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items() if v is not None)
+
+
+class Exporter:
+    """Serves the cached values of polled components in the Prometheus text format."""
+
+    def __init__(
+        self,
+        api: Froeling,
+        *,
+        poller: AdaptivePoller | None = None,
+        stale_after: float | None = None,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        """Initialize an Exporter.
+
+        Args:
+        ----
+            api (Froeling): Client of the exported account.
+            poller (AdaptivePoller | None): Poller refreshing the components.
+                Defaults to None (a new one with default intervals).
+            stale_after (float | None): Seconds after which a component without a
+                successful update counts as stale. Defaults to None (twice the
+                poller's `max_interval`).
+            logger (logging.Logger | None): Logger for failed updates. Defaults to None.
+
+        """
+        self.api = api
+        self._logger = logger or logging.getLogger(__name__)
+        self.poller = poller or AdaptivePoller(logger=self._logger)
+        self.stale_after = 2 * self.poller.max_interval if stale_after is None else stale_after
+        self.components: list[Component] = []
+
+    async def setup(self) -> None:
+        """Find the components to export and start polling them."""
+        for facility in await self.api.get_facilities():
+            for component in await facility.get_components():
+                if component is not None:
+                    self.components.append(component)
+                    self.poller.add(component, facility)
+
+    async def run(self) -> None:
+        """Set up, then refresh the components until cancelled."""
+        await self.setup()
+        await self.poller.run()
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        samples: dict[str, list[str]] = {name: [] for name in _FAMILIES}
+        for component in self.components:
+            polled = self.poller.components.get((component.facility_id, component.component_id))
+            if polled is None:
+                continue
+            age = self.poller.age(component)
+            ids = {'facility_id': component.facility_id, 'component_id': component.component_id}
+            component_labels = _labels(ids)
+            stale = age is None or age > self.stale_after
+            samples['froeling_component_stale'].append(f'{{{component_labels}}} {int(stale)}')
+            samples['froeling_component_update_errors_total'].append(f'{{{component_labels}}} {polled.errors}')
+            samples['froeling_component_poll_interval_seconds'].append(f'{{{component_labels}}} {polled.interval}')
+            if age is None:
+                continue
+            for parameter in component.parameters.values():
+                value = parameter.typed_value
+                if not isinstance(value, int | float) or isinstance(value, bool):
+                    continue
+                labels = _labels({**ids, 'parameter_id': parameter.id, 'name': parameter.name, 'unit': parameter.unit})
+                samples['froeling_parameter_value'].append(f'{{{labels}}} {value}')
+                samples['froeling_parameter_age_seconds'].append(f'{{{labels}}} {age:.3f}')
+
+        stats = self.poller.stats
+        samples['froeling_requests_total'].append(f' {stats.requests}')
+        samples['froeling_requests_saved'].append(f' {stats.saved}')
+
+        lines = []
+        for name, (kind, description) in _FAMILIES.items():
+            lines += [f'# HELP {name} {description}', f'# TYPE {name} {kind}']
+            lines += [name + sample for sample in samples[name]]
+        return '\n'.join(lines) + '\n'
+
+    async def _metrics(self, _: web.Request) -> web.Response:
+        return web.Response(body=self.render().encode(), headers={'Content-Type': CONTENT_TYPE})
+
+    def create_app(self) -> web.Application:
+        """Create an application serving `/metrics` that refreshes the components while it runs."""
+        app = web.Application()
+        app.router.add_get('/metrics', self._metrics)
+
+        async def refresh(_: web.Application) -> AsyncIterator[None]:
+            await self.setup()
+            task = asyncio.create_task(self.poller.run())
+            yield
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+        app.cleanup_ctx.append(refresh)
+        return app
+
+
+async def create_app(
+    username: str | None = None,
+    password: str | None = None,
+    token: str | None = None,
+    *,
+    min_interval: float = 30.0,
+    max_interval: float = 900.0,
+    **client_options: Any,
+) -> web.Application:
+    """Create a ready to serve exporter application that owns its client."""
+    async with contextlib.AsyncExitStack() as stack:
+        api = await stack.enter_async_context(
+            Froeling(username, password, token, auto_reauth=bool(username and password), **client_options)
+        )
+        exporter = Exporter(api, poller=AdaptivePoller(min_interval=min_interval, max_interval=max_interval))
+        app = exporter.create_app()
+        cleanup = stack.pop_all()
+
+    async def close_client(_: web.Application) -> None:
+        await cleanup.aclose()
+
+    app.on_cleanup.append(close_client)
+    return app
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the exporter from the command line."""
+    parser = argparse.ArgumentParser(prog='python -m froeling.prometheus', description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind to (default: %(default)s).')
+    parser.add_argument('--port', type=int, default=9100, help='Port to listen on (default: %(default)s).')
+    add_client_arguments(parser)
+    parser.add_argument('--min-interval', type=float, default=30.0, help='Seconds (default: %(default)s).')
+    parser.add_argument('--max-interval', type=float, default=900.0, help='Seconds (default: %(default)s).')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    app = create_app(
+        args.username,
+        args.password,
+        args.token,
+        min_interval=args.min_interval,
+        max_interval=args.max_interval,
+        language=args.language,
+        token_store=token_store(args),
+    )
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
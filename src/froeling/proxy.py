@@ -0,0 +1,182 @@
+"""Caching reverse proxy for the Fröling Connect API.
+
+The proxy holds the only upstream login and exposes the same REST routes locally.
+Reads are served from a shared, bounded TTL cache (concurrent requests for the
+same URL result in a single upstream request), writes are forwarded and
+invalidate the cached data of the affected facility, the facility list and the
+notifications. Query strings are not forwarded and requests for other users are
+rejected locally, so clients can't grow the cache or bypass it. Any number of clients can point at it:
+
+    python -m froeling.proxy --port 8080
+
+    async with Froeling(token=..., base_url='http://127.0.0.1:8080') as api:
+        ...
+
+Clients can also log in with any username and password; they receive a local
+token that only carries the proxied user's id. The upstream token never leaves
+the proxy, but anyone who can reach the proxy acts as the proxied user, so only
+bind it to trusted interfaces.
+"""
+
+import argparse
+import base64
+import json
+import logging
+import math
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiohttp import web
+
+from froeling import endpoints, routes
+from froeling.arguments import add_client_arguments
+from froeling.cache import TTLCache
+from froeling.exceptions import AuthenticationError, CircuitOpenError, NetworkError, ParsingError
+from froeling.session import Session
+
+_INVALIDATED_BY_WRITES = frozenset({'FACILITY', 'NOTIFICATION_COUNT', 'NOTIFICATION_LIST'})
+"""Routes outside the written facility whose responses can change with a write."""
+
+
+class Proxy:
+    """An aiohttp application forwarding requests through a single `Session`."""
+
+    def __init__(
+        self,
+        session: Session,
+        *,
+        ttl: float = 30.0,
+        max_entries: int = 1024,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        """Initialize a Proxy.
+
+        Args:
+        ----
+            session (Session): Upstream session. Its token is never handed out to clients.
+            ttl (float): Seconds a response is served from cache. Defaults to 30.
+            max_entries (int): Most responses cached. Defaults to 1024.
+            logger (logging.Logger | None): Logger for debugging and events. Defaults to None.
+
+        """
+        self.session = session
+        self.cache: TTLCache[str, Any] = TTLCache(ttl, max_items=max_entries)
+        self._logger = logger or logging.getLogger(__name__)
+
+        self.app = web.Application(middlewares=[self._error_middleware])
+        for route in routes.ROUTES:
+            if route.name == 'LOGIN':
+                self.app.router.add_post(route.path, self._login)
+            elif route.name == 'SET_PARAMETER':
+                self.app.router.add_put(route.path, self._write)
+            else:
+                self.app.router.add_get(route.path, self._read)
+
+    async def start(self) -> None:
+        """Log in upstream, unless the session already has a token."""
+        if not self.session.token:
+            await self.session.renew_token()
+
+    @property
+    def local_token(self) -> str:
+        """Token handed to clients. It only tells them which user id to use."""
+        payload = json.dumps({'userId': self.session.user_id}).encode()
+        return f'proxy.{base64.b64encode(payload).decode().rstrip("=")}.local'
+
+    async def _fetch(self, path: str) -> Any:
+        return await self.cache.get_or_fetch(
+            path,
+            lambda: self.session.request('get', endpoints.BASE_URL + path),
+        )
+
+    def _check_user(self, request: web.Request) -> None:
+        """Reject requests for other users, which would only fail upstream."""
+        if request.match_info.get('p0') != str(self.session.user_id):
+            raise web.HTTPNotFound
+
+    async def _login(self, _: web.Request) -> web.Response:
+        userdata = await self._fetch(endpoints.USER.format(self.session.user_id).removeprefix(endpoints.BASE_URL))
+        return web.json_response(userdata, headers={'Authorization': self.local_token})
+
+    async def _read(self, request: web.Request) -> web.Response:
+        self._check_user(request)
+        return web.json_response(await self._fetch(request.path))
+
+    async def _write(self, request: web.Request) -> web.Response:
+        self._check_user(request)
+        res = await self.session.request(
+            request.method.lower(),
+            endpoints.BASE_URL + request.path,
+            json=await request.json(),
+        )
+        facility_path = f'/facility/{request.match_info["p1"]}/'
+
+        def affected(key: str) -> bool:
+            if facility_path in key:
+                return True
+            route = routes.match(key)
+            return route is not None and route.name in _INVALIDATED_BY_WRITES
+
+        self.cache.invalidate(affected)
+        return web.json_response(res)
+
+    @web.middleware
+    async def _error_middleware(
+        self,
+        request: web.Request,
+        handler: Callable[[web.Request], Awaitable[web.StreamResponse]],
+    ) -> web.StreamResponse:
+        try:
+            return await handler(request)
+        except NetworkError as e:
+            return web.Response(status=e.status, text=str(e))
+        except AuthenticationError as e:
+            self._logger.warning('Upstream authentication failed: %s', e)
+            return web.Response(status=502, text=str(e))
+        except ParsingError as e:
+            return web.Response(status=502, text=e.msg)
+        except CircuitOpenError as e:
+            retry_after = str(max(1, math.ceil(e.retry_after)))
+            return web.Response(status=503, text=str(e), headers={'Retry-After': retry_after})
+
+
+async def create_app(
+    username: str | None = None,
+    password: str | None = None,
+    token: str | None = None,
+    *,
+    ttl: float = 30.0,
+    language: str = 'en',
+) -> web.Application:
+    """Create a ready to serve proxy application that owns its upstream session."""
+    session = Session(username, password, token, auto_reauth=bool(username and password), lang=language)
+    proxy = Proxy(session, ttl=ttl)
+    try:
+        await proxy.start()
+    except Exception:
+        await session.close()
+        raise
+
+    async def close_session(_: web.Application) -> None:
+        await session.close()
+
+    proxy.app.on_cleanup.append(close_session)
+    return proxy.app
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the proxy from the command line."""
+    parser = argparse.ArgumentParser(prog='python -m froeling.proxy', description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind to (default: %(default)s).')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on (default: %(default)s).')
+    parser.add_argument('--ttl', type=float, default=30.0, help='Seconds to cache reads (default: %(default)s).')
+    add_client_arguments(parser, token_cache=False)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    app = create_app(args.username, args.password, args.token, ttl=args.ttl, language=args.language)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Map concrete API URLs back to the endpoint templates they were built from."""
+
+import re
+from dataclasses import dataclass
+
+from yarl import URL
+
+from froeling import endpoints
+
+
+@dataclass(frozen=True)
+class Route:
+    """An API endpoint template.
+
+    Attributes:
+        name (str): Name of the constant in `froeling.endpoints`.
+        template (str): Full URL template with positional `{}` placeholders.
+        path (str): URL path with named placeholders (`{p0}`, `{p1}`, ...),
+            usable as an aiohttp route.
+        pattern (re.Pattern[str]): Regular expression matching the paths of the
+            endpoint, capturing the placeholder values.
+
+    """
+
+    name: str
+    template: str
+    path: str
+    pattern: re.Pattern[str]
+
+    @classmethod
+    def _from_template(cls, name: str, template: str) -> 'Route':
+        path = template.removeprefix(endpoints.BASE_URL)
+        parts = path.split('{}')
+        named = parts[0]
+        regex = re.escape(parts[0])
+        for i, part in enumerate(parts[1:]):
+            named += f'{{p{i}}}{part}'
+            regex += f'([^/]+){re.escape(part)}'
+        return cls(name, template, named, re.compile(regex))
+
+
+# Order matters: more specific templates must come before ones that would also match them.
+ROUTES: tuple[Route, ...] = tuple(
+    Route._from_template(name, getattr(endpoints, name))  # noqa: SLF001
+    for name in (
+        'LOGIN',
+        'USER',
+        'FACILITY',
+        'OVERVIEW',
+        'COMPONENT_LIST',
+        'COMPONENT',
+        'NOTIFICATION_COUNT',
+        'NOTIFICATION_LIST',
+        'NOTIFICATION',
+        'SET_PARAMETER',
+    )
+)
+
+
+def match(url: str | URL) -> Route | None:
+    """Return the route a URL belongs to, ignoring host and query string."""
+    path = URL(url).path
+    for route in ROUTES:
+        if route.pattern.fullmatch(path):
+            return route
+    return None
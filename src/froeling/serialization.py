@@ -0,0 +1,105 @@
+"""Serialize datamodels to compact bytes, e.g. to pass them between processes.
+
+`dumps` encodes a `Facility`, `Component`, `Parameter`, notification, or a list of
+them, into JSON or MessagePack bytes. Sessions are never included, `loads`
+attaches the given one (or none, for read-only use):
+
+    data = dumps(component, fmt='msgpack')
+    component = loads(data, session, fmt='msgpack')
+
+JSON works with the standard library alone and uses msgspec when installed.
+MessagePack requires msgspec (`pip install froeling-connect[fast]`).
+Pickling the datamodels goes through the same `to_dict`/`from_dict` methods.
+"""
+
+import json
+from typing import Any, Protocol
+
+from froeling import decoding
+from froeling.datamodels import Component, Facility, NotificationDetails, NotificationOverview, Parameter
+from froeling.session import Session
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depends on the environment
+    msgspec = None  # type: ignore[assignment]
+
+
+class Serializable(Protocol):
+    """A datamodel with `to_dict` and `from_dict`."""
+
+    def to_dict(self) -> dict[str, Any]: ...
+
+
+TYPES: dict[str, Any] = {
+    cls.__name__: cls for cls in (Facility, Component, Parameter, NotificationOverview, NotificationDetails)
+}
+"""Datamodels `dumps` accepts, by the name stored in the encoded data."""
+
+FORMATS = ('json', 'msgpack')
+
+
+def to_builtins(obj: Serializable | list[Serializable]) -> list:
+    """Turn a datamodel or a list of datamodels into tagged builtins for `from_builtins`."""
+    objects = obj if isinstance(obj, list) else [obj]
+    tagged = []
+    for o in objects:
+        name = type(o).__name__
+        if TYPES.get(name) is not type(o):
+            msg = f'Can not serialize {type(o).__qualname__}.'
+            raise TypeError(msg)
+        tagged.append([name, o.to_dict()])
+    return [isinstance(obj, list), tagged]
+
+
+def from_builtins(data: list, session: Session | None = None) -> Any:
+    """Restore the datamodels of `to_builtins`, attaching `session`."""
+    is_list, tagged = data
+    objects = [TYPES[name].from_dict(obj, session) for name, obj in tagged]
+    return objects if is_list else objects[0]
+
+
+def dumps(obj: Serializable | list[Serializable], *, fmt: str = 'json') -> bytes:
+    """Encode a datamodel or a list of datamodels.
+
+    Args:
+    ----
+        obj (Serializable | list[Serializable]): What to encode.
+        fmt (str): 'json' or 'msgpack'. Defaults to 'json'.
+
+    """
+    data = to_builtins(obj)
+    if fmt == 'msgpack':
+        return _msgspec(fmt).msgpack.encode(data)
+    if fmt != 'json':
+        msg = f'Unknown format {fmt!r}, use one of {FORMATS}.'
+        raise ValueError(msg)
+    if msgspec is not None:
+        return msgspec.json.encode(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def loads(data: bytes, session: Session | None = None, *, fmt: str = 'json') -> Any:
+    """Decode datamodels encoded by `dumps`.
+
+    Args:
+    ----
+        data (bytes): Encoded datamodels.
+        session (Session | None): Session the restored models use for requests.
+            Defaults to None (read-only).
+        fmt (str): 'json' or 'msgpack'. Defaults to 'json'.
+
+    """
+    if fmt == 'msgpack':
+        return from_builtins(_msgspec(fmt).msgpack.decode(data), session)
+    if fmt != 'json':
+        msg = f'Unknown format {fmt!r}, use one of {FORMATS}.'
+        raise ValueError(msg)
+    return from_builtins(decoding.loads(data), session)
+
+
+def _msgspec(fmt: str) -> Any:
+    if msgspec is None:
+        msg = f'The {fmt} format requires msgspec, install froeling-connect[fast].'
+        raise ImportError(msg)
+    return msgspec
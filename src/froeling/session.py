@@ -1,20 +1,81 @@
 """Manages authentication, requests and error handling."""
 
-import base64
+import asyncio
+import contextlib
+import copy
 import json
 import logging
-from collections.abc import Callable
+import time
+from collections.abc import Callable, Mapping
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
 from http import HTTPStatus
-from typing import Any
+from typing import Any, TypeVar
 
 from aiohttp import ClientSession
 from aiohttp.typedefs import StrOrURL
 
-from froeling import endpoints, exceptions
+from froeling import decoding, endpoints, exceptions, profiling, routes, tokenstore
+from froeling.cache import LRUCache, approximate_size
+from froeling.circuitbreaker import CircuitBreaker, CircuitBreakerConfig
+from froeling.events import EventBus, EventType
+from froeling.tokenstore import TokenStore
 
 HTTP_STATUS_SUCCESS_MIN = 200
 HTTP_STATUS_SUCCESS_MAX = 299
 
+T = TypeVar('T')
+
+CONDITIONAL_ROUTES = frozenset({'COMPONENT', 'FACILITY', 'NOTIFICATION_LIST'})
+"""Routes fetched with conditional GETs once the server sent an `ETag` or `Last-Modified`."""
+
+
+@dataclass(frozen=True)
+class OffloadConfig:
+    """When to move decoding and model construction off the event loop.
+
+    Attributes:
+        min_bytes (int): Response bodies of at least this size are decoded in `executor`.
+        min_items (int): Lists of at least this many items are turned into
+            datamodels in a thread.
+        executor (Executor | None): Executor for decoding. Datamodels reference the
+            session, so with a process pool they are built in the loop's default
+            thread pool instead. Defaults to None (the loop's default thread pool).
+
+    """
+
+    min_bytes: int = 256 * 1024
+    min_items: int = 500
+    executor: Executor | None = None
+
+
+@dataclass
+class CachedResponse:
+    """A response of a conditional route and its validators.
+
+    Attributes:
+        etag (str | None): `ETag` header of the response.
+        last_modified (str | None): `Last-Modified` header of the response.
+        data (Any): Decoded body, returned again when the server answers 304 Not Modified.
+            It is the same object every time, so it must not be modified.
+        model (Any): Datamodel `Session.get_model` built from `data`, if any.
+
+    """
+
+    etag: str | None
+    last_modified: str | None
+    data: Any
+    model: Any = None
+
+    def headers(self) -> dict[str, str]:
+        """Headers that make a GET conditional on the response having changed."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
 
 class Session:
     """Represents an authenticated session with the API.
@@ -44,6 +105,13 @@ class Session:
         lang: str = 'en',
         logger: logging.Logger | None = None,
         clientsession: ClientSession | None = None,
+        base_url: str | None = None,
+        circuit_breaker: CircuitBreakerConfig | None = None,
+        offload: OffloadConfig | None = None,
+        token_store: TokenStore | None = None,
+        conditional_requests: bool = True,
+        notification_cache: LRUCache[int, Any] | None = None,
+        events: EventBus | None = None,
     ) -> None:
         """Initialize a new Session.
 
@@ -64,9 +132,25 @@ class Session:
             logger (logging.Logger | None): Logger instance for debugging and events.
             clientsession (ClientSession | None): Optional aiohttp
                 client session to reuse instead of creating a new one.
+            base_url (str | None): Send requests to this scheme and host instead of
+                the official API (e.g. a local `froeling.proxy`). Defaults to None.
+            circuit_breaker (CircuitBreakerConfig | None): Enable a circuit breaker
+                per endpoint with these settings. Defaults to None (disabled).
+            offload (OffloadConfig | None): Decode large responses and build large
+                lists of datamodels off the event loop. Defaults to None (disabled).
+            token_store (TokenStore | None): Start with its token while it is valid
+                and save every new token to it. Defaults to None.
+            conditional_requests (bool): Remember the `ETag` and `Last-Modified` of
+                `CONDITIONAL_ROUTES` and reuse the previous response when the server
+                answers 304 Not Modified. Defaults to True.
+            notification_cache (LRUCache[int, Any] | None): Cache of `NotificationDetails`
+                by notification id. Defaults to None (up to 256 details and about 1 MiB).
+            events (EventBus | None): Bus to publish events to, e.g. one shared by the
+                sessions of several accounts. Defaults to None (a new one).
 
         """
-        if not (token or (username and password)):
+        stored = token_store.load() if token_store else None
+        if not (token or (username and password) or tokenstore.is_valid(stored)):
             msg = 'Set either token or username and password.'
             raise ValueError(msg)
         if auto_reauth and not (username and password):
@@ -79,17 +163,79 @@ class Session:
         self.password = password
         self.auto_reauth = auto_reauth
         self.token_callback = token_callback
+        self.token_store = token_store
+        self.base_url = base_url.rstrip('/') if base_url else None
 
+        if token_store is not None:
+            usable = [t for t in (token, stored) if tokenstore.is_valid(t)]
+            if usable:
+                token = usable[0]
+            elif username and password:
+                token = None  # Log in instead of using an expired token.
         if token:
             self.set_token(token)
 
         self._logger = logger or logging.getLogger(__name__)
         self._reauth_previous = False  # Did the previous request result in renewing the token?
+        self._pending_writes: set[asyncio.Task] = set()
+        self.circuit_breaker_config = circuit_breaker
+        self.circuit_breakers: dict[str, CircuitBreaker] = {}
+        self.offload_config = offload
+        self.conditional_requests = conditional_requests
+        self.cached_responses: dict[str, CachedResponse] = {}
+        if notification_cache is None:
+            notification_cache = LRUCache(256, 1024 * 1024, size=lambda details: approximate_size(details.raw))
+        self.notification_cache = notification_cache
+        self.events = events or EventBus()
+
+    async def offload(self, func: Callable[..., T], *args: Any, items: int) -> T:
+        """Call `func(*args)` in a thread if offloading is enabled and `items` reaches `min_items`.
+
+        Used to build datamodels from large responses without blocking the event loop.
+        """
+        config = self.offload_config
+        if config is None or items < config.min_items:
+            return func(*args)
+        executor = None if isinstance(config.executor, ProcessPoolExecutor) else config.executor
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+    async def _decode(self, body: bytes) -> Any:
+        config = self.offload_config
+        if config is None or len(body) < config.min_bytes:
+            return decoding.loads(body)
+        return await asyncio.get_running_loop().run_in_executor(config.executor, decoding.loads, body)
+
+    async def get_model(self, url: str, build: Callable[..., T], *args: Any) -> T:
+        """GET `url` and build a datamodel with `build(data, *args)`, offloaded like `offload`.
+
+        If the server answers 304 Not Modified, the model built from the previous
+        response is returned again without parsing anything. It is a shallow copy:
+        callers may change the returned list, but the datamodels in it are shared.
+        """
+        data = await self.request('get', url)
+        cached = self.cached_responses.get(str(self._resolve(url)))
+        if cached is None or cached.data is not data:
+            return await self.offload(build, data, *args, items=len(data))
+        if cached.model is None:
+            cached.model = await self.offload(build, data, *args, items=len(data))
+        return copy.copy(cached.model)
 
     async def close(self) -> None:
-        """Close the session."""
+        """Wait for pending writes, then close the session."""
+        await self.wait_for_writes()
         await self.clientsession.close()
 
+    async def wait_for_writes(self) -> None:
+        """Wait until all writes that are in flight have completed."""
+        while self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+
+    def _resolve(self, url: StrOrURL) -> StrOrURL:
+        """Point an endpoint URL at `base_url` if one is configured."""
+        if self.base_url and isinstance(url, str) and url.startswith(endpoints.BASE_URL):
+            return self.base_url + url.removeprefix(endpoints.BASE_URL)
+        return url
+
     def set_token(self, token: str) -> None:
         """Set the token used in Authorization and updates/sets user-id.
 
@@ -97,8 +243,8 @@ class Session:
         """
         self._headers['Authorization'] = token
         try:
-            self.user_id = json.loads(base64.b64decode(token.split('.')[1] + '==').decode('utf-8'))['userId']
-        except Exception as e:
+            self.user_id = tokenstore.token_claims(token)['userId']
+        except KeyError as e:
             msg = 'Token is in an invalid format.'
             raise ValueError(msg) from e
         self.token = token
@@ -109,7 +255,7 @@ class Session:
         :return: Json sent by server (includes userdata)
         """
         data = {'osType': 'web', 'username': self.username, 'password': self.password}
-        async with await self.clientsession.post(endpoints.LOGIN, json=data) as res:
+        async with await self.clientsession.post(self._resolve(endpoints.LOGIN), json=data) as res:
             if not HTTP_STATUS_SUCCESS_MIN <= res.status <= HTTP_STATUS_SUCCESS_MAX:
                 msg = f'Server returned {res.status}: "{await res.text()}"'
                 raise exceptions.AuthenticationError(msg)
@@ -117,30 +263,123 @@ class Session:
             if self.token_callback:
                 self.token_callback(token)
             self.set_token(token)
+            if self.token_store:
+                self.token_store.save(token)
             userdata = await res.json()
         self._logger.debug('Logged in with username and password.')
         return userdata
 
+    async def renew_token(self) -> dict | None:
+        """Get a new token, preferring one another session stored since the current one.
+
+        With a `token_store` this holds its lock, so sessions sharing the store
+        log in once instead of replacing each other's tokens.
+
+        :return: Json sent by server if it logged in, None if a stored token was used
+        """
+        try:
+            data = await self._renew_token()
+        except Exception as e:
+            self.events.emit(EventType.ERROR, error=e)
+            raise
+        self.events.emit(EventType.TOKEN_RENEWED)
+        return data
+
+    async def _renew_token(self) -> dict | None:
+        if self.token_store is None:
+            return await self.login()
+        current = self.token
+        async with self.token_store.lock():
+            stored = self.token_store.load()
+            if stored != current and tokenstore.is_valid(stored):
+                self.set_token(stored)  # type: ignore[arg-type]
+                self._logger.debug('Using the token from the token store.')
+                return None
+            return await self.login()
+
     async def request(self, method: str, url: StrOrURL, headers: dict | None = None, **kwargs: Any) -> Any:
         """Do a web request.
 
+        Requests other than GET run shielded: when the caller is cancelled, the write
+        still completes and `close` waits for it.
+        With a circuit breaker configured, requests to a route whose circuit is open
+        raise `CircuitOpenError` without being sent.
+        GETs of `CONDITIONAL_ROUTES` that the server answers with 304 Not Modified return
+        the data of the previous response itself, not a copy: it must not be modified.
+
         :param method:
         :param url:
         :param headers: Additional headers used in the request
         :param kwargs:
         """
+        breaker = self._circuit_breaker(url)
+        if breaker is None:
+            return await self._dispatch(method, url, headers, **kwargs)
+        with breaker.guard():
+            return await self._dispatch(method, url, headers, **kwargs)
+
+    def _circuit_breaker(self, url: StrOrURL) -> CircuitBreaker | None:
+        """Get the circuit breaker of the route `url` belongs to, if enabled."""
+        if self.circuit_breaker_config is None:
+            return None
+        route = routes.match(url)
+        if route is None:
+            return None
+        breaker = self.circuit_breakers.get(route.name)
+        if breaker is None:
+            breaker = CircuitBreaker(route.name, self.circuit_breaker_config)
+            self.circuit_breakers[route.name] = breaker
+        return breaker
+
+    async def _dispatch(self, method: str, url: StrOrURL, headers: dict | None = None, **kwargs: Any) -> Any:
+        if method.lower() == 'get':
+            return await self._request(method, url, headers, **kwargs)
+
+        task = asyncio.create_task(self._request(method, url, headers, **kwargs))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+        return await asyncio.shield(task)
+
+    async def _request(self, method: str, url: StrOrURL, headers: dict | None = None, **kwargs: Any) -> Any:
+        url = self._resolve(url)
         self._logger.debug('Sent %s: %s', method.upper(), url)
-        request_headers = self._headers
-        if headers:
-            request_headers |= headers
+        request_headers = self._headers | headers if headers else self._headers
+
+        cache_key = None
+        if self.conditional_requests and method.lower() == 'get':
+            route = routes.match(url)
+            if route is not None and route.name in CONDITIONAL_ROUTES:
+                cache_key = str(url)
+                cached = self.cached_responses.get(cache_key)
+                if cached is not None:
+                    request_headers = request_headers | cached.headers()
 
+        profiler = profiling.active
+        if profiler is not None:
+            route = routes.match(url)
+            key = route.name if route else str(url)
+        started = time.perf_counter()
         try:
             async with await self.clientsession.request(method, url, headers=request_headers, **kwargs) as res:
+                if profiler is not None:
+                    profiler.record('network', key, time.perf_counter() - started)
                 if HTTP_STATUS_SUCCESS_MIN <= res.status <= HTTP_STATUS_SUCCESS_MAX:
-                    r = await res.text()
-                    self._logger.debug('Got %s', r)
+                    with profiler.measure('read', key) if profiler else contextlib.nullcontext():
+                        body = await res.read()
+                    self._logger.debug('Got %s', body)
                     self._reauth_previous = False
-                    return await res.json()
+                    if not body.strip():
+                        return None
+                    with profiler.measure('decode', key) if profiler else contextlib.nullcontext():
+                        data = await self._decode(body)
+                    if cache_key is not None:
+                        self._store_validators(cache_key, res.headers, data)
+                    return data
+
+                if res.status == HTTPStatus.NOT_MODIFIED and cache_key in self.cached_responses:
+                    self._logger.debug('Not modified: %s', url)
+                    self._reauth_previous = False
+                    return self.cached_responses[cache_key].data
 
                 if res.status == HTTPStatus.UNAUTHORIZED:
                     if self.auto_reauth:
@@ -148,10 +387,10 @@ class Session:
                             msg = 'Reauth did not work.'
                             raise exceptions.AuthenticationError(msg, await res.text())
                         self._logger.info('Error %s, renewing token...', await res.text())
-                        await self.login()
+                        await self.renew_token()
                         self._logger.info('Reauthorized.')
                         self._reauth_previous = True
-                        return await self.request(method, url, **kwargs)
+                        return await self._request(method, url, **kwargs)
 
                     self._logger.error('Request unauthorized')
                     msg = 'Request not authorized: '
@@ -168,3 +407,11 @@ class Session:
 
         except json.decoder.JSONDecodeError as e:
             raise exceptions.ParsingError(e.msg, e.doc, e.pos, url) from e
+
+    def _store_validators(self, key: str, headers: Mapping[str, str], data: Any) -> None:
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if etag or last_modified:
+            self.cached_responses[key] = CachedResponse(etag, last_modified, data)
+        else:
+            self.cached_responses.pop(key, None)
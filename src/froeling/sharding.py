@@ -0,0 +1,377 @@
+"""Poll large fleets with a pool of worker processes.
+
+Parsing responses of hundreds of facilities keeps a single event loop busy.
+`ShardedRunner` splits the accounts (or their facilities) into shards. Each
+shard runs in its own process, with its own event loop and `Froeling` clients,
+and sends a snapshot of every updated component back over one queue. A token
+bucket in shared memory limits the request rate of all workers together, and
+the workers of an account share its token through a `FileTokenStore`, so the
+account is logged into once instead of once per worker.
+
+    accounts = [Account(token=t) for t in tokens]
+    with ShardedRunner(accounts, processes=4, rate=20, interval=300) as runner:
+        for result in runner.results():
+            print(result.facility_id, result.component)
+"""
+
+import asyncio
+import contextlib
+import dataclasses
+import logging
+import multiprocessing
+import os
+import queue
+import tempfile
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from multiprocessing.context import BaseContext
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+from froeling.client import Froeling
+from froeling.datamodels import Component, ComponentSnapshot, Facility
+from froeling.tokenstore import FileTokenStore
+
+
+@dataclass(frozen=True)
+class Account:
+    """Credentials of an account, and optionally the facilities to poll.
+
+    Attributes:
+        username (str | None): Email used to log into the account.
+        password (str | None): Password of the account.
+        token (str | None): Token, instead of or in addition to username and password.
+        facility_ids (tuple[int, ...] | None): Facilities to poll. When given, they are
+            spread over the shards individually, and the workers polling them share the
+            account's token. Defaults to None (all, in one shard).
+
+    """
+
+    username: str | None = None
+    password: str | None = None
+    token: str | None = dataclasses.field(default=None, repr=False)
+    facility_ids: tuple[int, ...] | None = None
+
+
+@dataclass(frozen=True)
+class ShardResult:
+    """A component update (or failure) reported by a worker.
+
+    Attributes:
+        shard (int): Index of the worker.
+        account (int): Index of the account in the list given to `ShardedRunner`.
+        facility_id (int | None): Facility of the component, None if fetching
+            the facilities failed.
+        component (ComponentSnapshot | None): Snapshot of the updated component,
+            None on errors.
+        error (str | None): Description of the error, if the update failed.
+        timestamp (float): Unix time of the update.
+
+    """
+
+    shard: int
+    account: int
+    facility_id: int | None
+    component: ComponentSnapshot | None
+    error: str | None = None
+    timestamp: float = dataclasses.field(default_factory=time.time)
+
+
+@dataclass(frozen=True)
+class _Done:
+    shard: int
+
+
+class SharedRateLimiter:
+    """Token bucket shared between processes through shared memory.
+
+    Allows `rate` requests per second on average, and bursts of up to `burst`.
+    """
+
+    def __init__(self, rate: float, burst: float | None = None, *, context: BaseContext | None = None) -> None:
+        """Initialize a SharedRateLimiter.
+
+        Args:
+        ----
+            rate (float): Requests per second of all processes together.
+            burst (float | None): Size of the bucket. Defaults to None (`rate`, at least 1).
+            context (BaseContext | None): Multiprocessing context the runner uses.
+                Defaults to None (the default context).
+
+        """
+        if rate <= 0:
+            msg = 'rate must be positive.'
+            raise ValueError(msg)
+        context = context or multiprocessing.get_context()
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self._lock = context.Lock()
+        self._tokens = context.RawValue('d', self.burst)
+        self._updated = context.RawValue('d', time.monotonic())
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available.
+
+        Returns
+        -------
+            float: 0 if a token was taken, otherwise the seconds until one is available.
+
+        """
+        with self._lock:
+            now = time.monotonic()
+            tokens = min(self.burst, self._tokens.value + (now - self._updated.value) * self.rate)
+            self._updated.value = now
+            if tokens >= 1:
+                self._tokens.value = tokens - 1
+                return 0.0
+            self._tokens.value = tokens
+            return (1 - tokens) / self.rate
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+def shard(accounts: Iterable[Account], count: int) -> list[list[tuple[int, Account]]]:
+    """Split accounts into `count` shards of similar size.
+
+    Accounts with `facility_ids` are split into one unit per facility, other
+    accounts are a single unit. Units of one account in the same shard are merged
+    again, so every worker logs into each of its accounts once.
+    """
+    units: list[tuple[int, Account]] = []
+    for index, account in enumerate(accounts):
+        if account.facility_ids:
+            units += [(index, dataclasses.replace(account, facility_ids=(f,))) for f in account.facility_ids]
+        else:
+            units.append((index, account))
+
+    shards: list[list[tuple[int, Account]]] = []
+    for i in range(count):
+        merged: dict[int, Account] = {}
+        for index, account in units[i::count]:
+            if index in merged and account.facility_ids:
+                previous = merged[index].facility_ids or ()
+                account = dataclasses.replace(account, facility_ids=previous + account.facility_ids)  # noqa: PLW2901
+            merged[index] = account
+        shards.append(list(merged.items()))
+    return [s for s in shards if s]
+
+
+@dataclass(frozen=True)
+class _Options:
+    interval: float
+    rounds: int | None
+    concurrency: int
+    fields: tuple[str, ...] | None
+    client_options: dict[str, Any]
+    token_dir: str | None = None
+
+
+async def _poll_shard(
+    shard_index: int,
+    accounts: list[tuple[int, Account]],
+    results: Any,
+    limiter: SharedRateLimiter,
+    stop: Any,
+    options: _Options,
+) -> None:
+    """Poll the components of a shard, putting a `ShardResult` per update into `results`."""
+    logger = logging.getLogger(__name__)
+    semaphore = asyncio.Semaphore(options.concurrency)
+    async with contextlib.AsyncExitStack() as stack:
+        targets: list[tuple[int, Facility, Component]] = []
+        for index, account in accounts:
+            client_options = options.client_options
+            if options.token_dir is not None and 'token_store' not in client_options:
+                token_path = Path(options.token_dir) / f'account-{index}.json'
+                client_options = {**client_options, 'token_store': FileTokenStore(token_path)}
+            try:
+                api = await stack.enter_async_context(
+                    Froeling(account.username, account.password, account.token, **client_options)
+                )
+                await limiter.acquire()
+                facilities = await api.get_facilities()
+                if account.facility_ids is not None:
+                    facilities = [f for f in facilities if f.facility_id in account.facility_ids]
+                for facility in facilities:
+                    await limiter.acquire()
+                    targets += [(index, facility, c) for c in await facility.get_components() if c is not None]
+            except Exception as e:
+                logger.exception('Shard %s: setting up account %s failed.', shard_index, index)
+                results.put(ShardResult(shard_index, index, None, None, repr(e)))
+
+        async def update(index: int, facility: Facility, component: Component) -> None:
+            async with semaphore:
+                await limiter.acquire()
+                try:
+                    await component.update(options.fields)
+                except Exception as e:
+                    logger.exception('Shard %s: updating %s failed.', shard_index, component)
+                    results.put(ShardResult(shard_index, index, facility.facility_id, None, repr(e)))
+                else:
+                    results.put(ShardResult(shard_index, index, facility.facility_id, component.snapshot()))
+
+        rounds = 0
+        while targets and not stop.is_set():
+            started = time.monotonic()
+            await asyncio.gather(*(update(*target) for target in targets))
+            rounds += 1
+            if options.rounds is not None and rounds >= options.rounds:
+                break
+            remaining = options.interval - (time.monotonic() - started)
+            if remaining > 0:
+                await asyncio.to_thread(stop.wait, remaining)
+
+
+def _work(
+    shard_index: int,
+    accounts: list[tuple[int, Account]],
+    results: Any,
+    limiter: SharedRateLimiter,
+    stop: Any,
+    options: _Options,
+) -> None:
+    """Entry point of a worker process."""
+    try:
+        asyncio.run(_poll_shard(shard_index, accounts, results, limiter, stop, options))
+    finally:
+        results.put(_Done(shard_index))
+
+
+class ShardedRunner:
+    """Polls the components of many accounts with a pool of worker processes."""
+
+    def __init__(
+        self,
+        accounts: Iterable[Account],
+        *,
+        processes: int | None = None,
+        rate: float = 10.0,
+        interval: float = 60.0,
+        rounds: int | None = None,
+        concurrency: int = 8,
+        fields: Iterable[str] | None = None,
+        mp_context: str | BaseContext | None = 'spawn',
+        token_dir: str | os.PathLike[str] | None = None,
+        **client_options: Any,
+    ) -> None:
+        """Initialize a ShardedRunner.
+
+        Args:
+        ----
+            accounts (Iterable[Account]): Accounts to poll.
+            processes (int | None): Worker processes. Defaults to None (the number of CPUs).
+            rate (float): Requests per second of all workers together. Defaults to 10.
+            interval (float): Seconds between the starts of two polling rounds. Defaults to 60.
+            rounds (int | None): Stop after this many rounds. Defaults to None (until `stop`).
+            concurrency (int): Concurrent updates per worker. Defaults to 8.
+            fields (Iterable[str] | None): Projection passed to `Component.update`. Defaults to None.
+            mp_context (str | BaseContext | None): Multiprocessing start method or context.
+                Defaults to 'spawn', so workers don't inherit event loop state.
+            token_dir (str | os.PathLike[str] | None): Directory of the token files the workers
+                of each account share. Defaults to None (a temporary directory removed by `stop`).
+                Ignored if `client_options` contain a `token_store`.
+            **client_options: Keyword arguments for the `Froeling` clients of the workers.
+
+        """
+        if isinstance(mp_context, str | None):
+            mp_context = multiprocessing.get_context(mp_context)
+        self._context = mp_context
+        self.shards = shard(accounts, processes or os.cpu_count() or 1)
+        self.limiter = SharedRateLimiter(rate, context=mp_context)
+        self._options = _Options(
+            interval, rounds, concurrency, None if fields is None else tuple(fields), client_options
+        )
+        self.token_dir = token_dir
+        self._temp_dir: tempfile.TemporaryDirectory[str] | None = None
+        self._results: Any = mp_context.Queue()
+        self._stop: Any = mp_context.Event()
+        self._processes: list[Any] = []
+        self._finished: set[int] = set()  # Shards whose results were all yielded
+
+    def __enter__(self) -> 'ShardedRunner':
+        """Start the workers."""
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """Stop the workers."""
+        self.stop()
+
+    def start(self) -> None:
+        """Start one worker process per shard."""
+        token_dir = self.token_dir
+        if token_dir is None:
+            self._temp_dir = tempfile.TemporaryDirectory(prefix='froeling-tokens-')
+            token_dir = self._temp_dir.name
+        options = dataclasses.replace(self._options, token_dir=os.fspath(token_dir))
+        for index, accounts in enumerate(self.shards):
+            process = self._context.Process(  # type: ignore[attr-defined]
+                target=_work,
+                args=(index, accounts, self._results, self.limiter, self._stop, options),
+                name=f'froeling-shard-{index}',
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+
+    def results(self, timeout: float | None = None) -> Iterator[ShardResult]:
+        """Yield results of all workers until they have finished.
+
+        Results of workers that already exited are still yielded, so this can be
+        called after the workers are done.
+
+        Args:
+        ----
+            timeout (float | None): Stop waiting after this many seconds without
+                a result. Defaults to None (wait until all workers are done).
+
+        """
+        running = set(range(len(self._processes))) - self._finished
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while running:
+            wait = 1.0 if deadline is None else min(1.0, deadline - time.monotonic())
+            try:
+                item = self._results.get(timeout=max(0.0, wait))
+            except queue.Empty:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return
+                # Workers that died before reporting that they are done.
+                dead = {i for i in running if self._processes[i].exitcode not in (None, 0)}
+                running -= dead
+                self._finished |= dead
+                continue
+            if deadline is not None:
+                deadline = time.monotonic() + timeout  # type: ignore[operator]
+            if isinstance(item, _Done):
+                running.discard(item.shard)
+                self._finished.add(item.shard)
+            else:
+                yield item
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Ask the workers to stop after their current round and wait for them."""
+        self._stop.set()
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+        self._processes.clear()
+        self._finished.clear()
+        if self._temp_dir is not None:
+            self._temp_dir.cleanup()
+            self._temp_dir = None
@@ -0,0 +1,197 @@
+"""Keep selected parameters of a facility up to date with as few requests as possible."""
+
+import asyncio
+import dataclasses
+import logging
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any
+
+from froeling import endpoints, profiling
+from froeling.datamodels import Component, Facility, Parameter
+
+OVERVIEW = 'OVERVIEW'
+"""Key of the facility overview request in a plan, it shows a few parameters of every component."""
+
+
+def _overview_fields(overview: dict) -> dict[tuple[str, str], str]:
+    """Map (component id, display name) to the key of each value in an overview response."""
+    fields = {}
+    for component in overview.get('components') or []:
+        for key, value in component.items():
+            if isinstance(value, dict) and value.get('displayName'):
+                fields[component.get('componentId'), value['displayName']] = key
+    return fields
+
+
+def plan_requests(locations: Mapping[str, Iterable[str]], parameter_ids: Iterable[str]) -> dict[str, set[str]]:
+    """Choose components to fetch so that all given parameters are covered.
+
+    Parameters are often shown by several components. This greedily picks the
+    component covering the most uncovered parameters until all are covered.
+    The facility overview can be one of the candidates under the key `OVERVIEW`.
+
+    Args:
+    ----
+        locations (Mapping[str, Iterable[str]]): Parameter ids each component id (or `OVERVIEW`) provides.
+        parameter_ids (Iterable[str]): Parameters that should be covered. Ids no
+            component provides are ignored.
+
+    Returns:
+    -------
+        dict[str, set[str]]: Parameter ids to read from each component that has to be fetched.
+
+    """
+    available = {component_id: set(ids) for component_id, ids in locations.items()}
+    uncovered = set(parameter_ids) & set().union(*available.values())
+    plan: dict[str, set[str]] = {}
+    while uncovered:
+        component_id = max(available, key=lambda c: (len(available[c] & uncovered), c))
+        covered = available.pop(component_id) & uncovered
+        plan[component_id] = covered
+        uncovered -= covered
+    return plan
+
+
+class Subscription:
+    """A set of parameters of one facility that are refreshed together.
+
+    `discover` finds the components providing the parameters, using the facility's
+    `parameter_index` and updating further components only while parameters are
+    still missing. Parameters the facility overview shows (matched by component and
+    display name) can also be read from one overview request. Afterwards every refresh
+    only fetches the planned requests and only parses the subscribed parameters.
+
+    Attributes:
+        facility (Facility): The facility the parameters belong to.
+        parameter_ids (frozenset[str]): Subscribed parameter ids.
+        plan (dict[str, set[str]]): Parameter ids fetched from each component or the `OVERVIEW`.
+        missing (set[str]): Subscribed ids no component of the facility provides.
+        parameters (dict[str, Parameter]): Latest value of every found parameter.
+
+    """
+
+    def __init__(
+        self,
+        facility: Facility,
+        parameter_ids: Iterable[str],
+        *,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        """Initialize a Subscription. Call `refresh` to fetch the values."""
+        self.facility = facility
+        self.parameter_ids = frozenset(parameter_ids)
+        self.plan: dict[str, set[str]] = {}
+        self.missing: set[str] = set()
+        self.parameters: dict[str, Parameter] = {}
+        self._components: dict[str, Component] = {}
+        self._overview: dict[str, tuple[str, str, Parameter]] = {}
+        self._planned = False
+        self._logger = logger or logging.getLogger(__name__)
+
+    def _component(self, component_id: str) -> Component:
+        if component_id not in self._components:
+            self._components[component_id] = self.facility.get_component(component_id)
+        return self._components[component_id]
+
+    async def discover(self) -> dict[str, set[str]]:
+        """Find the components providing the subscribed parameters and plan the requests."""
+        locations: dict[str, set[str]] = {}
+        index = self.facility.parameter_index
+        for parameter_id in self.parameter_ids:
+            entry = index.get(parameter_id)
+            if entry:
+                locations.setdefault(entry.component.component_id, set()).add(parameter_id)
+
+        unknown = {parameter_id for parameter_id in self.parameter_ids if parameter_id not in index}
+        if unknown:
+            for overview in await self.facility.get_components():
+                if overview is None or overview.component_id in locations:
+                    continue
+                component = self._component(overview.component_id)
+                await component.update()
+                locations[component.component_id] = set(component.parameters) & self.parameter_ids
+                unknown -= component.parameters.keys()
+                if not unknown:
+                    break
+
+        found = self.parameter_ids - unknown
+        if found:
+            self._overview = await self._discover_overview(found)
+            locations[OVERVIEW] = set(self._overview)
+
+        self.plan = plan_requests(locations, self.parameter_ids)
+        self.missing = set(unknown)
+        if self.missing:
+            self._logger.warning('Parameters %s not found in facility %s.', self.missing, self.facility.facility_id)
+        self._planned = True
+        return self.plan
+
+    async def _fetch_overview(self) -> dict:
+        session = self.facility.session
+        return await session.request('get', endpoints.OVERVIEW.format(session.user_id, self.facility.facility_id))
+
+    async def _discover_overview(self, parameter_ids: Iterable[str]) -> dict[str, tuple[str, str, Parameter]]:
+        """Find indexed parameters the overview shows, as (component id, overview key, indexed parameter)."""
+        fields = _overview_fields(await self._fetch_overview())
+        found = {}
+        for parameter_id in parameter_ids:
+            entry = self.facility.parameter_index.get(parameter_id)
+            if entry is None or entry.parameter.display_name is None:
+                continue
+            component_id = entry.component.component_id
+            key = fields.get((component_id, entry.parameter.display_name))
+            if key is not None:
+                found[parameter_id] = (component_id, key, entry.parameter)
+        return found
+
+    async def _refresh_overview(self, parameter_ids: Iterable[str]) -> bool:
+        """Update parameters from the overview, return whether all of them were found."""
+        components = {c.get('componentId'): c for c in (await self._fetch_overview()).get('components') or []}
+        complete = True
+        for parameter_id in parameter_ids:
+            component_id, key, parameter = self._overview[parameter_id]
+            value = components.get(component_id, {}).get(key)
+            if not isinstance(value, dict):
+                complete = False
+                continue
+            raw = dict(parameter.raw, value=value.get('value'))
+            self.parameters[parameter_id] = dataclasses.replace(parameter, value=raw['value'], raw=raw)
+        return complete
+
+    async def refresh(self) -> dict[str, Parameter]:
+        """Fetch the planned requests and return the subscribed parameters."""
+        if not self._planned:
+            await self.discover()
+
+        components = [self._component(component_id) for component_id in self.plan if component_id != OVERVIEW]
+        updates = [c.update(self.plan[c.component_id]) for c in components]
+        if OVERVIEW in self.plan:
+            complete, *_ = await asyncio.gather(self._refresh_overview(self.plan[OVERVIEW]), *updates)
+        else:
+            complete = True
+            await asyncio.gather(*updates)
+
+        lost = not complete
+        for component in components:
+            for parameter_id in self.plan[component.component_id]:
+                parameter = component.parameters.get(parameter_id)
+                if parameter is None:
+                    lost = True
+                else:
+                    self.parameters[parameter_id] = parameter
+        if lost:  # A component stopped providing a parameter, plan again next time.
+            self._planned = False
+        return self.parameters
+
+    async def run(self, interval: float, callback: Callable[[dict[str, Parameter]], Any]) -> None:
+        """Refresh every `interval` seconds and pass the parameters to `callback`.
+
+        Runs until cancelled, e.g. as a task of `Froeling.supervisor`.
+        """
+        while True:
+            parameters = await self.refresh()
+            with profiling.measure('callback', 'Subscription.run'):
+                result = callback(parameters)
+                if asyncio.iscoroutine(result):
+                    await result
+            await asyncio.sleep(interval)
@@ -0,0 +1,131 @@
+"""Supervises long-running background tasks of a client."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class SupervisedTask:
+    """State of a task started by a `TaskSupervisor`.
+
+    Attributes:
+        name (str): Name the task was started with.
+        restart (bool): Whether the task is restarted after it fails.
+        restarts (int): How often the task was restarted.
+        failures (int): Consecutive failures, used for the backoff.
+        last_error (BaseException | None): Exception of the latest failure.
+        task (asyncio.Task | None): The asyncio task running the job.
+
+    """
+
+    name: str
+    func: Callable[[], Awaitable[Any]] = field(repr=False)
+    restart: bool = True
+    restarts: int = 0
+    failures: int = 0
+    last_error: BaseException | None = None
+    task: 'asyncio.Task[None] | None' = field(default=None, repr=False)
+
+    @property
+    def running(self) -> bool:
+        """Whether the task has not finished yet."""
+        return self.task is not None and not self.task.done()
+
+
+class TaskSupervisor:
+    """Starts, monitors and restarts background tasks and stops them together.
+
+    Failing tasks are restarted after a delay that doubles with every consecutive
+    failure, from `min_backoff` up to `max_backoff`. A task that ran for longer
+    than `max_backoff` before failing starts over at `min_backoff`.
+    `Froeling` owns a supervisor and closes it before its session, so background
+    work never outlives the client. Writes started by supervised tasks are shielded
+    by the `Session` and still complete when the task is cancelled.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_backoff: float = 1.0,
+        max_backoff: float = 300.0,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        """Initialize a TaskSupervisor.
+
+        Args:
+        ----
+            min_backoff (float): Seconds to wait before the first restart. Defaults to 1.
+            max_backoff (float): Upper limit of the restart delay in seconds. Defaults to 300.
+            logger (logging.Logger | None): Logger for task failures. Defaults to None.
+
+        """
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.tasks: dict[str, SupervisedTask] = {}
+        self._closed = False
+        self._logger = logger or logging.getLogger(__name__)
+
+    def start(self, name: str, func: Callable[[], Awaitable[Any]], *, restart: bool = True) -> SupervisedTask:
+        """Run `func()` in the background.
+
+        Args:
+        ----
+            name (str): Unique name of the task.
+            func (Callable[[], Awaitable[Any]]): Creates the coroutine to run. It is called
+                again for every restart.
+            restart (bool): Restart the task when it raises an exception. Defaults to True.
+
+        """
+        if self._closed:
+            msg = 'The supervisor is closed.'
+            raise RuntimeError(msg)
+        existing = self.tasks.get(name)
+        if existing and existing.running:
+            msg = f'A task named {name!r} is already running.'
+            raise ValueError(msg)
+
+        supervised = SupervisedTask(name, func, restart)
+        supervised.task = asyncio.create_task(self._run(supervised), name=name)
+        self.tasks[name] = supervised
+        return supervised
+
+    async def _run(self, supervised: SupervisedTask) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            try:
+                await supervised.func()
+            except Exception as e:
+                supervised.last_error = e
+                if loop.time() - started > self.max_backoff:
+                    supervised.failures = 0
+                supervised.failures += 1
+                if not supervised.restart:
+                    self._logger.exception('Background task %s failed.', supervised.name)
+                    return
+                delay = min(self.max_backoff, self.min_backoff * 2 ** (supervised.failures - 1))
+                self._logger.warning(
+                    'Background task %s failed, restarting in %.1fs.', supervised.name, delay, exc_info=e
+                )
+                await asyncio.sleep(delay)
+                supervised.restarts += 1
+            else:
+                return
+
+    async def stop(self, name: str) -> None:
+        """Cancel a task and wait for it to finish."""
+        supervised = self.tasks.pop(name)
+        if supervised.task:
+            supervised.task.cancel()
+            await asyncio.gather(supervised.task, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Cancel all tasks and wait for them to finish. No new tasks can be started afterwards."""
+        self._closed = True
+        tasks = [s.task for s in self.tasks.values() if s.task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,335 @@
+"""Blocking facade for synchronous code.
+
+`froeling.sync.Froeling` runs one event loop in a background thread and sends
+every call to it, so all calls share the same session and connection pool.
+It can be used from any number of threads:
+
+    with Froeling(username, password) as api:
+        facility = api.get_facility(12345)
+        component = facility.get_component('1_100')
+        component.update()
+        print(component.parameters['3_0'].display_value)
+
+Datamodels are returned wrapped in `Blocking`, which behaves like the model but
+runs its coroutine methods on the background loop and waits for the result.
+Async generators, such as `iter_components`, become blocking iterators.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+import threading
+from collections.abc import AsyncIterator, Callable, Coroutine, Iterable, Iterator
+from types import TracebackType
+from typing import Any, Generic, TypeVar
+
+from froeling import client, datamodels
+from froeling.subscription import Subscription
+
+T = TypeVar('T')
+
+_WRAPPED = (
+    datamodels.Facility,
+    datamodels.Component,
+    datamodels.Parameter,
+    datamodels.NotificationOverview,
+    Subscription,
+)
+
+
+class _Runner:
+    """Owns the background event loop and runs coroutines on it."""
+
+    def __init__(self, name: str) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name=name, daemon=True)
+        self.thread.start()
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        if threading.current_thread() is self.thread:
+            coro.close()
+            msg = 'Blocking calls can not be made from the background event loop.'
+            raise RuntimeError(msg)
+        if self.loop.is_closed():
+            coro.close()
+            msg = 'The client is closed.'
+            raise RuntimeError(msg)
+        future: concurrent.futures.Future[T] = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def iterate(self, iterator: AsyncIterator[Any], timeout: float | None = None) -> Iterator[Any]:
+        """Iterate over an async iterator, fetching each item on the loop and wrapping it.
+
+        `timeout` applies to each item. Closing the iterator closes the async one.
+        """
+        steps: list[asyncio.Future[Any]] = []
+
+        async def next_item() -> Any:
+            steps[:] = [asyncio.ensure_future(anext(iterator))]
+            return await steps[0]
+
+        async def close() -> None:
+            # A step cancelled by a timeout may still be running, closing a running generator fails.
+            await asyncio.gather(*steps, return_exceptions=True)
+            aclose = getattr(iterator, 'aclose', None)
+            if aclose is not None:
+                await aclose()
+
+        try:
+            while True:
+                try:
+                    item = self.run(next_item(), timeout)
+                except StopAsyncIteration:
+                    return
+                yield self.wrap(item)
+        finally:
+            if not self.loop.is_closed():
+                self.run(close())
+
+    def wrap(self, value: Any) -> Any:
+        """Wrap datamodels, also inside lists and dicts, in `Blocking`."""
+        if isinstance(value, _WRAPPED):
+            return Blocking(value, self)
+        if isinstance(value, list):
+            return [self.wrap(v) for v in value]
+        if isinstance(value, dict) and any(isinstance(v, _WRAPPED) for v in value.values()):
+            return {k: self.wrap(v) for k, v in value.items()}
+        return value
+
+    def stop(self) -> None:
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+class Blocking(Generic[T]):
+    """Blocking view of a datamodel.
+
+    Attributes are read from the wrapped model. Its coroutine methods run on the
+    background event loop and block until they are done. Returned datamodels are
+    wrapped again. The wrapped model is available as `unwrapped`.
+    """
+
+    __slots__ = ('_runner', 'unwrapped')
+
+    def __init__(self, obj: T, runner: _Runner) -> None:
+        """Wrap `obj`, running its coroutines with `runner`."""
+        self.unwrapped = obj
+        self._runner = runner
+
+    def __getattr__(self, name: str) -> Any:
+        """Get an attribute of the wrapped model, making coroutine methods blocking."""
+        value = getattr(self.unwrapped, name)
+        if inspect.iscoroutinefunction(value):
+            return self._blocking(value)
+        if inspect.isasyncgenfunction(value):
+            return self._iterating(value)
+        if inspect.ismethod(value):
+            return self._wrapping(value)
+        return self._runner.wrap(value)
+
+    def _blocking(self, method: Callable[..., Coroutine[Any, Any, Any]]) -> Callable[..., Any]:
+        @functools.wraps(method)
+        def call(*args: Any, **kwargs: Any) -> Any:
+            return self._runner.wrap(self._runner.run(method(*args, **kwargs)))
+
+        return call
+
+    def _iterating(self, method: Callable[..., AsyncIterator[Any]]) -> Callable[..., Iterator[Any]]:
+        @functools.wraps(method)
+        def call(*args: Any, **kwargs: Any) -> Iterator[Any]:
+            return self._runner.iterate(method(*args, **kwargs))
+
+        return call
+
+    def _wrapping(self, method: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(method)
+        def call(*args: Any, **kwargs: Any) -> Any:
+            return self._runner.wrap(method(*args, **kwargs))
+
+        return call
+
+    def __repr__(self) -> str:
+        """Show the wrapped model."""
+        return f'Blocking({self.unwrapped!r})'
+
+    def __str__(self) -> str:
+        """Return the string of the wrapped model."""
+        return str(self.unwrapped)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the wrapped models."""
+        if isinstance(other, Blocking):
+            other = other.unwrapped
+        return bool(self.unwrapped == other)
+
+    def __hash__(self) -> int:
+        """Hash the wrapped model."""
+        return hash(self.unwrapped)
+
+
+class Froeling:
+    """Blocking version of `froeling.Froeling`, safe to use from many threads.
+
+    Methods take an optional `timeout` in seconds.
+    """
+
+    def __init__(
+        self,
+        username: str | None = None,
+        password: str | None = None,
+        token: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Start the background event loop, create the client and log in if needed.
+
+        Args:
+        ----
+            username (str | None): Email used to log into your Fröling account.
+            password (str | None): Fröling password (not required when using `token`).
+            token (str | None): Valid token (not required when using username/password).
+            **kwargs: Keyword arguments of `froeling.Froeling`.
+
+        """
+        self._runner = _Runner(name='froeling-sync')
+
+        async def create() -> client.Froeling:
+            # The aiohttp session must be created on the loop it is used on.
+            return await client.Froeling(username, password, token, **kwargs).__aenter__()
+
+        try:
+            self.client = self._runner.run(create())
+        except BaseException:
+            self._runner.stop()
+            raise
+
+    def __enter__(self) -> 'Froeling':
+        """Return the facade."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """Close the client and stop the background event loop."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the client and stop the background event loop."""
+        if self._runner.loop.is_closed():
+            return
+        try:
+            self._runner.run(self.client.close())
+        finally:
+            self._runner.stop()
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        """Run any coroutine using the client on the background loop and wait for it."""
+        return self._runner.run(coro, timeout)
+
+    @property
+    def user_id(self) -> int | None:
+        """The user's id."""
+        return self.client.user_id
+
+    @property
+    def token(self) -> str | None:
+        """The user's token."""
+        return self.client.token
+
+    def login(self, timeout: float | None = None) -> datamodels.UserData:
+        """Log in with the username and password."""
+        return self._runner.run(self.client.login(), timeout)
+
+    def get_userdata(self, timeout: float | None = None) -> datamodels.UserData:
+        """Get userdata (cached)."""
+        return self._runner.run(self.client.get_userdata(), timeout)
+
+    def get_facilities(self, timeout: float | None = None) -> list[Blocking[datamodels.Facility]]:
+        """Get all facilities connected with this account (cached)."""
+        return self._runner.wrap(self._runner.run(self.client.get_facilities(), timeout))
+
+    def get_facility(self, facility_id: int, timeout: float | None = None) -> Blocking[datamodels.Facility]:
+        """Get a specific facility given it's id (cached)."""
+        return self._runner.wrap(self._runner.run(self.client.get_facility(facility_id), timeout))
+
+    def get_component(self, facility_id: int, component_id: str) -> Blocking[datamodels.Component]:
+        """Get a specific component given it's facility_id and component_id, see `froeling.Froeling`."""
+        return self._runner.wrap(self.client.get_component(facility_id, component_id))
+
+    def get_notification_count(self, timeout: float | None = None) -> int:
+        """Fetch the unread notification count."""
+        return self._runner.run(self.client.get_notification_count(), timeout)
+
+    def get_notifications(self, timeout: float | None = None) -> list[Blocking[datamodels.NotificationOverview]]:
+        """Fetch an overview of all notifications."""
+        return self._runner.wrap(self._runner.run(self.client.get_notifications(), timeout))
+
+    def get_notification(
+        self,
+        notification_id: int,
+        *,
+        refresh: bool = False,
+        timeout: float | None = None,
+    ) -> Blocking[datamodels.NotificationDetails]:
+        """Get all details for a specific notification (cached, unless `refresh` is set)."""
+        return self._runner.wrap(
+            self._runner.run(self.client.get_notification(notification_id, refresh=refresh), timeout)
+        )
+
+    def get_notification_details(
+        self,
+        notifications: Iterable[datamodels.NotificationOverview | Blocking[datamodels.NotificationOverview]],
+        *,
+        concurrency: int = 4,
+        timeout: float | None = None,
+    ) -> list[Blocking[datamodels.NotificationDetails]]:
+        """Get the details of many notifications, see `froeling.Froeling.get_notification_details`."""
+        unwrapped = [n.unwrapped if isinstance(n, Blocking) else n for n in notifications]
+        return self._runner.wrap(
+            self._runner.run(self.client.get_notification_details(unwrapped, concurrency=concurrency), timeout)
+        )
+
+    def iter_components(
+        self,
+        facility_ids: Iterable[int] | None = None,
+        *,
+        timeout: float | None = None,
+        **options: Any,
+    ) -> Iterator[Blocking[datamodels.Component]]:
+        """Update the components of all facilities and yield each one as soon as it is updated.
+
+        Takes the arguments of `froeling.Froeling.iter_components`. `timeout` applies to each component.
+        """
+        return self._runner.iterate(self.client.iter_components(facility_ids, **options), timeout)
+
+    def iter_parameters(
+        self,
+        facility_ids: Iterable[int] | None = None,
+        *,
+        timeout: float | None = None,
+        **options: Any,
+    ) -> Iterator[Blocking[datamodels.Parameter]]:
+        """Yield the parameters of every component as soon as the component is updated.
+
+        Takes the arguments of `froeling.Froeling.iter_components`. `timeout` applies to each parameter.
+        """
+        return self._runner.iterate(self.client.iter_parameters(facility_ids, **options), timeout)
+
+    def subscribe(
+        self,
+        facility_id: int,
+        parameter_ids: Iterable[str],
+        timeout: float | None = None,
+    ) -> Blocking[Subscription]:
+        """Subscribe to parameters of a facility, see `froeling.Froeling.subscribe`."""
+        return self._runner.wrap(self._runner.run(self.client.subscribe(facility_id, parameter_ids), timeout))
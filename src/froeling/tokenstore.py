@@ -0,0 +1,177 @@
+"""Persist tokens between runs and share them between sessions.
+
+A `Session` with a `token_store` starts with the stored token while it is valid
+(judged by the JWT `exp` claim) instead of logging in, and stores every token it
+obtains. Renewals hold the store's lock and first check whether another session
+already stored a newer token, so replicas sharing a `FileTokenStore` log in once
+instead of invalidating each other's tokens.
+
+    store = FileTokenStore('/var/cache/froeling/token')
+    async with Froeling(username, password, token_store=store, auto_reauth=True) as api:
+        ...
+
+A store holds the token of one account. Subclass `TokenStore` to keep tokens
+elsewhere, e.g. in a database shared by several hosts.
+"""
+
+import asyncio
+import base64
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - depends on the platform
+    fcntl = None  # type: ignore[assignment]
+
+EXPIRY_MARGIN = 60.0
+"""Seconds before `exp` from which a token is no longer used."""
+
+
+def token_claims(token: str) -> dict[str, Any]:
+    """Decode the payload of a JWT without verifying its signature.
+
+    Raises
+    ------
+        ValueError: If the token is not in the JWT format.
+
+    """
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(token.split('.')[1] + '=='))
+    except Exception as e:
+        msg = 'Token is in an invalid format.'
+        raise ValueError(msg) from e
+    if not isinstance(claims, dict):
+        msg = 'Token is in an invalid format.'
+        raise ValueError(msg)  # noqa: TRY004
+    return claims
+
+
+def token_expiry(token: str) -> float | None:
+    """Unix time the token expires at, None if it has no `exp` claim."""
+    exp = token_claims(token).get('exp')
+    return None if exp is None else float(exp)
+
+
+def is_valid(token: str | None, margin: float = EXPIRY_MARGIN) -> bool:
+    """Whether `token` is well-formed and doesn't expire within `margin` seconds.
+
+    Tokens without an `exp` claim are considered valid.
+    """
+    if not token:
+        return False
+    try:
+        expiry = token_expiry(token)
+    except ValueError:
+        return False
+    return expiry is None or expiry - margin > time.time()
+
+
+class TokenStore(ABC):
+    """Where a `Session` loads its token from and saves renewed tokens to."""
+
+    @abstractmethod
+    def load(self) -> str | None:
+        """Get the stored token, None if there is none."""
+
+    @abstractmethod
+    def save(self, token: str) -> None:
+        """Replace the stored token."""
+
+    @contextlib.asynccontextmanager
+    async def lock(self) -> AsyncIterator[None]:
+        """Hold an exclusive lock while renewing the token.
+
+        The default does nothing; stores shared between sessions override it.
+        """
+        yield
+
+
+class MemoryTokenStore(TokenStore):
+    """Keeps the token in memory, e.g. to share it between the clients of one process."""
+
+    def __init__(self, token: str | None = None) -> None:
+        """Initialize a MemoryTokenStore.
+
+        Args:
+        ----
+            token (str | None): Initial token. Defaults to None.
+
+        """
+        self.token = token
+        self._lock = asyncio.Lock()
+
+    def load(self) -> str | None:
+        """Get the stored token."""
+        return self.token
+
+    def save(self, token: str) -> None:
+        """Replace the stored token."""
+        self.token = token
+
+    @contextlib.asynccontextmanager
+    async def lock(self) -> AsyncIterator[None]:
+        """Hold a lock shared by the sessions of this event loop."""
+        async with self._lock:
+            yield
+
+
+class FileTokenStore(TokenStore):
+    """Keeps the token in a file readable only by the owner.
+
+    The file is replaced atomically, so readers never see a partial token.
+    Renewals lock a `.lock` file next to it, which serializes them between
+    processes on POSIX systems. Elsewhere only threads of one process are serialized.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        """Initialize a FileTokenStore.
+
+        Args:
+        ----
+            path (str | os.PathLike[str]): File holding the token. Missing parent
+                directories are created when saving.
+
+        """
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + '.lock')
+        self._thread_lock = threading.Lock()
+
+    def load(self) -> str | None:
+        """Read the token, None if the file doesn't exist or is empty."""
+        try:
+            return self.path.read_text(encoding='utf-8').strip() or None
+        except FileNotFoundError:
+            return None
+
+    def save(self, token: str) -> None:
+        """Atomically replace the file with `token`."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.path.parent, delete=False) as f:
+            f.write(token)
+        os.replace(f.name, self.path)
+
+    @contextlib.asynccontextmanager
+    async def lock(self) -> AsyncIterator[None]:
+        """Hold an exclusive lock on the lock file, waiting in a thread."""
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.lock_path.open('a') as f:
+            if fcntl is not None:
+                await asyncio.to_thread(fcntl.flock, f.fileno(), fcntl.LOCK_EX)
+            else:  # pragma: no cover - depends on the platform
+                await asyncio.to_thread(self._thread_lock.acquire)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:  # pragma: no cover - depends on the platform
+                    self._thread_lock.release()
@@ -0,0 +1,248 @@
+"""Write-behind queue that coalesces repeated parameter changes.
+
+Writes wait in the queue for `window` seconds. Writing the same parameter again
+in that time replaces the queued value instead of sending another request, so
+only the last value is sent. Writes of a facility are sent one at a time in the
+order they were first queued, failures of a degraded upstream are retried with
+a growing delay, and every caller learns which value was finally applied.
+
+    result = await api.writes.set_value(parameter, 21)
+    print(result.value, result.coalesced)
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Any
+
+from froeling.circuitbreaker import is_failure
+from froeling.datamodels import Parameter
+from froeling.exceptions import CircuitOpenError, NetworkError
+
+
+@dataclass(frozen=True)
+class WriteResult:
+    """Outcome of a queued write.
+
+    Attributes:
+        facility_id (int): Facility of the parameter.
+        parameter_id (str): The written parameter.
+        value (str): The value that was sent, the latest one queued for the parameter.
+        changed (bool): False if the server answered 304 Not Modified, because the
+            parameter already had this value.
+        attempts (int): Requests sent, including retries.
+        coalesced (int): Writes of the parameter answered by this one request.
+
+    """
+
+    facility_id: int
+    parameter_id: str
+    value: str
+    changed: bool
+    attempts: int
+    coalesced: int
+
+
+@dataclass
+class WriteStats:
+    """Statistics of a `WriteQueue`.
+
+    Attributes:
+        submitted (int): Writes queued.
+        sent (int): Writes applied upstream.
+        coalesced (int): Writes replaced by a newer value before they were sent.
+        retries (int): Requests repeated after a failure.
+        failed (int): Writes given up on.
+
+    """
+
+    submitted: int = 0
+    sent: int = 0
+    coalesced: int = 0
+    retries: int = 0
+    failed: int = 0
+
+
+@dataclass
+class _PendingWrite:
+    parameter: Parameter
+    value: Any
+    due: float
+    futures: list['asyncio.Future[WriteResult]'] = field(default_factory=list)
+
+
+def _retryable(e: BaseException) -> bool:
+    return isinstance(e, CircuitOpenError) or is_failure(e)
+
+
+class WriteQueue:
+    """Coalesces, orders and retries parameter writes."""
+
+    def __init__(
+        self,
+        *,
+        window: float = 0.5,
+        retries: int = 3,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 30.0,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        """Initialize a WriteQueue.
+
+        Args:
+        ----
+            window (float): Seconds a write waits for newer values of the same parameter
+                before it is sent. Defaults to 0.5.
+            retries (int): How often a write is repeated after a server error, timeout or
+                open circuit. Other errors fail the write immediately. Defaults to 3.
+            retry_delay (float): Seconds before the first retry, doubling for every further
+                retry. Defaults to 1.
+            max_retry_delay (float): Upper limit of the retry delay in seconds. Defaults to 30.
+            logger (logging.Logger | None): Logger for failed writes. Defaults to None.
+
+        """
+        self.window = window
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.stats = WriteStats()
+        self.pending: dict[int, OrderedDict[str, _PendingWrite]] = {}
+        self._workers: dict[int, asyncio.Task[None]] = {}
+        self._flushing = asyncio.Event()
+        self._flushes = 0
+        self._closed = False
+        self._logger = logger or logging.getLogger(__name__)
+
+    def __len__(self) -> int:
+        """Return the number of queued writes that weren't sent yet."""
+        return sum(len(writes) for writes in self.pending.values())
+
+    def submit(self, parameter: Parameter, value: Any) -> 'asyncio.Future[WriteResult]':
+        """Queue a write and return a future of its result without waiting.
+
+        If a write of the parameter is already queued, its value is replaced and both
+        futures get the same result. A write that is already being sent is not changed;
+        the new value is queued after it.
+        """
+        if self._closed:
+            msg = 'The write queue is closed.'
+            raise RuntimeError(msg)
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[WriteResult] = loop.create_future()
+        facility_id = parameter.facility_id
+        writes = self.pending.setdefault(facility_id, OrderedDict())
+        write = writes.get(parameter.id)
+        if write is None:
+            write = writes[parameter.id] = _PendingWrite(parameter, value, loop.time() + self.window)
+        else:
+            write.parameter = parameter
+            write.value = value
+            self.stats.coalesced += 1
+        write.futures.append(future)
+        self.stats.submitted += 1
+
+        if facility_id not in self._workers:
+            self._workers[facility_id] = asyncio.create_task(
+                self._work(facility_id, writes), name=f'froeling-writes-{facility_id}'
+            )
+        return future
+
+    async def set_value(self, parameter: Parameter, value: Any) -> WriteResult:
+        """Queue a write and wait until it was applied.
+
+        Raises
+        ------
+            Exception: The error of the last attempt if the write failed.
+
+        """
+        return await self.submit(parameter, value)
+
+    async def _work(self, facility_id: int, writes: OrderedDict[str, _PendingWrite]) -> None:
+        """Send the writes of a facility in order until none are left."""
+        loop = asyncio.get_running_loop()
+        try:
+            while writes:
+                write = next(iter(writes.values()))
+                delay = write.due - loop.time()
+                if delay > 0 and not self._flushing.is_set():
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(self._flushing.wait(), delay)
+                del writes[write.parameter.id]
+                await self._send(write)
+        finally:
+            for write in writes.values():
+                for future in write.futures:
+                    future.cancel()
+            writes.clear()
+            del self.pending[facility_id]
+            del self._workers[facility_id]
+
+    async def _send(self, write: _PendingWrite) -> None:
+        """Send a write and resolve its futures."""
+        try:
+            changed, attempts = await self._attempt(write)
+        except Exception as e:
+            self.stats.failed += 1
+            self._logger.exception('Writing %r to parameter %s failed.', write.value, write.parameter.id)
+            for future in write.futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except BaseException:
+            for future in write.futures:
+                future.cancel()
+            raise
+
+        self.stats.sent += 1
+        result = WriteResult(
+            write.parameter.facility_id,
+            write.parameter.id,
+            str(write.value),
+            changed,
+            attempts,
+            len(write.futures),
+        )
+        for future in write.futures:
+            if not future.done():
+                future.set_result(result)
+
+    async def _attempt(self, write: _PendingWrite) -> tuple[bool, int]:
+        """Send a write, retrying failures of a degraded upstream. Returns whether it changed the value and the attempts."""
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                await write.parameter.put_value(write.value)
+            except Exception as e:
+                if isinstance(e, NetworkError) and e.status == HTTPStatus.NOT_MODIFIED:
+                    return False, attempts
+                if attempts > self.retries or not _retryable(e):
+                    raise
+                delay = min(self.max_retry_delay, self.retry_delay * 2 ** (attempts - 1))
+                if isinstance(e, CircuitOpenError):
+                    delay = max(delay, e.retry_after)
+                self.stats.retries += 1
+                self._logger.debug('Writing parameter %s failed, retrying in %.1fs.', write.parameter.id, delay)
+                await asyncio.sleep(delay)
+            else:
+                return True, attempts
+
+    async def flush(self) -> None:
+        """Send all queued writes without waiting for their window and wait until they are done."""
+        self._flushes += 1
+        self._flushing.set()
+        try:
+            while self._workers:
+                await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        finally:
+            self._flushes -= 1
+            if not self._flushes:
+                self._flushing.clear()
+
+    async def close(self) -> None:
+        """Send all queued writes, then reject new ones."""
+        self._closed = True
+        await self.flush()
@@ -0,0 +1,158 @@
+"""Test the MQTT bridge with the in-memory broker stand-in."""
+
+import asyncio
+import copy
+import json
+
+import pytest
+from aioresponses import aioresponses
+from froeling import Froeling, endpoints
+from froeling.bridge import Bridge, MemoryTransport, Message, topic_matches
+from froeling.datamodels import Parameter
+from froeling.events import Event, EventType
+from froeling.polling import AdaptivePoller
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+def test_topic_matches():
+    assert topic_matches('froeling/+/+/+/set', 'froeling/12345/1_100/7_28/set')
+    assert not topic_matches('froeling/+/+/+/set', 'froeling/12345/1_100/7_28/state')
+    assert not topic_matches('froeling/+/set', 'froeling/1/2/set')
+    assert topic_matches('froeling/#', 'froeling/1/2/set')
+
+
+@pytest.fixture
+def mocked(load_json):
+    component_list = load_json('component_list.json')[:1]
+    with aioresponses() as m:
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=load_json('facility.json'))
+        m.get(endpoints.COMPONENT_LIST.format(1234, 12345), status=200, payload=component_list)
+        m.get(endpoints.COMPONENT_LIST.format(1234, 54321), status=200, payload=[])
+        yield m
+
+
+def with_values(component_data, **values):
+    data = copy.deepcopy(component_data)
+    for parameter in data['stateView'] + data['setupView']:
+        parameter['value'] = values.get(parameter['id'], parameter['value'])
+    return data
+
+
+@pytest.mark.asyncio
+async def test_publish_changes(load_json, mocked):
+    component_data = load_json('component.json')
+    url = endpoints.COMPONENT.format(1234, 12345, '1_100')
+    mocked.get(url, status=200, payload=component_data)
+    mocked.get(url, status=200, payload=component_data)
+    mocked.get(url, status=200, payload=with_values(component_data, **{'3_0': '79'}))
+
+    transport = MemoryTransport()
+    async with Froeling(token=token) as api:
+        bridge = Bridge(api, transport, batch_delay=0, poller=AdaptivePoller(min_interval=0.001))
+        await bridge.setup()
+        assert transport.subscriptions == ['froeling/+/+/+/set']
+        assert transport.retained['froeling/status'] == 'online'
+
+        await bridge.poller.poll()
+        count = await bridge.publish_pending()
+        assert count == len(bridge.components[12345, '1_100'].parameters)
+        assert transport.batches[-1] == 2 * count  # State and discovery of every parameter
+        assert transport.retained['froeling/12345/1_100/3_0/state'] == '78'
+
+        sensor = json.loads(transport.retained['homeassistant/sensor/froeling_12345_1_100_3_0/config'])
+        assert sensor['state_topic'] == 'froeling/12345/1_100/3_0/state'
+        assert sensor['unit_of_measurement'] == '°C'
+        number = json.loads(transport.retained['homeassistant/number/froeling_12345_1_100_7_28/config'])
+        assert (number['min'], number['max']) == (60, 90)
+        assert number['command_topic'] == 'froeling/12345/1_100/7_28/set'
+
+        # Unchanged values are not published again
+        await asyncio.sleep(0.01)
+        await bridge.poller.poll()
+        assert len(bridge.subscriber) == 0
+
+        await asyncio.sleep(0.01)
+        await bridge.poller.poll()
+        assert await bridge.publish_pending() == 1
+        assert transport.published[-1] == Message('froeling/12345/1_100/3_0/state', '79', retain=True)
+
+
+@pytest.mark.asyncio
+async def test_command(load_json, mocked):
+    component_data = load_json('component.json')
+    url = endpoints.COMPONENT.format(1234, 12345, '1_100')
+    mocked.get(url, status=200, payload=component_data)
+    mocked.put(endpoints.SET_PARAMETER.format(1234, 12345, '7_28'), status=200)
+    mocked.get(url, status=200, payload=with_values(component_data, **{'7_28': '85'}))
+
+    transport = MemoryTransport()
+    async with Froeling(token=token) as api:
+        bridge = Bridge(api, transport, batch_delay=0, discovery_prefix=None)
+        await bridge.setup()
+        await bridge.poller.poll()
+        await bridge.publish_pending()
+
+        api.writes.window = 0.01
+        api.writes.retries = 0
+        # A slider sends every step, only the last value is written and published
+        for value in ('81', '83', '85'):
+            transport.send('froeling/12345/1_100/7_28/set', value)
+        transport.send('froeling/12345/1_100/7_28/state', '1')  # Not subscribed
+        commands = transport.commands()
+        await asyncio.gather(*[bridge.handle_command(await anext(commands)) for _ in range(3)])
+        await bridge.handle_command(Message('froeling/12345/1_100/unknown/set', '1'))  # Logged and ignored
+
+        assert await bridge.publish_pending() == 1
+        assert transport.retained['froeling/12345/1_100/7_28/state'] == '85'
+
+        # Logged and ignored without sending anything
+        await bridge.handle_command(Message('froeling/12345/1_100/3_0/set', '70'))  # Not editable
+        await bridge.handle_command(Message('froeling/12345/1_100/7_28/set', '95'))  # Above max_val
+        await bridge.handle_command(Message('froeling/12345/1_100/7_28/set', 'warm'))
+        # Sending fails with a connection error, which is logged as well
+        await bridge.handle_command(Message('froeling/12345/1_100/7_28/set', '70'))
+
+    puts = [call.kwargs['json'] for key, calls in mocked.requests.items() if key[0] == 'put' for call in calls]
+    assert puts == [{'value': '85'}, {'value': '70'}]
+
+
+@pytest.mark.asyncio
+async def test_run(load_json, mocked):
+    mocked.get(endpoints.COMPONENT.format(1234, 12345, '1_100'), status=200, payload=load_json('component.json'))
+
+    transport = MemoryTransport()
+    async with Froeling(token=token) as api:
+        bridge = Bridge(api, transport, batch_delay=0)
+        task = asyncio.create_task(bridge.run())
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if 'froeling/12345/1_100/3_0/state' in transport.retained:
+                break
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert transport.retained['froeling/12345/1_100/3_0/state'] == '78'
+    assert transport.retained['froeling/status'] == 'offline'
+
+
+@pytest.mark.asyncio
+async def test_discovery_per_component(load_json, mocked):
+    async with Froeling(token=token) as api:
+        bridge = Bridge(api, MemoryTransport())
+        parameters = Parameter._from_list(load_json('component.json')['stateView'], api.session, 12345)  # noqa: SLF001
+        parameter = next(iter(parameters.values()))
+        topics = [
+            message.topic
+            for component_id in ('1_100', '2_200')
+            for message in bridge.messages(
+                Event(EventType.PARAMETER_CHANGED, 12345, component_id, parameter.id, value='1', data=parameter)
+            )
+        ]
+
+    # The same parameter id in two components becomes two entities
+    config = [t for t in topics if t.endswith('/config')]
+    assert len(config) == 2
+    assert any('froeling_12345_1_100_' in t for t in config)
+    assert any('froeling_12345_2_200_' in t for t in config)
@@ -0,0 +1,83 @@
+"""Test the circuit breaker."""
+
+import pytest
+from aioresponses import aioresponses
+from froeling import Froeling, endpoints, exceptions
+from froeling.circuitbreaker import CircuitBreaker, CircuitBreakerConfig, CircuitState
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+def fail(breaker, status=500):
+    with pytest.raises(exceptions.NetworkError), breaker.guard():
+        raise exceptions.NetworkError('error', status, 'url', '')
+
+
+def succeed(breaker):
+    with breaker.guard():
+        pass
+
+
+def test_circuit_breaker_states():
+    now = 0.0
+    config = CircuitBreakerConfig(failure_rate=0.5, min_requests=4, window=10, reset_timeout=5)
+    breaker = CircuitBreaker('COMPONENT', config, clock=lambda: now)
+
+    succeed(breaker)
+    fail(breaker, 404)  # Client errors don't count.
+    fail(breaker)
+    assert breaker.state is CircuitState.CLOSED
+    fail(breaker)
+    assert breaker.state is CircuitState.OPEN
+
+    with pytest.raises(exceptions.CircuitOpenError) as e:
+        succeed(breaker)
+    assert e.value.route == 'COMPONENT'
+    assert e.value.retry_after == 5
+
+    now = 5
+    assert breaker.state is CircuitState.HALF_OPEN
+    fail(breaker)
+    assert breaker.state is CircuitState.OPEN
+
+    now = 10
+    with breaker.guard():
+        with pytest.raises(exceptions.CircuitOpenError):  # Only one probe at a time.
+            succeed(breaker)
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.failure_rate == 0
+
+
+def test_circuit_breaker_window():
+    now = 0.0
+    config = CircuitBreakerConfig(failure_rate=0.5, min_requests=2, window=10)
+    breaker = CircuitBreaker('COMPONENT', config, clock=lambda: now)
+    fail(breaker)
+    now = 11
+    succeed(breaker)
+    assert breaker.failure_rate == 0
+    assert breaker.state is CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_session_circuit_breaker(load_json):
+    config = CircuitBreakerConfig(min_requests=2)
+
+    with aioresponses() as m:
+        m.get(endpoints.COMPONENT.format(1234, 12345, '1_100'), status=503, repeat=True)
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=load_json('facility.json'))
+
+        async with Froeling(token=token, circuit_breaker=config) as api:
+            c = api.get_component(12345, '1_100')
+            for _ in range(2):
+                with pytest.raises(exceptions.NetworkError):
+                    await c.update()
+            with pytest.raises(exceptions.CircuitOpenError):
+                await c.update()
+            assert api.session.circuit_breakers['COMPONENT'].state is CircuitState.OPEN
+
+            assert len(await api.get_facilities()) == 2  # Other routes are not affected.
+
+        component_url = endpoints.COMPONENT.format(1234, 12345, '1_100')
+        sent = [calls for (_, url), calls in m.requests.items() if str(url) == component_url]
+        assert len(sent[0]) == 2
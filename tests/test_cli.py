@@ -0,0 +1,75 @@
+"""Test the command line interface."""
+
+import json
+
+import pytest
+from aioresponses import aioresponses
+from yarl import URL
+from froeling import endpoints
+from froeling.cli import main
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+@pytest.fixture(autouse=True)
+def no_credentials(monkeypatch):
+    for name in ('FROELING_USERNAME', 'FROELING_PASSWORD', 'FROELING_TOKEN'):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_facilities_login_and_token_cache(load_json, tmp_path, capsys):
+    token_cache = tmp_path / 'token'
+    with aioresponses() as m:
+        m.post(endpoints.LOGIN, status=200, payload=load_json('login.json'), headers={'Authorization': token})
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=load_json('facility.json'), repeat=True)
+
+        args = ['--username', 'joe', '--password', 'pwd', '--token-cache', str(token_cache), 'facilities', '--json']
+        assert main(args) == 0
+        facilities = json.loads(capsys.readouterr().out)
+        assert token_cache.read_text() == token
+
+        # The cached token is used, so the second run doesn't log in.
+        assert main(args) == 0
+        assert json.loads(capsys.readouterr().out) == facilities
+
+    assert len(m.requests[('POST', URL(endpoints.LOGIN))]) == 1
+    assert [f['facility_id'] for f in facilities] == [12345, 54321]
+    assert facilities[0]['city'] == 'somewhere'
+
+
+def test_parameters(load_json, tmp_path, capsys):
+    with aioresponses() as m:
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=load_json('facility.json'))
+        m.get(endpoints.COMPONENT_LIST.format(1234, 12345), status=200, payload=load_json('component_list.json'))
+        m.get(endpoints.COMPONENT.format(1234, 12345, '1_100'), status=200, payload=load_json('component.json'))
+
+        args = ['--token', token, '--no-token-cache', 'parameters', '--facility', '12345', '--component', '1_100']
+        assert main(args) == 0
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split() == ['facility_id', 'component_id', 'parameter_id', 'display_name', 'value', 'unit']
+    assert len(lines) == 17
+    assert any(line.split()[:3] == ['12345', '1_100', '7_28'] for line in lines)
+
+
+def test_missing_credentials(tmp_path):
+    with pytest.raises(SystemExit):
+        main(['--token-cache', str(tmp_path / 'token'), 'facilities'])
+
+
+def test_authentication_error(load_json, tmp_path, capsys):
+    with aioresponses() as m:
+        m.post(endpoints.LOGIN, status=403, payload=load_json('login_bad_creds.json'))
+        assert main(['--username', 'joe', '--password', 'bad', '--no-token-cache', 'facilities']) == 1
+    assert capsys.readouterr().err.startswith('Error:')
+
+
+def test_other_errors(load_json, tmp_path, capsys):
+    with aioresponses() as m:
+        m.get(endpoints.FACILITY.format(1234), status=200, body='[{"facilityId": }]')
+        assert main(['--token', token, '--no-token-cache', 'facilities']) == 1
+    assert capsys.readouterr().err.startswith('Error:')
+
+    with aioresponses():
+        assert main(['--token', token, '--no-token-cache', 'export', str(tmp_path / 'out.txt')]) == 1
+    assert capsys.readouterr().err.startswith('Error:')
@@ -4,6 +4,7 @@ import pytest
 from http import HTTPStatus
 from aioresponses import aioresponses
 from froeling import Froeling, endpoints
+from froeling.exceptions import NetworkError
 
 
 @pytest.mark.asyncio
@@ -81,6 +82,7 @@ async def test_component_set_value(load_json):
             status=200,
             payload='successmessage',
         )
+        m.put(endpoints.SET_PARAMETER.format(1234, 12345, '3_0'), status=HTTPStatus.NOT_MODIFIED)
 
         async with Froeling(token=token) as api:
             c = api.get_component(12345, '1_100')
@@ -90,3 +92,40 @@ async def test_component_set_value(load_json):
 
             msg = await list(c.parameters.values())[0].set_value('testvalue')
             assert msg == 'successmessage'
+
+            # put_value doesn't hide that the value was already set
+            with pytest.raises(NetworkError) as e:
+                await c.parameters['3_0'].put_value('testvalue')
+            assert e.value.status == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'fields,expected',
+    [
+        (None, {'3_0', '3_1', '3_15', '3_3', '3_156', '77_457', '3_140', '70_98', '3_213', '100011_9963', '995_9887',
+                '8_1085', 'CAL_B_1', 'INL_B_1', '3_16', '7_28'}),
+        (['stateView'], {'3_0', '3_1', '3_15', '3_3', '3_16', '3_156'}),
+        (['stateView', 'setupView'], {'3_0', '3_1', '3_15', '3_3', '3_16', '3_156', '7_28'}),
+        (['7_28', '3_213'], {'7_28', '3_213'}),
+        (['stateView', '3_0', '7_28'], {'3_0'}),
+    ],
+)
+async def test_component_update_fields(load_json, fields, expected):
+    component_data = load_json('component.json')
+
+    token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+    with aioresponses() as m:
+        m.get(
+            endpoints.COMPONENT.format(1234, 12345, '1_100'),
+            status=200,
+            payload=component_data,
+        )
+
+        async with Froeling(token=token) as api:
+            c = api.get_component(12345, '1_100')
+            parameters = await c.update(fields)
+            assert parameters is c.parameters
+            assert set(parameters) == expected
+            assert c.display_name == 'DN_Kessel'
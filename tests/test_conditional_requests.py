@@ -0,0 +1,83 @@
+"""Test conditional GETs with ETag and Last-Modified."""
+
+import pytest
+from aioresponses import aioresponses
+from froeling import Froeling, endpoints
+from yarl import URL
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+def sent_headers(m, url):
+    return [call.kwargs['headers'] for call in m.requests[('get', URL(url))]]
+
+
+@pytest.mark.asyncio
+async def test_component_not_modified(load_json):
+    url = endpoints.COMPONENT.format(1234, 12345, '1_100')
+    with aioresponses() as m:
+        m.get(url, status=200, payload=load_json('component.json'), headers={'ETag': '"v1"'})
+        m.get(url, status=304)
+        m.get(url, status=304)
+        async with Froeling(token=token) as api:
+            component = api.get_component(12345, '1_100')
+            parameters = await component.update()
+            raw = component.raw
+
+            # Unchanged: nothing is parsed again
+            assert await component.update() is parameters
+            assert component.raw is raw
+
+            # A different projection is built from the cached response
+            projected = await component.update(['3_0'])
+            assert list(projected) == ['3_0']
+            assert projected['3_0'].value == '78'
+
+        headers = sent_headers(m, url)
+    assert 'If-None-Match' not in headers[0]
+    assert headers[1]['If-None-Match'] == '"v1"'
+    assert headers[2]['If-None-Match'] == '"v1"'
+    assert 'If-None-Match' not in api.session._headers  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_notifications_not_modified(load_json):
+    url = endpoints.NOTIFICATION_LIST.format(1234)
+    last_modified = 'Wed, 21 Oct 2026 07:28:00 GMT'
+    with aioresponses() as m:
+        m.get(url, status=200, payload=load_json('notification_list.json'), headers={'Last-Modified': last_modified})
+        m.get(url, status=304)
+        m.get(url, status=200, payload=load_json('notification_list.json')[:1])
+        m.get(url, status=304)
+        async with Froeling(token=token) as api:
+            notifications = await api.get_notifications()
+            unchanged = await api.get_notifications()
+            # The cached list is copied, its notifications are reused.
+            assert unchanged is not notifications
+            assert all(a is b for a, b in zip(unchanged, notifications, strict=True))
+            unchanged.clear()
+
+            changed = await api.get_notifications()
+            assert len(changed) == 1
+            assert len(notifications) == 3
+            # The last response had no validators, so it isn't cached.
+            assert url not in api.session.cached_responses
+            with pytest.raises(Exception, match='Unexpected return code'):
+                await api.get_notifications()
+
+        headers = sent_headers(m, url)
+    assert headers[1]['If-Modified-Since'] == last_modified
+    assert 'If-Modified-Since' not in headers[3]
+
+
+@pytest.mark.asyncio
+async def test_disabled(load_json):
+    url = endpoints.FACILITY.format(1234)
+    with aioresponses() as m:
+        m.get(url, status=200, payload=load_json('facility.json'), headers={'ETag': '"v1"'}, repeat=True)
+        async with Froeling(token=token, conditional_requests=False) as api:
+            await api.session.request('get', url)
+            await api.session.request('get', url)
+            assert api.session.cached_responses == {}
+
+        assert all('If-None-Match' not in h for h in sent_headers(m, url))
@@ -0,0 +1,65 @@
+"""Test response decoding."""
+
+import json
+import threading
+
+import pytest
+from aioresponses import aioresponses
+from froeling import Froeling, decoding, endpoints, exceptions
+from froeling.session import OffloadConfig
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+@pytest.mark.parametrize('name', ['component.json', 'facility.json', 'notification_list.json', 'user.json'])
+def test_loads_matches_json(load_json, name):
+    data = load_json(name)
+    assert decoding.loads(json.dumps(data).encode()) == data
+
+
+def test_loads_invalid():
+    with pytest.raises(json.JSONDecodeError):
+        decoding.loads(b'{"a": x}')
+
+
+def test_loads_without_msgspec(load_json, monkeypatch):
+    monkeypatch.setattr(decoding, 'msgspec', None)
+    data = load_json('component.json')
+    assert decoding.loads(json.dumps(data).encode()) == data
+
+
+@pytest.mark.asyncio
+async def test_request_invalid_json():
+    with aioresponses() as m:
+        m.get(endpoints.FACILITY.format(1234), status=200, body='[{"facilityId": }]')
+
+        async with Froeling(token=token) as api:
+            with pytest.raises(exceptions.ParsingError) as e:
+                await api.get_facilities()
+            assert e.value.url == endpoints.FACILITY.format(1234)
+
+
+@pytest.mark.asyncio
+async def test_offload(load_json, monkeypatch):
+    threads = []
+    loads = decoding.loads
+
+    def recording_loads(data):
+        threads.append(threading.current_thread())
+        return loads(data)
+
+    monkeypatch.setattr(decoding, 'loads', recording_loads)
+    offload = OffloadConfig(min_bytes=1000, min_items=10)
+    with aioresponses() as m:
+        m.get(endpoints.COMPONENT.format(1234, 12345, '1_100'), status=200, payload=load_json('component.json'))
+        m.get(endpoints.NOTIFICATION_COUNT.format(1234), status=200, payload={'unreadNotifications': 3})
+
+        async with Froeling(token=token, offload=offload) as api:
+            component = api.get_component(12345, '1_100')
+            await component.update()
+            assert component.parameters['3_0'].value == '78'
+            assert await api.get_notification_count() == 3
+
+    large, small = threads
+    assert large is not threading.current_thread()
+    assert small is threading.current_thread()
@@ -0,0 +1,121 @@
+"""Test the event bus."""
+
+import asyncio
+import copy
+
+import pytest
+from aioresponses import aioresponses
+from froeling import Froeling, endpoints
+from froeling.events import Event, EventBus, EventType, Policy
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+def drain(subscriber):
+    return [subscriber._events.popitem(last=False)[1] for _ in range(len(subscriber))]  # noqa: SLF001
+
+
+def changed(parameter_id, value):
+    return Event(EventType.PARAMETER_CHANGED, 1, '1_100', parameter_id, value=value)
+
+
+@pytest.mark.parametrize(
+    ('policy', 'expected'),
+    [
+        (Policy.DROP_OLDEST, [('b', 2), ('a', 3)]),
+        (Policy.DROP_NEWEST, [('a', 1), ('b', 2)]),
+        (Policy.COALESCE, [('a', 3), ('b', 2)]),
+    ],
+)
+def test_policies(policy, expected):
+    bus = EventBus()
+    subscriber = bus.subscribe(maxsize=2, policy=policy)
+    for event in (changed('a', 1), changed('b', 2), changed('a', 3)):
+        bus.publish(event)
+    events = drain(subscriber)
+    assert [(e.parameter_id, e.value) for e in events] == expected
+    assert subscriber.dropped + subscriber.coalesced == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_does_not_block():
+    bus = EventBus()
+    slow = bus.subscribe(maxsize=10)
+    fast = bus.subscribe({EventType.PARAMETER_CHANGED}, maxsize=100_000)
+    other = bus.subscribe({EventType.ERROR})
+
+    for i in range(10_000):
+        bus.emit(EventType.PARAMETER_CHANGED, parameter_id=str(i), value=i)
+    assert len(slow) == 10
+    assert slow.dropped == 9_990
+    assert (await slow.get()).value == 9_990
+    assert len(fast) == 10_000
+    assert len(other) == 0
+
+    bus.unsubscribe(slow)
+    assert not bus.wants(EventType.TOKEN_RENEWED)
+    assert bus.wants(EventType.ERROR)
+
+
+@pytest.mark.asyncio
+async def test_run_until_closed():
+    bus = EventBus()
+    subscriber = bus.subscribe()
+    handled = []
+
+    async def handler(event):
+        if event.value == 1:
+            raise RuntimeError  # Logged, the subscriber keeps running
+        handled.append(event.value)
+
+    task = asyncio.create_task(subscriber.run(handler))
+    for value in range(3):
+        bus.emit(EventType.PARAMETER_CHANGED, value=value)
+    await asyncio.sleep(0)
+    bus.unsubscribe(subscriber)
+    await asyncio.wait_for(task, 1)
+    assert handled == [0, 2]
+    bus.emit(EventType.PARAMETER_CHANGED, value=3)
+    assert len(subscriber) == 0
+
+
+@pytest.mark.asyncio
+async def test_client_events(load_json):
+    component_data = load_json('component.json')
+    updated_data = copy.deepcopy(component_data)
+    updated_data['stateView'][0]['value'] = '80'
+    url = endpoints.COMPONENT.format(1234, 12345, '1_100')
+
+    with aioresponses() as m:
+        m.get(url, status=200, payload=component_data)
+        m.get(url, status=200, payload=updated_data)
+        m.get(url, status=500)
+        m.get(endpoints.NOTIFICATION_LIST.format(1234), status=200, payload=load_json('notification_list.json'))
+        m.get(endpoints.NOTIFICATION_LIST.format(1234), status=200, payload=load_json('notification_list.json'))
+
+        async with Froeling(token=token) as api:
+            subscriber = api.events.subscribe()
+            component = api.get_component(12345, '1_100')
+            await component.update()
+            first = drain(subscriber)
+            assert [e.type for e in first[:-1]] == [EventType.PARAMETER_CHANGED] * len(component.parameters)
+            assert first[-1].type == EventType.COMPONENT_UPDATED
+            assert first[-1].data is component
+
+            await component.update()
+            parameter_changed = await subscriber.get()
+            assert parameter_changed.parameter_id == updated_data['stateView'][0]['id']
+            assert parameter_changed.previous == component_data['stateView'][0]['value']
+            assert parameter_changed.value == '80'
+            assert (await subscriber.get()).type == EventType.COMPONENT_UPDATED
+
+            with pytest.raises(Exception, match='Unexpected return code'):
+                await component.update()
+            error = await subscriber.get()
+            assert error.type == EventType.ERROR
+            assert (error.facility_id, error.component_id) == (12345, '1_100')
+
+            await api.get_notifications()
+            await api.get_notifications()
+            received = drain(subscriber)
+            assert [e.notification_id for e in received] == [10123456, 20123456, 30123456]
@@ -0,0 +1,71 @@
+"""Test exporting facility snapshots."""
+
+import csv
+import json
+
+import pytest
+from aioresponses import aioresponses
+from froeling import Froeling, endpoints
+from froeling.export import COLUMNS, export_snapshot
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+@pytest.fixture
+def mocked_fleet(load_json):
+    component_list_data = load_json('component_list.json')
+    with aioresponses() as m:
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=load_json('facility.json'))
+        m.get(endpoints.COMPONENT_LIST.format(1234, 12345), status=200, payload=component_list_data)
+        m.get(endpoints.COMPONENT_LIST.format(1234, 54321), status=200, payload=[])
+        m.get(endpoints.COMPONENT.format(1234, 12345, '1_100'), status=200, payload=load_json('component.json'))
+        for c in component_list_data[1:]:
+            m.get(endpoints.COMPONENT.format(1234, 12345, c['componentId']), status=500)
+        yield m
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('suffix', ['.ndjson', '.csv'])
+async def test_export_text(mocked_fleet, tmp_path, suffix):
+    path = tmp_path / f'snapshot{suffix}'
+    async with Froeling(token=token) as api:
+        result = await export_snapshot(api, path, batch_size=5)
+
+    assert result.rows == 16
+    assert result.components == 1
+    assert result.errors == 4
+
+    with path.open(encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f] if suffix == '.ndjson' else list(csv.DictReader(f))
+    assert len(rows) == 16
+    assert list(rows[0]) == list(COLUMNS)
+    row = next(r for r in rows if r['parameter_id'] == '7_28')
+    assert str(row['facility_id']) == '12345'
+    assert row['component_id'] == '1_100'
+    assert row['value'] == '80'
+    assert float(row['numeric_value']) == 80
+    assert row['unit'] == '°C'
+
+
+@pytest.mark.asyncio
+async def test_export_parquet(mocked_fleet, tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+
+    path = tmp_path / 'snapshot.parquet'
+    async with Froeling(token=token) as api:
+        result = await export_snapshot(api, path, batch_size=5)
+    assert result.rows == 16
+
+    table = pq.read_table(path)
+    assert table.column_names == list(COLUMNS)
+    assert table.num_rows == 16
+    values = dict(zip(table['parameter_id'].to_pylist(), table['numeric_value'].to_pylist()))
+    assert values['3_3'] == 1.9
+    assert values['77_457'] is None  # Not a numeric parameter.
+
+
+@pytest.mark.asyncio
+async def test_export_unknown_format(tmp_path):
+    async with Froeling(token=token) as api:
+        with pytest.raises(ValueError):
+            await export_snapshot(api, tmp_path / 'snapshot.xlsx')
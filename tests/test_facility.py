@@ -265,3 +265,56 @@ async def test_facility_get_component(load_json):
             assert c.raw == component_data
             await c2.update()
             assert c2.raw == component_data
+
+
+@pytest.mark.asyncio
+async def test_facility_parameter_index(load_json):
+    facility_data = load_json('facility.json')
+    component_list_data = load_json('component_list.json')
+    component_data = load_json('component.json')
+
+    token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+    with aioresponses() as m:
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=facility_data)
+        m.get(endpoints.COMPONENT_LIST.format(1234, 12345), status=200, payload=component_list_data)
+        m.get(endpoints.COMPONENT.format(1234, 12345, '1_100'), status=200, payload=component_data, repeat=True)
+
+        async with Froeling(token=token) as api:
+            f = await api.get_facility(12345)
+            index = f.parameter_index
+            assert len(index) == 0
+
+            components = await f.get_components()
+            await components[0].update(['stateView'])
+            assert len(index) == 6
+            assert '7_28' not in index
+
+            c = api.get_component(12345, '1_100')  # Uses the cached facility.
+            await c.update(['7_28'])
+            entry = index.get('7_28')
+            assert entry.component is c
+            assert entry.parameter is c.parameters['7_28']
+            assert len(index) == 7  # Partial updates only add parameters.
+
+            await c.update()
+            assert len(index) == len(c.parameters) == 16
+            assert index.get('3_0').parameter is c.parameters['3_0']
+            assert [e.parameter.id for e in index.find('boilerTemp')] == ['3_0']
+            assert [e.parameter.id for e in index.find('Kessel-Solltemperatur')] == ['7_28']
+
+            assert {e.parameter.id for e in index.search(prefix='3_1')} == {'3_1', '3_15', '3_16', '3_156', '3_140'}
+            assert {e.parameter.id for e in index.search(prefix='boiler')} == {'3_0', '7_28', '995_9887'}
+            assert {e.parameter.id for e in index.search(pattern='[Tt]emp$')} >= {'3_0', '3_1', '7_28'}
+            assert [e.parameter.id for e in index.search(prefix='boiler', pattern='Set')] == ['7_28']
+
+            del c.parameters['7_28']
+            index.update(c)  # A full update removes parameters the component no longer has.
+            assert '7_28' not in index
+            assert index.find('boilerSetTemp') == []
+            assert len(index) == 15
+
+            del c.parameters['3_0']
+            index.update(c, replace=False, requested=['3_0', '3_1'])  # Requested but not returned.
+            assert '3_0' not in index
+            assert '3_1' in index
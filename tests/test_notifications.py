@@ -1,10 +1,14 @@
 """Test notifications."""
 
+import asyncio
+
 import pytest
 from aioresponses import aioresponses
 import datetime
 from froeling import Froeling, endpoints
+from froeling.cache import LRUCache
 from froeling.datamodels.notifications import NotificationSubmissionState
+from yarl import URL
 
 
 @pytest.mark.asyncio
@@ -128,3 +132,63 @@ async def test_get_notification_info(load_json):
 
 
 # TODO: Test NotificationErrorSolution
+
+
+def test_lru_cache():
+    cache = LRUCache(max_items=2, max_bytes=100, size=len)
+    cache.set(1, 'a' * 10)
+    cache.set(2, 'b' * 10)
+    assert cache.get(1) == 'a' * 10  # 1 is now the most recently used
+    cache.set(3, 'c' * 10)
+    assert 2 not in cache
+    assert len(cache) == 2
+
+    cache.set(4, 'd' * 95)  # Over max_bytes together with the others
+    assert list(cache._values) == [4]  # noqa: SLF001
+    assert cache.bytes == 95
+
+    cache.set(5, 'e' * 101)  # Larger than max_bytes, never stored
+    assert 5 not in cache
+    assert cache.bytes == 95
+
+
+@pytest.mark.asyncio
+async def test_notification_details_cached(load_json):
+    notification_list_data = load_json('notification_list.json')
+    token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+    with aioresponses() as m:
+        m.get(endpoints.NOTIFICATION_LIST.format(1234), status=200, payload=notification_list_data)
+        for n in notification_list_data:
+            m.get(
+                endpoints.NOTIFICATION.format(1234, n['id']),
+                status=200,
+                payload=dict(load_json('notification.json'), id=n['id']),
+                repeat=True,
+            )
+
+        async with Froeling(token=token) as api:
+            notifications = await api.get_notifications()
+            details = await api.get_notification_details(notifications, concurrency=2)
+            assert [d.id for d in details] == [n['id'] for n in notification_list_data]
+            assert all(n.details is d for n, d in zip(notifications, details))
+
+            # Served from the cache
+            assert await notifications[0].info() is details[0]
+            assert await api.get_notification(notifications[1].id) is details[1]
+            assert len(api.session.notification_cache) == 3
+
+            refreshed = await notifications[0].info(refresh=True)
+            assert refreshed is not details[0]
+            assert refreshed.body == details[0].body
+
+            # A refresh doesn't join a fetch that is already running
+            api.session.notification_cache.clear()
+            first, second = await asyncio.gather(
+                api.get_notification(notifications[0].id), api.get_notification(notifications[0].id, refresh=True)
+            )
+            assert first is not second
+            assert await notifications[0].info() is second
+
+    requests = m.requests[('get', URL(endpoints.NOTIFICATION.format(1234, notification_list_data[0]['id'])))]
+    assert len(requests) == 4
@@ -0,0 +1,131 @@
+"""Test bounded, streaming iteration over components."""
+
+import asyncio
+
+import pytest
+from aioresponses import aioresponses
+from froeling import Froeling, endpoints
+from froeling.pipeline import bounded_map, iter_components
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+async def delayed(value):
+    await asyncio.sleep(value / 1000)
+    return value
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('ordered,expected', [(True, [30, 10, 20]), (False, [10, 20, 30])])
+async def test_bounded_map_order(ordered, expected):
+    assert [v async for v in bounded_map([30, 10, 20], delayed, concurrency=3, ordered=ordered)] == expected
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('ordered', [True, False])
+async def test_bounded_map_is_bounded(ordered):
+    started = []
+
+    async def record(value):
+        started.append(value)
+        await asyncio.sleep(0)
+        return value
+
+    consumed = 0
+    async for _ in bounded_map(range(20), record, concurrency=3, ordered=ordered):
+        consumed += 1
+        await asyncio.sleep(0.001)  # A slow consumer holds back fetching
+        assert len(started) <= consumed + 3
+    assert consumed == 20
+
+
+@pytest.mark.asyncio
+async def test_iter_components_shares_concurrency():
+    in_flight = 0
+    most = 0
+
+    async def request():
+        nonlocal in_flight, most
+        in_flight += 1
+        most = max(most, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+
+    class FakeComponent:
+        def __init__(self, component_id):
+            self.component_id = component_id
+
+        async def update(self, fields):
+            await request()
+
+    class FakeFacility:
+        def __init__(self, facility_id):
+            self.facility_id = facility_id
+
+        async def get_components(self):
+            await request()
+            return [FakeComponent(f'{self.facility_id}_{i}') for i in range(3)]
+
+    facilities = [FakeFacility(i) for i in range(10)]
+    components = [c.component_id async for c in iter_components(facilities, concurrency=3)]
+    assert len(components) == 30
+    assert most == 3
+
+
+@pytest.mark.asyncio
+async def test_bounded_map_cancels_on_close():
+    cancelled = []
+
+    async def slow(value):
+        try:
+            await asyncio.sleep(value)
+        except asyncio.CancelledError:
+            cancelled.append(value)
+            raise
+        return value
+
+    results = bounded_map([0, 10, 10], slow, concurrency=3)
+    assert await anext(results) == 0
+    await results.aclose()
+    assert cancelled == [10, 10]
+
+    async def fail(value):
+        raise ValueError(value)
+
+    with pytest.raises(ValueError):
+        async for _ in bounded_map([1], fail):
+            pass
+
+
+@pytest.fixture
+def mocked(load_json):
+    with aioresponses() as m:
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=load_json('facility.json'))
+        m.get(endpoints.COMPONENT_LIST.format(1234, 12345), status=200, payload=load_json('component_list.json')[:2])
+        m.get(endpoints.COMPONENT_LIST.format(1234, 54321), status=500)
+        m.get(endpoints.COMPONENT.format(1234, 12345, '1_100'), status=200, payload=load_json('component.json'))
+        m.get(endpoints.COMPONENT.format(1234, 12345, '300_3100'), status=500)
+        yield m
+
+
+@pytest.mark.asyncio
+async def test_iter_components(mocked):
+    errors = []
+    async with Froeling(token=token) as api:
+        components = [c async for c in api.iter_components(ordered=True, on_error=errors.append)]
+
+    assert [c.component_id for c in components] == ['1_100']
+    assert components[0].parameters
+    # The failed component list and the failed component are skipped
+    assert len(errors) == 2
+
+
+@pytest.mark.asyncio
+async def test_iter_parameters(mocked):
+    async with Froeling(token=token) as api:
+        parameters = [p async for p in api.iter_parameters([12345], component_ids={'1_100'})]
+
+    ids = [p.id for p in parameters]
+    assert len(ids) == len(set(ids)) == 16
+    assert {'3_0', '7_28'} <= set(ids)
+    assert all(p.facility_id == 12345 for p in parameters)
@@ -0,0 +1,109 @@
+"""Test adaptive polling."""
+
+import copy
+from types import SimpleNamespace
+
+import pytest
+from aioresponses import aioresponses
+from froeling import Froeling, endpoints
+from froeling.polling import AdaptivePoller, facility_active
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+class FakeComponent:
+    def __init__(self, component_id, values):
+        self.facility_id = 12345
+        self.component_id = component_id
+        self._values = iter(values)
+        self.fields = []
+
+    async def update(self, fields=None):
+        self.fields.append(fields)
+        value = next(self._values)
+        if isinstance(value, Exception):
+            raise value
+        return {'3_0': SimpleNamespace(value=value)}
+
+
+@pytest.mark.asyncio
+async def test_adaptive_intervals():
+    now = 0.0
+    updates = []
+    poller = AdaptivePoller(
+        min_interval=10,
+        max_interval=40,
+        fields=['stateView'],
+        on_update=lambda c, changed: updates.append((c.component_id, changed)),
+        clock=lambda: now,
+    )
+    stable = FakeComponent('stable', ['1'] * 10)
+    changing = FakeComponent('changing', ['1', '2', '3', '3', '3', '4', '4'])
+    poller.add(stable)
+    poller.add(changing)
+
+    polled_at = {'stable': [], 'changing': []}
+    while now <= 100:
+        for component in await poller.poll():
+            polled_at[component.component_id].append(now)
+        now = poller.next_poll()
+
+    assert polled_at['stable'] == [0, 10, 30, 70]  # Intervals 10, 20, 40 (max), ...
+    assert polled_at['changing'] == [0, 10, 20, 30, 50, 90, 100]
+    assert stable.fields[0] == {'stateView'}
+    assert ('changing', True) in updates
+    assert ('stable', True) not in updates
+
+    stats = poller.stats
+    assert stats.requests == 11
+    assert stats.changes == 3
+    assert stats.fixed_requests == 24  # Both components every 10s from 0 to 110.
+    assert stats.saved == 13
+
+
+@pytest.mark.asyncio
+async def test_active_facility_and_errors():
+    now = 0.0
+    poller = AdaptivePoller(min_interval=10, max_interval=100, clock=lambda: now)
+    active = SimpleNamespace(protocol_3200_info={'active': True})
+    component = FakeComponent('c', ['1', RuntimeError(), '1', '1'])
+    poller.add(component, active)
+
+    for expected in (0, 10, 20, 30):
+        now = poller.next_poll()
+        assert now == expected
+        await poller.poll()
+    assert poller.stats.errors == 1
+
+    assert facility_active(active)
+    assert not facility_active(SimpleNamespace(protocol_3200_info=None))
+    assert not facility_active(None)
+    with pytest.raises(ValueError):
+        AdaptivePoller(min_interval=10, max_interval=5)
+
+
+@pytest.mark.asyncio
+async def test_facility_becomes_active(load_json):
+    facility_data = load_json('facility.json')
+    active_data = copy.deepcopy(facility_data)
+    active_data[0]['protocol3200Info']['active'] = True
+
+    now = 0.0
+    poller = AdaptivePoller(min_interval=10, max_interval=400, facility_interval=100, clock=lambda: now)
+    with aioresponses() as m:
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=facility_data)
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=facility_data)
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=active_data)
+        async with Froeling(token=token) as api:
+            facility = await api.get_facility(12345)
+            component = FakeComponent('c', ['1'] * 10)
+            poller.add(component, facility)
+
+            polled_at = []
+            while now <= 250:
+                polled_at += [now for _ in await poller.poll()]
+                now = min(poller.next_poll(), poller._facilities_due)
+
+    # Backing off (0, 10, 30, 70, 150) until the refresh at 200 sees the boiler firing
+    assert polled_at == [0, 10, 30, 70, 150, 200, 210, 220, 230, 240, 250]
+    assert facility_active(poller.components[12345, 'c'].facility)
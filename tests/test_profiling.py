@@ -0,0 +1,105 @@
+"""Test the profiling hooks."""
+
+import asyncio
+import time
+
+import pytest
+from aioresponses import aioresponses
+from froeling import Froeling, endpoints, profiling
+from froeling.polling import AdaptivePoller
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+@pytest.fixture
+def profiler():
+    try:
+        yield profiling.enable()
+    finally:
+        profiling.disable()
+
+
+def test_profiler_stats():
+    samples = []
+    profiler = profiling.Profiler(samples.append)
+    for seconds in (0.1, 0.2, 0.3):
+        profiler.record('network', 'COMPONENT', seconds)
+    with profiler.measure('model', 'Parameter._from_list'):
+        pass
+
+    (network, model) = profiler.report()
+    assert network['phase'] == 'network'
+    assert network['count'] == 3
+    assert network['total'] == pytest.approx(0.6)
+    assert network['mean'] == pytest.approx(0.2)
+    assert network['p50'] == pytest.approx(0.2)
+    assert network['max'] == pytest.approx(0.3)
+    assert model['key'] == 'Parameter._from_list'
+    assert samples[0] == profiling.Sample('network', 'COMPONENT', 0.1)
+    assert len(samples) == 4
+
+    lines = profiler.format_report().splitlines()
+    assert lines[0].split() == ['phase', 'key', 'count', 'total', 'mean', 'p50', 'p99', 'max']
+    assert lines[1].split()[:4] == ['network', 'COMPONENT', '3', '600.0']
+
+    profiler.reset()
+    assert profiler.report() == []
+
+
+def test_disabled():
+    assert profiling.active is None
+    with profiling.measure('callback', 'test'):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_request_and_model(load_json, profiler):
+    with aioresponses() as m:
+        m.get(endpoints.COMPONENT.format(1234, 12345, '1_100'), status=200, payload=load_json('component.json'))
+        async with Froeling(token=token) as api:
+            await api.get_component(12345, '1_100').update()
+
+    phases = profiler.stats
+    for phase in ('network', 'read', 'decode'):
+        assert phases[phase, 'COMPONENT'].count == 1
+    assert phases['model', 'Parameter._from_list'].count == 1
+    # Nested constructors are part of the outer one
+    assert ('model', 'Parameter._from_dict') not in phases
+
+
+@pytest.mark.asyncio
+async def test_callback(load_json, profiler):
+    updates = []
+
+    async def on_update(component, changed):
+        await asyncio.sleep(0.01)
+        updates.append(changed)
+
+    with aioresponses() as m:
+        m.get(endpoints.COMPONENT.format(1234, 12345, '1_100'), status=200, payload=load_json('component.json'))
+        async with Froeling(token=token) as api:
+            poller = AdaptivePoller(on_update=on_update)
+            poller.add(api.get_component(12345, '1_100'))
+            await poller.poll()
+
+    assert updates
+    stats = profiler.stats['callback', 'AdaptivePoller.on_update']
+    assert stats.count == 1
+    assert stats.total >= 0.01
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor():
+    profiler = profiling.Profiler()
+    lags = []
+    monitor = profiling.LoopLagMonitor(profiler, interval=0.01, threshold=0.04, on_lag=lags.append)
+    task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0.02)
+    time.sleep(0.1)  # Block the loop
+    await asyncio.sleep(0.03)
+    task.cancel()
+
+    assert monitor.max_lag >= 0.05
+    assert lags
+    assert all(lag >= 0.04 for lag in lags)
+    assert profiler.stats['loop_lag', 'event loop'].count >= 2
@@ -0,0 +1,87 @@
+"""Test the Prometheus exporter."""
+
+import aiohttp
+import pytest
+from aiohttp.test_utils import TestServer
+from aioresponses import aioresponses
+from froeling import Froeling, endpoints
+from froeling.polling import AdaptivePoller
+from froeling.prometheus import CONTENT_TYPE, Exporter, create_app
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+@pytest.fixture
+def mocked(load_json):
+    with aioresponses(passthrough=['http://127.0.0.1']) as m:
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=load_json('facility.json'))
+        m.get(endpoints.COMPONENT_LIST.format(1234, 12345), status=200, payload=load_json('component_list.json')[:2])
+        m.get(endpoints.COMPONENT_LIST.format(1234, 54321), status=200, payload=[])
+        m.get(endpoints.COMPONENT.format(1234, 12345, '1_100'), status=200, payload=load_json('component.json'))
+        m.get(endpoints.COMPONENT.format(1234, 12345, '300_3100'), status=500)
+        yield m
+
+
+@pytest.mark.asyncio
+async def test_render(mocked):
+    now = 1000.0
+    poller = AdaptivePoller(min_interval=10, max_interval=100, clock=lambda: now)
+    async with Froeling(token=token) as api:
+        exporter = Exporter(api, poller=poller)
+        await exporter.setup()
+        await poller.poll()
+        now += 30
+        lines = exporter.render().splitlines()
+
+    labels = 'facility_id="12345",component_id="1_100",parameter_id="3_0",name="boilerTemp",unit="°C"'
+    assert f'froeling_parameter_value{{{labels}}} 78' in lines
+    assert f'froeling_parameter_age_seconds{{{labels}}} 30.000' in lines
+    assert '# TYPE froeling_parameter_value gauge' in lines
+    assert 'froeling_component_stale{facility_id="12345",component_id="1_100"} 0' in lines
+    # The failed component is stale and has no values
+    assert 'froeling_component_stale{facility_id="12345",component_id="300_3100"} 1' in lines
+    assert 'froeling_component_update_errors_total{facility_id="12345",component_id="300_3100"} 1' in lines
+    assert not any('component_id="300_3100",parameter_id' in line for line in lines)
+    assert 'froeling_requests_total 2' in lines
+    assert '# TYPE froeling_requests_saved gauge' in lines
+
+    # Only numeric parameters are exported
+    assert not any('parameter_id="77_457"' in line for line in lines)
+
+    now += 200
+    assert 'froeling_component_stale{facility_id="12345",component_id="1_100"} 1' in exporter.render().splitlines()
+
+
+@pytest.mark.asyncio
+async def test_scrapes_are_served_from_cache(mocked):
+    async with Froeling(token=token) as api:
+        exporter = Exporter(api, poller=AdaptivePoller(min_interval=60, max_interval=60))
+        async with TestServer(exporter.create_app()) as server, aiohttp.ClientSession() as client:
+            for _ in range(20):
+                async with client.get(server.make_url('/metrics')) as res:
+                    assert res.headers['Content-Type'] == CONTENT_TYPE
+                    body = await res.text()
+            assert 'froeling_parameter_value{facility_id="12345",component_id="1_100"' in body
+
+    component_requests = [
+        calls for (method, url), calls in mocked.requests.items() if str(url).endswith('/component/1_100')
+    ]
+    assert len(component_requests[0]) == 1
+
+
+@pytest.mark.asyncio
+async def test_create_app_closes_client(mocked, monkeypatch):
+    closed = []
+    close = Froeling.close
+
+    async def record_close(api):
+        closed.append(api)
+        await close(api)
+
+    monkeypatch.setattr(Froeling, 'close', record_close)
+    app = await create_app(token=token, min_interval=60, max_interval=60)
+    async with TestServer(app) as server, aiohttp.ClientSession() as client:
+        async with client.get(server.make_url('/metrics')) as res:
+            assert 'froeling_requests_total 2' in (await res.text()).splitlines()
+        assert not closed
+    assert len(closed) == 1
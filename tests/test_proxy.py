@@ -0,0 +1,152 @@
+"""Test the caching reverse proxy."""
+
+import asyncio
+from http import HTTPStatus
+
+import aiohttp
+import pytest
+from aiohttp.test_utils import TestServer
+from aioresponses import aioresponses
+from froeling import Froeling, Session, endpoints, routes
+from froeling.cache import TTLCache
+from froeling.circuitbreaker import CircuitBreakerConfig
+from froeling.proxy import Proxy
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+def test_routes_match():
+    assert routes.match(endpoints.COMPONENT.format(1, 2, '1_100')).name == 'COMPONENT'
+    assert routes.match(endpoints.NOTIFICATION_COUNT.format(1)).name == 'NOTIFICATION_COUNT'
+    assert routes.match(endpoints.NOTIFICATION.format(1, 2)).name == 'NOTIFICATION'
+    assert routes.match('/fcs/v1.0/resources/user/1/facility/2/componentList?x=1').name == 'COMPONENT_LIST'
+    assert routes.match('https://example.com/unknown') is None
+
+
+@pytest.mark.asyncio
+async def test_ttl_cache_coalesces_and_expires():
+    now = 0.0
+    cache = TTLCache(10, clock=lambda: now)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        return calls
+
+    assert await asyncio.gather(*(cache.get_or_fetch('k', fetch) for _ in range(5))) == [1] * 5
+    assert await cache.get_or_fetch('k', fetch) == 1
+    now = 11
+    assert await cache.get_or_fetch('k', fetch) == 2
+    cache.invalidate(lambda k: k == 'k')
+    assert await cache.get_or_fetch('k', fetch) == 3
+
+
+def test_ttl_cache_is_bounded():
+    now = 0.0
+    cache = TTLCache(10, max_items=3, clock=lambda: now)
+    for key in 'abc':
+        cache.set(key, key)
+        now += 4
+    # 'a' expired, 'b' is the oldest fresh value
+    cache.set('d', 'd')
+    cache.set('e', 'e')
+    assert len(cache) == 3
+    assert [cache.get(k) for k in 'abcde'] == [None, None, 'c', 'd', 'e']
+
+
+@pytest.mark.asyncio
+async def test_proxy_serves_clients_from_one_upstream(load_json):
+    facility_data = load_json('facility.json')
+    user_data = load_json('user.json')
+    component_data = load_json('component.json')
+
+    with aioresponses(passthrough=['http://127.0.0.1']) as m:
+        # Registered once each: a second upstream request would fail.
+        m.get(endpoints.USER.format(1234), status=200, payload=user_data)
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=facility_data)
+        m.get(endpoints.COMPONENT.format(1234, 12345, '1_100'), status=200, payload=component_data)
+        m.put(endpoints.SET_PARAMETER.format(1234, 12345, '7_28'), status=HTTPStatus.NOT_MODIFIED)
+        m.put(endpoints.SET_PARAMETER.format(1234, 12345, '7_28'), status=200, payload='successmessage')
+        m.get(endpoints.COMPONENT.format(1234, 12345, '1_100'), status=200, payload=component_data)
+
+        upstream = Session(token=token)
+        proxy = Proxy(upstream)
+        async with TestServer(proxy.app) as server:
+            base_url = str(server.make_url('')).rstrip('/')
+
+            async with Froeling('joe', 'pwd', base_url=base_url) as a, Froeling(token=token, base_url=base_url) as b:
+                assert a.user_id == 1234
+                assert a.token != token  # The upstream token stays in the proxy.
+                assert (await a.get_userdata()).raw == user_data
+
+                fa, fb = await asyncio.gather(a.get_facilities(), b.get_facilities())
+                assert [f.raw for f in fa] == [f.raw for f in fb] == facility_data
+
+                ca, cb = a.get_component(12345, '1_100'), b.get_component(12345, '1_100')
+                await asyncio.gather(ca.update(), cb.update())
+                assert ca.raw == cb.raw == component_data
+
+                assert await ca.parameters['7_28'].set_value(80) is None
+                assert await ca.parameters['7_28'].set_value(81) == 'successmessage'
+
+                await cb.update()  # Writes invalidate the facility's cached reads.
+                assert cb.raw == component_data
+        await upstream.close()
+
+    upstream_requests = {(method.upper(), str(url)): len(calls) for (method, url), calls in m.requests.items()}
+    assert upstream_requests[('GET', endpoints.COMPONENT.format(1234, 12345, '1_100'))] == 2
+    assert upstream_requests[('GET', endpoints.FACILITY.format(1234))] == 1
+
+
+@pytest.mark.asyncio
+async def test_proxy_cache_keys_and_invalidation(load_json):
+    facility_data = load_json('facility.json')
+    facility_path = endpoints.FACILITY.format(1234).removeprefix(endpoints.BASE_URL)
+
+    with aioresponses(passthrough=['http://127.0.0.1']) as m:
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=facility_data)
+        m.put(endpoints.SET_PARAMETER.format(1234, 12345, '7_28'), status=200, payload='successmessage')
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=facility_data)
+
+        upstream = Session(token=token)
+        proxy = Proxy(upstream)
+        async with TestServer(proxy.app) as server, aiohttp.ClientSession() as client:
+            for query in ('', '?a=1', '?a=2'):
+                async with client.get(server.make_url(facility_path + query)) as res:
+                    assert await res.json() == facility_data
+            other_user = endpoints.FACILITY.format(999).removeprefix(endpoints.BASE_URL)
+            async with client.get(server.make_url(other_user)) as res:
+                assert res.status == HTTPStatus.NOT_FOUND
+            assert list(proxy.cache._values) == [facility_path]
+
+            path = endpoints.SET_PARAMETER.format(1234, 12345, '7_28').removeprefix(endpoints.BASE_URL)
+            async with client.put(server.make_url(path), json={'value': '81'}) as res:
+                assert res.status == HTTPStatus.OK
+            assert len(proxy.cache) == 0  # The facility list may change with a write
+            async with client.get(server.make_url(facility_path)) as res:
+                assert await res.json() == facility_data
+        await upstream.close()
+
+    upstream_requests = {(method.upper(), str(url)): len(calls) for (method, url), calls in m.requests.items()}
+    assert upstream_requests[('GET', endpoints.FACILITY.format(1234))] == 2
+
+
+@pytest.mark.asyncio
+async def test_proxy_circuit_open():
+    facility_path = endpoints.FACILITY.format(1234).removeprefix(endpoints.BASE_URL)
+
+    with aioresponses(passthrough=['http://127.0.0.1']) as m:
+        m.get(endpoints.FACILITY.format(1234), status=500)
+
+        upstream = Session(token=token, circuit_breaker=CircuitBreakerConfig(min_requests=1, reset_timeout=30))
+        proxy = Proxy(upstream)
+        async with TestServer(proxy.app) as server, aiohttp.ClientSession() as client:
+            async with client.get(server.make_url(facility_path)) as res:
+                assert res.status == HTTPStatus.INTERNAL_SERVER_ERROR
+            # The circuit is open now, clients are told when to retry
+            async with client.get(server.make_url(facility_path)) as res:
+                assert res.status == HTTPStatus.SERVICE_UNAVAILABLE
+                assert 25 <= int(res.headers['Retry-After']) <= 30
+        await upstream.close()
@@ -0,0 +1,99 @@
+"""Test weekly schedules and writing time windows."""
+
+import datetime
+
+import pytest
+from aioresponses import aioresponses
+from froeling import Froeling, endpoints
+from froeling.experimental import _TIME_WINDOWS, apply_schedule
+from froeling.datamodels import PhaseChange, WeeklySchedule
+from froeling.datamodels.generics import Weekday
+from yarl import URL
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+def phase(start, end):
+    (sh, sm), (eh, em) = divmod(start, 60), divmod(end, 60)
+    return {'startHour': sh, 'startMinute': sm, 'endHour': eh, 'endMinute': em}
+
+
+def time_windows():
+    return [
+        {'id': i, 'weekDay': weekday.value, 'phases': [phase(360, 480), phase(1020, 1320), phase(0, 0)]}
+        for i, weekday in enumerate(Weekday, 1)
+    ]
+
+
+def test_is_active():
+    schedule = WeeklySchedule.parse({'MONDAY': ['06:00-08:00', '17:00-22:00'], 'SUNDAY': ['22:00-24:00']})
+
+    assert schedule.is_active((Weekday.MONDAY, 6 * 60))
+    assert schedule.is_active((Weekday.MONDAY, 8 * 60 - 1))
+    assert not schedule.is_active((Weekday.MONDAY, 8 * 60))
+    assert not schedule.is_active((Weekday.MONDAY, 0))
+    assert not schedule.is_active((Weekday.TUESDAY, 7 * 60))
+    assert schedule.is_active((Weekday.SUNDAY, 24 * 60 - 1))
+    assert schedule.is_active(datetime.datetime(2024, 1, 1, 18, 30))  # A Monday
+    assert not schedule.is_active(datetime.datetime(2024, 1, 2, 18, 30))
+
+    with pytest.raises(ValueError):
+        WeeklySchedule.parse({'MONDAY': ['06:00-08:00', '07:00-09:00']})
+    with pytest.raises(ValueError):
+        WeeklySchedule.parse({'MONDAY': ['08:00-06:00']})
+    with pytest.raises(ValueError):
+        WeeklySchedule.parse({'MONDAY': ['6 to 8']})
+
+
+@pytest.mark.asyncio
+async def test_apply_schedule(load_json):
+    component_data = load_json('component.json')
+    component_data['timeWindowsView'] = time_windows()
+    url = _TIME_WINDOWS.format(1234, 12345, '1_100')
+
+    with aioresponses() as m:
+        m.get(endpoints.COMPONENT.format(1234, 12345, '1_100'), status=200, payload=component_data)
+        m.put(url, status=200, body='', repeat=True)
+
+        async with Froeling(token=token) as api:
+            component = api.get_component(12345, '1_100')
+            await component.update()
+            current = component.schedule
+            assert current.days[Weekday.MONDAY] == ((360, 480), (1020, 1320))
+
+            # Unchanged schedules are not written.
+            assert await apply_schedule(component, current) == []
+            assert ('put', URL(url)) not in m.requests
+
+            desired = dict(current.days)
+            desired[Weekday.SATURDAY] = ((420, 540), (1020, 1320))
+            desired[Weekday.SUNDAY] = ()
+            changes = await apply_schedule(component, WeeklySchedule(desired))
+            assert changes == [
+                PhaseChange(Weekday.SATURDAY, 0, (360, 480), (420, 540)),
+                PhaseChange(Weekday.SUNDAY, 0, (360, 480), None),
+                PhaseChange(Weekday.SUNDAY, 1, (1020, 1320), None),
+            ]
+            assert component.schedule == WeeklySchedule(desired)
+
+            # Each day has three phase slots
+            desired[Weekday.MONDAY] = ((0, 60), (120, 180), (240, 300), (360, 420))
+            with pytest.raises(ValueError):
+                await apply_schedule(component, WeeklySchedule(desired))
+
+            # A partial schedule only changes the weekdays it covers
+            partial = WeeklySchedule.parse({'TUESDAY': ['05:00-07:00']})
+            assert await apply_schedule(component, partial) == [
+                PhaseChange(Weekday.TUESDAY, 0, (360, 480), (300, 420)),
+                PhaseChange(Weekday.TUESDAY, 1, (1020, 1320), None),
+            ]
+            assert component.schedule.days[Weekday.MONDAY] == ((360, 480), (1020, 1320))
+            assert component.schedule.days[Weekday.TUESDAY] == ((300, 420),)
+
+    call, partial_call = m.requests[('put', URL(url))]
+    assert [d['weekDay'] for d in partial_call.kwargs['json']] == ['TUESDAY']
+    days = call.kwargs['json']
+    assert [(d['id'], d['weekDay']) for d in days] == [(6, 'SATURDAY'), (7, 'SUNDAY')]
+    # Unused slots are kept, so every day is sent with as many phases as the device reported
+    assert days[0]['phases'] == [phase(420, 540), phase(1020, 1320), phase(0, 0)]
+    assert days[1]['phases'] == [phase(0, 0)] * 3
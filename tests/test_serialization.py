@@ -0,0 +1,67 @@
+"""Test serializing datamodels without their session."""
+
+import pickle
+
+import pytest
+from aioresponses import aioresponses
+from froeling import Froeling, endpoints, serialization
+from froeling.datamodels import Component, Facility, NotificationOverview
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('fmt', ['json', 'msgpack', 'pickle'])
+async def test_round_trip(load_json, fmt):
+    if fmt == 'msgpack':
+        pytest.importorskip('msgspec')
+    with aioresponses() as m:
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=load_json('facility.json'))
+        m.get(endpoints.COMPONENT.format(1234, 12345, '1_100'), status=200, payload=load_json('component.json'))
+        m.get(endpoints.NOTIFICATION_LIST.format(1234), status=200, payload=load_json('notification_list.json'))
+        m.get(endpoints.NOTIFICATION.format(1234, 10123456), status=200, payload=load_json('notification.json'))
+
+        async with Froeling(token=token) as api:
+            facilities = await api.get_facilities()
+            component = api.get_component(12345, '1_100')
+            await component.update(['stateView'])
+            notification = (await api.get_notifications())[0]
+            await notification.info()
+            objects = [*facilities, component, notification]
+
+            if fmt == 'pickle':
+                restored = pickle.loads(pickle.dumps(objects))
+            else:
+                data = serialization.dumps(objects, fmt=fmt)
+                assert b'signature' not in data  # The session (and its token) is not included.
+                restored = serialization.loads(data, api.session, fmt=fmt)
+
+    facility, _, restored_component, restored_notification = restored
+    assert isinstance(facility, Facility)
+    assert facility.to_dict() == facilities[0].to_dict()
+    assert facility.name == facilities[0].name
+
+    assert isinstance(restored_component, Component)
+    assert restored_component.to_dict() == component.to_dict()
+    assert restored_component.parameters.keys() == component.parameters.keys()
+    assert restored_component.parameters['3_0'].value == '78'
+
+    assert isinstance(restored_notification, NotificationOverview)
+    assert restored_notification.raw == notification.raw
+    assert restored_notification.details.body == notification.details.body
+
+    if fmt == 'pickle':
+        assert restored_component._session is None
+    else:
+        assert restored_component._session is api.session
+        assert restored_component.parameters['3_0'].session is api.session
+
+
+def test_single_object_and_errors(load_json):
+    facility = Facility.from_dict({'raw': load_json('facility.json')[0]})
+    assert serialization.loads(serialization.dumps(facility)) == facility  # Both have no session.
+
+    with pytest.raises(TypeError):
+        serialization.dumps(object())
+    with pytest.raises(ValueError):
+        serialization.dumps(facility, fmt='xml')
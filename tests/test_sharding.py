@@ -0,0 +1,110 @@
+"""Test polling accounts from multiple processes."""
+
+import asyncio
+import queue
+import sys
+import threading
+
+import pytest
+from aioresponses import aioresponses
+from froeling import endpoints
+from froeling.sharding import Account, SharedRateLimiter, ShardedRunner, _Options, _poll_shard, shard
+from yarl import URL
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+def test_shard():
+    accounts = [Account(token='a'), Account(token='b', facility_ids=(1, 2, 3)), Account(token='c')]
+    shards = shard(accounts, 2)
+    assert len(shards) == 2
+    # Units: a, b/1, b/2, b/3, c -> [a, b/2, c] and [b/1, b/3]
+    assert [(i, a.facility_ids) for i, a in shards[0]] == [(0, None), (1, (2,)), (2, None)]
+    assert [(i, a.facility_ids) for i, a in shards[1]] == [(1, (1, 3))]
+
+    assert len(shard(accounts[:1], 4)) == 1  # No empty shards
+
+
+def test_shared_rate_limiter():
+    limiter = SharedRateLimiter(rate=10, burst=2)
+    assert limiter.try_acquire() == 0
+    assert limiter.try_acquire() == 0
+    assert 0 < limiter.try_acquire() <= 0.1
+
+
+@pytest.fixture
+def mocked_account(load_json):
+    component_list = load_json('component_list.json')[:2]
+    with aioresponses() as m:
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=load_json('facility.json'), repeat=True)
+        m.get(endpoints.COMPONENT_LIST.format(1234, 12345), status=200, payload=component_list, repeat=True)
+        m.get(
+            endpoints.COMPONENT.format(1234, 12345, '1_100'),
+            status=200,
+            payload=load_json('component.json'),
+            repeat=True,
+        )
+        m.get(endpoints.COMPONENT.format(1234, 12345, component_list[1]['componentId']), status=500, repeat=True)
+        yield m
+
+
+@pytest.mark.asyncio
+async def test_poll_shard(mocked_account):
+    results: queue.Queue = queue.Queue()
+    options = _Options(interval=0, rounds=2, concurrency=4, fields=None, client_options={})
+    accounts = [(3, Account(token=token, facility_ids=(12345,)))]
+    await _poll_shard(0, accounts, results, SharedRateLimiter(rate=1000), threading.Event(), options)
+
+    items = [results.get_nowait() for _ in range(results.qsize())]
+    assert len(items) == 4  # 2 components, 2 rounds
+    ok = [r for r in items if r.error is None]
+    assert len(ok) == 2
+    assert all(r.account == 3 and r.facility_id == 12345 for r in items)
+    assert ok[0].component['3_0'].value == '78'
+
+
+@pytest.mark.asyncio
+async def test_poll_shards_share_token(mocked_account, load_json, tmp_path):
+    mocked_account.post(endpoints.LOGIN, status=200, payload=load_json('login.json'), headers={'Authorization': token})
+    results: queue.Queue = queue.Queue()
+    options = _Options(0, 1, 4, None, {}, str(tmp_path))
+    accounts = [(0, Account('user', 'password', facility_ids=(12345,)))]
+    await asyncio.gather(
+        *(_poll_shard(i, accounts, results, SharedRateLimiter(rate=1000), threading.Event(), options) for i in (0, 1))
+    )
+
+    items = [results.get_nowait() for _ in range(results.qsize())]
+    # Both shards set up the account, but only one logged in.
+    assert len(items) == 4
+    assert all(r.facility_id == 12345 for r in items)
+    assert len(mocked_account.requests[('POST', URL(endpoints.LOGIN))]) == 1
+    assert (tmp_path / 'account-0.json').read_text() == token
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='The mocked responses need fork to reach the workers.')
+def test_sharded_runner(mocked_account):
+    accounts = [Account(token=token, facility_ids=(12345,)), Account(token=token, facility_ids=(54321,))]
+    with ShardedRunner(accounts, processes=2, rate=1000, rounds=1, mp_context='fork') as runner:
+        assert len(runner.shards) == 2
+        results = list(runner.results(timeout=30))
+
+    by_shard = {i: [r for r in results if r.shard == i] for i in (0, 1)}
+    assert sorted(r.error is None for r in by_shard[0]) == [False, True]
+    # The component list of facility 54321 isn't mocked, so setting up shard 1 fails.
+    (failed,) = by_shard[1]
+    assert failed.account == 1
+    assert failed.error is not None
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='The mocked responses need fork to reach the workers.')
+def test_results_after_workers_exited(mocked_account):
+    accounts = [Account(token=token, facility_ids=(12345,))]
+    with ShardedRunner(accounts, processes=1, rate=1000, rounds=1, mp_context='fork') as runner:
+        (process,) = runner._processes  # noqa: SLF001
+        process.join(30)
+        assert process.exitcode == 0
+        results = list(runner.results(timeout=30))
+        assert list(runner.results(timeout=1)) == []  # Nothing is yielded twice
+
+    assert len(results) == 2
+    assert all(r.facility_id == 12345 for r in results)
@@ -0,0 +1,63 @@
+"""Test immutable datamodel snapshots."""
+
+import dataclasses
+import pickle
+
+import pytest
+from aioresponses import aioresponses
+from froeling import Froeling, endpoints
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+@pytest.mark.asyncio
+async def test_snapshots(load_json):
+    with aioresponses() as m:
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=load_json('facility.json'))
+        m.get(
+            endpoints.COMPONENT.format(1234, 12345, '1_100'),
+            status=200,
+            payload=load_json('component.json'),
+            repeat=True,
+        )
+        m.get(endpoints.NOTIFICATION_LIST.format(1234), status=200, payload=load_json('notification_list.json'))
+        m.get(endpoints.NOTIFICATION.format(1234, 10123456), status=200, payload=load_json('notification.json'))
+
+        async with Froeling(token=token) as api:
+            facility = (await api.get_facilities())[0]
+            component = api.get_component(12345, '1_100')
+            await component.update()
+            notification = (await api.get_notifications())[0]
+
+            snapshot = component.snapshot()
+            assert snapshot == component.snapshot()
+            assert hash(snapshot) == hash(component.snapshot())
+            assert len({snapshot, component.snapshot()}) == 1
+
+            component.parameters['3_0'].value = '12'  # Live handles change, snapshots don't.
+            assert snapshot['3_0'].value == '78'
+            assert component.snapshot() != snapshot
+
+            overview = notification.snapshot()
+            assert overview.body is None
+            await notification.info()
+            details = notification.snapshot()
+            assert details.body == notification.details.body
+            assert details.id == overview.id
+
+            facility_snapshot = facility.snapshot()
+
+    assert set(snapshot) == set(component.parameters)
+    assert snapshot['3_0'].display_value == '78 °C'
+    assert snapshot.get('does_not_exist') is None
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snapshot.display_name = 'changed'  # type: ignore[misc]
+
+    assert facility_snapshot.facility_id == facility.facility_id
+    assert facility_snapshot.address == facility.address
+    assert hash(facility_snapshot)
+    assert dict(facility_snapshot.protocol_3200_info or ()) == facility.protocol_3200_info
+
+    # Snapshots don't reference the session, so they pickle without it.
+    for s in (snapshot, facility_snapshot, details):
+        assert pickle.loads(pickle.dumps(s)) == s
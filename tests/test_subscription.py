@@ -0,0 +1,152 @@
+"""Test parameter subscriptions."""
+
+import copy
+
+import pytest
+from aioresponses import aioresponses
+from froeling import Froeling, endpoints
+from froeling.subscription import OVERVIEW, plan_requests
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+def test_plan_requests():
+    locations = {
+        'a': {'1', '2'},
+        'b': {'2', '3', '4'},
+        'c': {'4', '5'},
+        'd': {'1', '5'},
+    }
+    plan = plan_requests(locations, ['1', '2', '3', '4', '5', '6'])
+    assert set().union(*plan.values()) == {'1', '2', '3', '4', '5'}
+    assert len(plan) == 2
+    assert plan['b'] == {'2', '3', '4'}
+
+    assert plan_requests(locations, ['3']) == {'b': {'3'}}
+    assert plan_requests({}, ['1']) == {}
+    assert plan_requests(locations | {OVERVIEW: {'1', '3', '5'}}, ['1', '3', '5']) == {OVERVIEW: {'1', '3', '5'}}
+
+
+def circuit_data(component_data, component_id, parameter_id):
+    data = copy.deepcopy(component_data)
+    data['componentId'] = component_id
+    del data['topView']
+    data['setupView'] = []
+    data['stateView'] = [dict(data['stateView'][0], id=parameter_id, name=f'name{parameter_id}')]
+    return data
+
+
+@pytest.mark.asyncio
+async def test_subscription(load_json):
+    facility_data = load_json('facility.json')
+    component_list_data = load_json('component_list.json')
+    component_data = load_json('component.json')
+    circuit_1 = circuit_data(component_data, '300_3100', '30_1')
+
+    def component_url(component_id):
+        return endpoints.COMPONENT.format(1234, 12345, component_id)
+
+    with aioresponses() as m:
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=facility_data)
+        m.get(endpoints.COMPONENT_LIST.format(1234, 12345), status=200, payload=component_list_data, repeat=True)
+        m.get(endpoints.OVERVIEW.format(1234, 12345), status=200, payload=load_json('overview.json'), repeat=True)
+        m.get(component_url('1_100'), status=200, payload=component_data, repeat=True)
+        m.get(component_url('300_3100'), status=200, payload=circuit_1, repeat=True)
+        for component_id in ('300_3110', '200_2100', '400_4100'):
+            m.get(component_url(component_id), status=200, payload=circuit_data(component_data, component_id, 'x'))
+
+        async with Froeling(token=token) as api:
+            subscription = await api.subscribe(12345, ['7_28', '3_0', '30_1'])
+            assert subscription.plan == {'1_100': {'7_28', '3_0'}, '300_3100': {'30_1'}}
+            assert subscription.missing == set()
+
+            parameters = await subscription.refresh()
+            assert set(parameters) == {'7_28', '3_0', '30_1'}
+            assert parameters['7_28'].value == '80'
+
+            # Known parameters are planned from the facility's index without new discovery requests.
+            known = await api.subscribe(12345, ['3_0'])
+            assert known.plan == {'1_100': {'3_0'}}
+
+            # Unknown parameters make discovery go through all components.
+            unknown = await api.subscribe(12345, ['3_0', 'does_not_exist'])
+            assert unknown.plan == {'1_100': {'3_0'}}
+            assert unknown.missing == {'does_not_exist'}
+
+    requests = {str(url): len(calls) for (_, url), calls in m.requests.items()}
+    assert requests[component_url('1_100')] == 2  # discovery + refresh
+    assert requests[component_url('300_3100')] == 3  # discovery + refresh + second discovery
+    assert requests[component_url('400_4100')] == 1
+
+
+@pytest.mark.asyncio
+async def test_subscription_overview(load_json):
+    facility_data = load_json('facility.json')
+    component_data = load_json('component.json')
+    overview_data = load_json('overview.json')
+    # Name the overview values like the parameters of the components.
+    overview_data['components'][0]['boilerTemp']['displayName'] = 'Kesseltemperatur'
+    overview_data['components'][1]['actualFlowTemp']['displayName'] = 'Kesseltemperatur'
+    overview_url = endpoints.OVERVIEW.format(1234, 12345)
+
+    with aioresponses() as m:
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=facility_data)
+        m.get(overview_url, status=200, payload=overview_data, repeat=True)
+        m.get(endpoints.COMPONENT.format(1234, 12345, '1_100'), status=200, payload=component_data)
+        m.get(
+            endpoints.COMPONENT.format(1234, 12345, '300_3100'),
+            status=200,
+            payload=circuit_data(component_data, '300_3100', '30_1'),
+        )
+
+        async with Froeling(token=token) as api:
+            facility = await api.get_facility(12345)
+            await facility.get_component('1_100').update()
+            await facility.get_component('300_3100').update()
+
+            subscription = await api.subscribe(12345, ['3_0', '30_1'])
+            assert subscription.plan == {OVERVIEW: {'3_0', '30_1'}}
+
+            parameters = await subscription.refresh()
+            assert parameters['3_0'].value == '76'
+            assert parameters['3_0'].unit == '°C'
+            assert parameters['30_1'].value == '39'
+
+    requests = {str(url): len(calls) for (_, url), calls in m.requests.items()}
+    assert requests[overview_url] == 2  # discovery + refresh
+
+
+@pytest.mark.asyncio
+async def test_subscription_lost_parameter(load_json):
+    facility_data = load_json('facility.json')
+    component_list_data = load_json('component_list.json')
+    component_data = load_json('component.json')
+    without_7_28 = copy.deepcopy(component_data)
+    without_7_28['setupView'] = [p for p in without_7_28['setupView'] if p['id'] != '7_28']
+
+    with aioresponses() as m:
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=facility_data)
+        m.get(endpoints.COMPONENT_LIST.format(1234, 12345), status=200, payload=component_list_data, repeat=True)
+        m.get(endpoints.OVERVIEW.format(1234, 12345), status=200, payload=load_json('overview.json'), repeat=True)
+        m.get(endpoints.COMPONENT.format(1234, 12345, '1_100'), status=200, payload=component_data)
+        m.get(endpoints.COMPONENT.format(1234, 12345, '1_100'), status=200, payload=component_data)
+        m.get(endpoints.COMPONENT.format(1234, 12345, '1_100'), status=200, payload=without_7_28, repeat=True)
+        for component_id in ('300_3100', '300_3110', '200_2100', '400_4100'):
+            m.get(
+                endpoints.COMPONENT.format(1234, 12345, component_id),
+                status=200,
+                payload=circuit_data(component_data, component_id, 'x'),
+            )
+
+        async with Froeling(token=token) as api:
+            subscription = await api.subscribe(12345, ['7_28', '3_0'])
+            assert subscription.plan == {'1_100': {'7_28', '3_0'}}
+            await subscription.refresh()
+
+            await subscription.refresh()  # 7_28 went away.
+            facility = await api.get_facility(12345)
+            assert '7_28' not in facility.parameter_index
+
+            await subscription.refresh()  # Planned again without 7_28.
+            assert subscription.plan == {'1_100': {'3_0'}}
+            assert subscription.missing == {'7_28'}
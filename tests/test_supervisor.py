@@ -0,0 +1,82 @@
+"""Test background task supervision and shutdown."""
+
+import asyncio
+
+import pytest
+from aioresponses import CallbackResult, aioresponses
+from froeling import Froeling, endpoints
+from froeling.supervisor import TaskSupervisor
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+@pytest.mark.asyncio
+async def test_supervisor_restarts_failed_tasks():
+    supervisor = TaskSupervisor(min_backoff=0.001, max_backoff=0.01)
+    runs = 0
+    done = asyncio.Event()
+
+    async def flaky():
+        nonlocal runs
+        runs += 1
+        if runs < 4:
+            raise RuntimeError(runs)
+        done.set()
+
+    task = supervisor.start('flaky', flaky)
+    await asyncio.wait_for(done.wait(), 1)
+    await supervisor.close()
+
+    assert runs == 4
+    assert task.restarts == 3
+    assert task.failures == 3
+    assert isinstance(task.last_error, RuntimeError)
+    assert not task.running
+
+
+@pytest.mark.asyncio
+async def test_supervisor_no_restart():
+    supervisor = TaskSupervisor(min_backoff=0.001)
+
+    async def fail():
+        raise RuntimeError
+
+    task = supervisor.start('fail', fail, restart=False)
+    await asyncio.sleep(0.01)
+    assert not task.running
+    assert task.restarts == 0
+    await supervisor.close()
+
+    with pytest.raises(RuntimeError):
+        supervisor.start('fail', fail)
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_tasks_and_waits_for_writes(load_json):
+    component_data = load_json('component.json')
+    written = asyncio.Event()
+    started = asyncio.Event()
+
+    async def slow_write(url, **kwargs):
+        started.set()
+        await asyncio.sleep(0.05)
+        written.set()
+        return CallbackResult(status=200, payload='successmessage')
+
+    with aioresponses() as m:
+        m.get(endpoints.COMPONENT.format(1234, 12345, '1_100'), status=200, payload=component_data)
+        m.put(endpoints.SET_PARAMETER.format(1234, 12345, '7_28'), callback=slow_write)
+
+        async with Froeling(token=token) as api:
+            c = api.get_component(12345, '1_100')
+            await c.update()
+
+            async def poll():
+                await c.parameters['7_28'].set_value(80)
+                await asyncio.Event().wait()
+
+            task = api.supervisor.start('poll', poll)
+            await started.wait()
+
+        assert task.task.cancelled()
+        assert written.is_set()
@@ -0,0 +1,114 @@
+"""Test the blocking facade."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from aioresponses import aioresponses
+from froeling import endpoints
+from froeling.sync import Blocking, Froeling, _Runner
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+def test_sync_facade(load_json):
+    with aioresponses() as m:
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=load_json('facility.json'))
+        m.get(
+            endpoints.COMPONENT_LIST.format(1234, 12345),
+            status=200,
+            payload=load_json('component_list.json'),
+            repeat=True,
+        )
+        m.get(
+            endpoints.COMPONENT.format(1234, 12345, '1_100'),
+            status=200,
+            payload=load_json('component.json'),
+            repeat=True,
+        )
+
+        with Froeling(token=token) as api:
+            facility = api.get_facility(12345)
+            assert isinstance(facility, Blocking)
+            assert facility.name == facility.unwrapped.name
+
+            def read_component(_):
+                component = facility.get_component('1_100')
+                component.update()
+                return component.parameters['3_0'].value, api.client.session.clientsession
+
+            with ThreadPoolExecutor(8) as pool:
+                results = list(pool.map(read_component, range(16)))
+
+            components = facility.get_components()
+            assert all(isinstance(c, Blocking) for c in components)
+
+            # The client lives on the background loop and can't be used from it synchronously.
+            with pytest.raises(RuntimeError):
+                api.run(_call_from_loop(api))
+
+    assert {value for value, _ in results} == {'78'}
+    assert len({id(session) for _, session in results}) == 1  # One connection pool for all threads.
+    assert api.client.session.clientsession.closed
+    with pytest.raises(RuntimeError):
+        api.get_facilities()
+
+
+async def _call_from_loop(api):
+    await asyncio.sleep(0)
+    return api.get_notification_count()
+
+
+def test_sync_notifications_and_iteration(load_json):
+    with aioresponses() as m:
+        m.get(endpoints.NOTIFICATION_LIST.format(1234), status=200, payload=load_json('notification_list.json'))
+        m.get(endpoints.NOTIFICATION.format(1234, 10123456), status=200, payload=load_json('notification.json'))
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=load_json('facility.json'))
+        m.get(
+            endpoints.COMPONENT_LIST.format(1234, 12345),
+            status=200,
+            payload=load_json('component_list.json')[:1],
+            repeat=True,
+        )
+        m.get(
+            endpoints.COMPONENT.format(1234, 12345, '1_100'),
+            status=200,
+            payload=load_json('component.json'),
+            repeat=True,
+        )
+
+        with Froeling(token=token) as api:
+            details = api.get_notification(10123456)
+            assert isinstance(details, Blocking)
+            assert details.id == 10123456
+
+            notifications = [n for n in api.get_notifications() if n.id == 10123456]
+            (cached,) = api.get_notification_details(notifications)
+            assert cached.unwrapped is details.unwrapped
+
+            components = list(api.iter_components([12345]))
+            assert [c.component_id for c in components] == ['1_100']
+            assert isinstance(components[0], Blocking)
+            assert len(list(api.iter_parameters([12345], fields=['3_0']))) == 1
+
+
+def test_iteration_timeout():
+    cleaned_up = []
+
+    async def slow():
+        yield 1
+        try:
+            await asyncio.sleep(10)
+        finally:
+            await asyncio.sleep(0.05)  # Cleaning up takes a moment after the cancellation.
+            cleaned_up.append(True)
+
+    runner = _Runner(name='test')
+    try:
+        items = runner.iterate(slow(), timeout=0.05)
+        assert next(items) == 1
+        with pytest.raises(TimeoutError):
+            next(items)
+        assert cleaned_up == [True]
+    finally:
+        runner.stop()
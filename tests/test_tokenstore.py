@@ -0,0 +1,107 @@
+"""Test storing and sharing tokens."""
+
+import asyncio
+import base64
+import json
+import time
+
+import pytest
+from aioresponses import aioresponses
+from froeling import Froeling, endpoints
+from froeling.tokenstore import FileTokenStore, MemoryTokenStore, is_valid, token_expiry
+from yarl import URL
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+def jwt(**claims):
+    payload = base64.urlsafe_b64encode(json.dumps({'userId': 1234, **claims}).encode()).decode().rstrip('=')
+    return f'header.{payload}.signature'
+
+
+def test_is_valid():
+    assert is_valid(token)  # No expiry
+    assert token_expiry(token) is None
+    assert token_expiry(jwt(exp=1700000000)) == 1700000000
+    assert is_valid(jwt(exp=time.time() + 3600))
+    assert not is_valid(jwt(exp=time.time() + 30))  # Within the margin
+    assert not is_valid(jwt(exp=time.time() - 10))
+    assert not is_valid('not a token')
+    assert not is_valid(None)
+
+
+def test_file_token_store(tmp_path):
+    store = FileTokenStore(tmp_path / 'cache' / 'token')
+    assert store.load() is None
+    store.save(token)
+    assert store.load() == token
+    assert store.path.stat().st_mode & 0o777 == 0o600
+    assert list(store.path.parent.iterdir()) == [store.path]
+
+
+@pytest.mark.asyncio
+async def test_file_token_store_lock(tmp_path):
+    stores = [FileTokenStore(tmp_path / 'token') for _ in range(2)]
+    order = []
+
+    async def hold(i):
+        async with stores[i].lock():
+            order.append(('enter', i))
+            await asyncio.sleep(0.05)
+            order.append(('exit', i))
+
+    await asyncio.gather(hold(0), hold(1))
+    assert [event for event, _ in order] == ['enter', 'exit', 'enter', 'exit']
+
+
+@pytest.mark.asyncio
+async def test_stored_token_skips_login(load_json):
+    store = MemoryTokenStore(token)
+    with aioresponses() as m:
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=load_json('facility.json'))
+        async with Froeling('joe', 'pwd', token_store=store) as api:
+            assert api.token == token
+            assert len(await api.get_facilities()) == 2
+
+
+@pytest.mark.asyncio
+async def test_expired_token_is_replaced(load_json):
+    store = MemoryTokenStore(jwt(exp=time.time() - 10))
+    with aioresponses() as m:
+        m.post(endpoints.LOGIN, status=200, payload=load_json('login.json'), headers={'Authorization': token})
+        async with Froeling('joe', 'pwd', jwt(exp=time.time() - 10), token_store=store) as api:
+            assert api.token == token
+            assert (await api.get_userdata()).email  # From the login response
+    assert store.load() == token
+
+
+def test_expired_token_without_credentials():
+    with pytest.raises(ValueError, match='Set either token'):
+        Froeling(token_store=MemoryTokenStore(jwt(exp=time.time() - 10)))
+
+
+@pytest.mark.asyncio
+async def test_shared_store_logs_in_once(load_json):
+    store = MemoryTokenStore()
+    with aioresponses() as m:
+        m.post(endpoints.LOGIN, status=200, payload=load_json('login.json'), headers={'Authorization': token})
+        clients = [Froeling('joe', 'pwd', token_store=store) for _ in range(3)]
+        await asyncio.gather(*(c.__aenter__() for c in clients))
+        assert {c.token for c in clients} == {token}
+        for client in clients:
+            await client.close()
+    assert len(m.requests[('POST', URL(endpoints.LOGIN))]) == 1
+
+
+@pytest.mark.asyncio
+async def test_reauth_uses_token_renewed_by_other_replica(load_json):
+    renewed = jwt(exp=time.time() + 3600)
+    store = MemoryTokenStore(token)
+    with aioresponses() as m:
+        m.get(endpoints.FACILITY.format(1234), status=401)
+        m.get(endpoints.FACILITY.format(1234), status=200, payload=load_json('facility.json'))
+        async with Froeling('joe', 'pwd', token_store=store, auto_reauth=True) as api:
+            store.save(renewed)  # Another replica renewed the token meanwhile
+            assert len(await api.get_facilities()) == 2
+            assert api.token == renewed
+    assert ('POST', URL(endpoints.LOGIN)) not in m.requests
@@ -0,0 +1,88 @@
+"""Test coalescing, ordering and retries of queued parameter writes."""
+
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from aioresponses import aioresponses
+from froeling import Froeling, endpoints
+from froeling.exceptions import NetworkError
+from froeling.writequeue import WriteQueue
+
+token = 'header.eyJ1c2VySWQiOjEyMzR9.signature'
+
+
+@pytest.fixture
+def mocked(load_json):
+    with aioresponses() as m:
+        m.get(endpoints.COMPONENT.format(1234, 12345, '1_100'), status=200, payload=load_json('component.json'))
+        yield m
+
+
+def puts(mocked):
+    calls = [(url, call) for (method, url), calls in mocked.requests.items() if method == 'put' for call in calls]
+    return [(str(url), call.kwargs['json']) for url, call in calls]
+
+
+@pytest.mark.asyncio
+async def test_coalesce(mocked):
+    # An empty body still means the value was changed, only 304 means it was already set.
+    mocked.put(endpoints.SET_PARAMETER.format(1234, 12345, '7_28'), status=200)
+    mocked.put(endpoints.SET_PARAMETER.format(1234, 12345, '3_213'), status=HTTPStatus.NOT_MODIFIED)
+
+    async with Froeling(token=token) as api:
+        component = api.get_component(12345, '1_100')
+        await component.update()
+        queue = WriteQueue(window=0.01)
+        futures = [queue.submit(component.parameters['7_28'], value) for value in (81, 82, 83)]
+        other = queue.submit(component.parameters['3_213'], 1)
+        assert len(queue) == 2
+        results = await asyncio.gather(*futures)
+        assert (await other).changed is False
+
+    assert all(result == results[0] for result in results)
+    assert results[0].value == '83'
+    assert results[0].changed
+    assert (results[0].attempts, results[0].coalesced) == (1, 3)
+    assert (queue.stats.submitted, queue.stats.sent, queue.stats.coalesced) == (4, 2, 2)
+    # One request per parameter, in the order they were first queued
+    assert puts(mocked) == [
+        (endpoints.SET_PARAMETER.format(1234, 12345, '7_28'), {'value': '83'}),
+        (endpoints.SET_PARAMETER.format(1234, 12345, '3_213'), {'value': '1'}),
+    ]
+    assert not queue.pending
+
+
+@pytest.mark.asyncio
+async def test_retry(mocked):
+    url = endpoints.SET_PARAMETER.format(1234, 12345, '7_28')
+    mocked.put(url, status=503)
+    mocked.put(url, status=200, payload='ok')
+    mocked.put(endpoints.SET_PARAMETER.format(1234, 12345, '3_213'), status=400)
+
+    async with Froeling(token=token) as api:
+        component = api.get_component(12345, '1_100')
+        await component.update()
+        queue = WriteQueue(window=0, retry_delay=0.001)
+        result = await queue.set_value(component.parameters['7_28'], 85)
+        # Client errors are not retried
+        with pytest.raises(NetworkError):
+            await queue.set_value(component.parameters['3_213'], 1)
+
+    assert result.attempts == 2
+    assert (queue.stats.retries, queue.stats.sent, queue.stats.failed) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_close_sends_queued_writes(mocked):
+    mocked.put(endpoints.SET_PARAMETER.format(1234, 12345, '7_28'), status=200, payload='ok')
+
+    async with Froeling(token=token) as api:
+        component = api.get_component(12345, '1_100')
+        await component.update()
+        api.writes.window = 60
+        future = api.writes.submit(component.parameters['7_28'], 85)
+
+    assert (await future).value == '85'
+    with pytest.raises(RuntimeError):
+        api.writes.submit(component.parameters['7_28'], 86)